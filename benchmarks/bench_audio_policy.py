@@ -0,0 +1,124 @@
+"""
+Compare the CPU cost per track of each audio policy.
+
+Generates synthetic m4a (AAC) and webm (Opus) tracks with ffmpeg, the two
+formats YouTube serves as best audio, and runs yt-dlp's FFmpegExtractAudio on
+copies of them with the options each policy produces. CPU time is the user +
+system time of the ffmpeg child processes.
+
+    python benchmarks/bench_audio_policy.py --tracks 5 --duration 180
+    python benchmarks/bench_audio_policy.py --json
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yt_dlp
+from yt_dlp.postprocessor import FFmpegExtractAudioPP
+
+from src.youtube_downloader import YouTubeDownloader, AUDIO_POLICIES
+
+SOURCES = {
+    'm4a': ['-c:a', 'aac', '-b:a', '128k'],
+    'webm': ['-c:a', 'libopus', '-b:a', '128k'],
+}
+
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def make_source(
+    ffmpeg: str,
+    ext: str,
+    duration: int,
+    directory: Path
+    ) -> Path:
+    path = directory / f"source.{ext}"
+    subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+         *SOURCES[ext], str(path)],
+        check=True
+    )
+    return path
+
+
+def run_policy(
+    policy: str,
+    bitrate: str,
+    source: Path,
+    tracks: int,
+    directory: Path
+    ) -> Dict[str, Any]:
+    options = YouTubeDownloader._audio_options(policy, bitrate)
+    spec = options['postprocessors'][0]
+    ydl = yt_dlp.YoutubeDL({'quiet': True, 'postprocessor_args': options.get('postprocessor_args', [])})
+    pp = FFmpegExtractAudioPP(ydl, preferredcodec=spec['preferredcodec'])
+
+    cpu = 0.0
+    wall = 0.0
+    output_ext = None
+    for track in range(tracks):
+        path = directory / f"{policy}-{track}{source.suffix}"
+        shutil.copy(source, path)
+        started_cpu, started_wall = child_cpu_seconds(), time.perf_counter()
+        _, info = pp.run({'filepath': str(path), 'ext': source.suffix[1:]})
+        cpu += child_cpu_seconds() - started_cpu
+        wall += time.perf_counter() - started_wall
+        output_ext = info['ext']
+        Path(info['filepath']).unlink()
+
+    return {
+        'policy': policy,
+        'source': source.suffix[1:],
+        'output': output_ext,
+        'cpu_per_track': cpu / tracks,
+        'wall_per_track': wall / tracks,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=3, help='Tracks converted per policy and source.')
+    parser.add_argument('--duration', type=int, default=120, help='Length of each synthetic track in seconds.')
+    parser.add_argument('--bitrate', default='best', help="Requested bitrate, as passed to --audio.")
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args()
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg or not shutil.which('ffprobe'):
+        print("ffmpeg and ffprobe are required for this benchmark.", file=sys.stderr)
+        return 1
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for ext in SOURCES:
+            source = make_source(ffmpeg, ext, args.duration, directory)
+            for policy in AUDIO_POLICIES:
+                results.append(run_policy(policy, args.bitrate, source, args.tracks, directory))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.tracks} track(s) of {args.duration}s, bitrate {args.bitrate}\n")
+    print(f"{'SOURCE':<7}{'POLICY':<13}{'OUTPUT':<8}{'CPU/TRACK':>10}{'WALL/TRACK':>12}")
+    for row in results:
+        print(f"{row['source']:<7}{row['policy']:<13}{row['output']:<8}"
+              f"{row['cpu_per_track']:>9.2f}s{row['wall_per_track']:>11.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
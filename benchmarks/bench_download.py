@@ -0,0 +1,254 @@
+"""
+Measure end-to-end download throughput against a local fake YouTube.
+
+Starts the stand-in server from fake_youtube.py and runs the same calls the
+CLI makes: get_video_info then download for single videos, and
+get_playlist_info then download for a playlist. Each scenario runs in a fresh
+process inside an empty working directory, so downloads/, the metadata cache
+and the peak RSS figure start from scratch. Results are printed as JSON,
+tagged with the current commit, so runs can be saved and compared:
+
+    python benchmarks/bench_download.py --videos 20 --size-mb 4 --bandwidth-mb 16 --output base.json
+    python benchmarks/bench_download.py --videos 20 --size-mb 4 --bandwidth-mb 16 --compare base.json
+
+The shared rate limiter would dominate the numbers at loopback speeds, so it is
+lifted unless --rate-limit is given. MP3 runs need ffmpeg, which is also used
+to generate the audio track served to them.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fake_youtube import FakeYouTube
+
+# Metrics whose drop (throughput) or rise (latency, memory) beyond the tolerance counts as a regression
+HIGHER_IS_BETTER = ('videos_per_sec', 'mb_per_sec')
+LOWER_IS_BETTER = ('extraction_ms_mean', 'postprocess_seconds', 'peak_rss_mb')
+
+
+def histogram_totals(
+    histogram: Any
+    ) -> Dict[str, float]:
+    """Sum and count over every label set of a metrics histogram."""
+    totals = {'sum': 0.0, 'count': 0}
+    for name, _, value in histogram.samples():
+        if name.endswith('_sum'):
+            totals['sum'] += value
+        elif name.endswith('_count'):
+            totals['count'] += value
+    return totals
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(
+    scenario: str,
+    urls: List[str],
+    options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+    """Run one scenario in the current (fresh) process and return its measurements."""
+    from src.metrics import POSTPROCESS_SECONDS
+    from src.ratelimit import AdaptiveRateLimiter
+    from src.session import YoutubeDLSession
+    from src.youtube_downloader import YouTubeDownloader
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        limiter = AdaptiveRateLimiter() if options['rate_limit'] else AdaptiveRateLimiter(rate=1e6, burst=10 ** 6)
+        quiet = open(os.devnull, 'w') if not options['verbose'] else None
+        redirect = contextlib.ExitStack()
+        if quiet is not None:
+            redirect.enter_context(contextlib.redirect_stdout(quiet))
+            redirect.enter_context(contextlib.redirect_stderr(quiet))
+
+        with redirect:
+            downloader = YouTubeDownloader(session=YoutubeDLSession(rate_limiter=limiter))
+            download_options = {'format': options['format'], 'bitrate': options['bitrate']}
+            if scenario == 'playlist':
+                download_options['max_workers'] = options['workers']
+            postprocess_before = histogram_totals(POSTPROCESS_SECONDS)
+            lookups = []
+            files = []
+            failed = 0
+            started = time.perf_counter()
+            for url in urls:
+                lookup_started = time.perf_counter()
+                info = downloader.get_playlist_info(url) if scenario == 'playlist' else downloader.get_video_info(url)
+                lookups.append(time.perf_counter() - lookup_started)
+                result = downloader.download(url, **download_options) if info else None
+                if result:
+                    files.extend(result.files)
+                summary = getattr(result, 'summary', None) or {}
+                failed += summary.get('failed', 0 if result else 1)
+            elapsed = time.perf_counter() - started
+            postprocess_after = histogram_totals(POSTPROCESS_SECONDS)
+        if quiet is not None:
+            quiet.close()
+
+        size = sum(os.path.getsize(path) for path in files if os.path.exists(path))
+        os.chdir(ROOT)
+
+    videos = len(files)
+    return {
+        'scenario': scenario,
+        'videos': videos,
+        'failed': failed,
+        'seconds': elapsed,
+        'videos_per_sec': videos / elapsed if elapsed else 0.0,
+        'mb_per_sec': size / (1024 * 1024) / elapsed if elapsed else 0.0,
+        'extraction_ms_mean': statistics.mean(lookups) * 1000,
+        'extraction_ms_p50': statistics.median(lookups) * 1000,
+        'extraction_ms_max': max(lookups) * 1000,
+        'postprocess_seconds': postprocess_after['sum'] - postprocess_before['sum'],
+        'postprocess_runs': postprocess_after['count'] - postprocess_before['count'],
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def make_audio_track(
+    ffmpeg: str,
+    seconds: int,
+    directory: Path
+    ) -> Path:
+    path = directory / 'track.m4a'
+    subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+         '-c:a', 'aac', '-b:a', '128k', str(path)],
+        check=True
+    )
+    return path
+
+
+def git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=ROOT)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+    ) -> List[str]:
+    """Regressions of ``report`` against ``baseline`` beyond ``tolerance`` (a fraction)."""
+    regressions = []
+    previous = {row['scenario']: row for row in baseline.get('results', [])}
+    for row in report['results']:
+        base = previous.get(row['scenario'])
+        if not base:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            old, new = base.get(metric), row.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append(f"{row['scenario']} {metric}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--videos', type=int, default=10, help='Videos published by the fake server.')
+    parser.add_argument('--size-mb', type=float, default=2.0, help='Size of each synthetic video in MB.')
+    parser.add_argument('--bandwidth-mb', type=float, default=0.0, help='MB/s per connection; 0 is unlimited.')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay before every response.')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Playlist workers; 1 measures the sequential path the CLI uses by default.')
+    parser.add_argument('--format', choices=('mp4', 'mp3'), default='mp4')
+    parser.add_argument('--bitrate', default='best', help="MP3 bitrate, as passed to --audio.")
+    parser.add_argument('--track-seconds', type=int, default=60, help='Length of the audio track served for MP3.')
+    parser.add_argument('--scenario', choices=('video', 'playlist'), action='append',
+                        help='Scenario to run; repeatable. Default: both.')
+    parser.add_argument('--rate-limit', action='store_true', help='Keep the default request rate limit.')
+    parser.add_argument('--output', help='Also write the JSON report to this file.')
+    parser.add_argument('--compare', help='Baseline JSON report; exit 1 on regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative regression.')
+    parser.add_argument('--verbose', action='store_true', help="Show the downloader's output.")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        media_file = None
+        if args.format == 'mp3':
+            ffmpeg = shutil.which('ffmpeg')
+            if not ffmpeg:
+                print("ffmpeg is required for MP3 runs.", file=sys.stderr)
+                return 1
+            media_file = make_audio_track(ffmpeg, args.track_seconds, Path(tmp))
+
+        server = FakeYouTube(
+            videos=args.videos,
+            media_size=int(args.size_mb * 1024 * 1024),
+            bandwidth=args.bandwidth_mb * 1024 * 1024 or None,
+            latency=args.latency_ms / 1000,
+            media_file=media_file
+        )
+        options = {
+            'format': args.format, 'bitrate': args.bitrate, 'workers': args.workers,
+            'rate_limit': args.rate_limit, 'verbose': args.verbose,
+        }
+        results = []
+        with server:
+            for scenario in args.scenario or ['video', 'playlist']:
+                if scenario == 'playlist':
+                    urls = [server.playlist_url()]
+                else:
+                    urls = [server.watch_url(video_id) for video_id in server.video_ids]
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    results.append(executor.submit(run_scenario, scenario, urls, options).result())
+
+    import yt_dlp.version
+    report = {
+        'benchmark': 'download',
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'yt_dlp': yt_dlp.version.__version__,
+        'config': {
+            'videos': args.videos, 'size_mb': args.size_mb, 'bandwidth_mb': args.bandwidth_mb,
+            'latency_ms': args.latency_ms, 'rate_limit': args.rate_limit, **options,
+        },
+        'requests': server.requests,
+        'results': results,
+    }
+    del report['config']['verbose']
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
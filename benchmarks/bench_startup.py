@@ -0,0 +1,117 @@
+"""
+Check the cold-start time of ``youtube-downloader --help`` against a budget.
+
+Runs the CLI in fresh interpreters with ``python -X importtime``, reports the
+median wall time and the slowest top-level imports, and exits with status 1
+when the median exceeds the budget or yt-dlp was imported, so a change that
+pulls heavy modules back onto the startup path fails the check.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --budget 400 --json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Median milliseconds allowed for `youtube-downloader --help`. It measured about 350 ms with
+# lazy imports and 580 ms when cli.py still imported yt-dlp at module load
+STARTUP_BUDGET_MS = 450
+# Modules that belong on the download path only
+HEAVY_MODULES = ('yt_dlp', 'src.youtube_downloader')
+
+
+def parse_importtime(
+    stderr: str
+    ) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        rows.append((fields[2].rstrip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def run_once(
+    args: List[str]
+    ) -> Tuple[float, List[Tuple[str, int, int]]]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(ROOT / 'cli.py'), *args],
+        capture_output=True,
+        text=True,
+        cwd=ROOT
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"cli.py {' '.join(args)} exited with {completed.returncode}: {completed.stderr[-500:]}")
+    return elapsed, parse_importtime(completed.stderr)
+
+
+def measure(
+    runs: int,
+    args: List[str]
+    ) -> Dict[str, Any]:
+    timings = []
+    imports: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        elapsed, imports = run_once(args)
+        timings.append(elapsed * 1000)
+
+    # importtime indents nested imports by two spaces per level; top-level rows have one leading space
+    top_level = sorted(
+        ((name.strip(), cumulative) for name, _, cumulative in imports if not name.startswith('  ')),
+        key=lambda row: row[1],
+        reverse=True
+    )
+    loaded = {name.strip() for name, _, _ in imports}
+    return {
+        'command': ['youtube-downloader', *args],
+        'runs': runs,
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'import_ms': sum(cumulative for _, cumulative in top_level) / 1000,
+        'slowest_imports': [{'module': name, 'ms': cumulative / 1000} for name, cumulative in top_level[:10]],
+        'heavy_modules_loaded': [module for module in HEAVY_MODULES if module in loaded],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreter runs to take the median of.')
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help='Median milliseconds allowed.')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args()
+
+    result = measure(args.runs, ['--help'])
+    result['budget_ms'] = args.budget
+    result['within_budget'] = result['median_ms'] <= args.budget and not result['heavy_modules_loaded']
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"youtube-downloader --help, {args.runs} run(s)\n")
+        print(f"median {result['median_ms']:.0f} ms (min {result['min_ms']:.0f}, max {result['max_ms']:.0f}), "
+              f"budget {args.budget:.0f} ms, imports {result['import_ms']:.0f} ms\n")
+        print(f"{'MODULE':<40}{'CUMULATIVE':>12}")
+        for row in result['slowest_imports']:
+            print(f"{row['module']:<40}{row['ms']:>10.1f}ms")
+        if result['heavy_modules_loaded']:
+            print(f"\nLoaded on the startup path: {', '.join(result['heavy_modules_loaded'])}")
+        print(f"\n{'OK' if result['within_budget'] else 'OVER BUDGET'}")
+    return 0 if result['within_budget'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Local HTTP stand-in for YouTube, for offline benchmarks.
+
+Serves three kinds of resources that yt-dlp's generic extractor understands:
+
+    /watch?v=<id>           HTML watch page pointing at the media through og:video
+    /playlist?list=<id>     RSS feed listing the playlist's watch pages
+    /media/<id>.<ext>       the media stream itself
+
+Every response is delayed by ``latency`` seconds and media is sent in chunks
+paced to ``bandwidth`` bytes per second per connection, so download numbers
+reflect the pipeline rather than the loopback interface. Range requests are
+honoured so resumed downloads behave as they do against a real CDN.
+
+    with FakeYouTube(videos=20, media_size=4 * 1024 * 1024, bandwidth=8 * 1024 * 1024) as server:
+        downloader.download(server.watch_url('vid00001'))
+"""
+import html
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit, parse_qs
+
+CHUNK_SIZE = 64 * 1024
+MEDIA_TYPES = {'mp4': 'video/mp4', 'm4a': 'audio/mp4', 'webm': 'video/webm', 'mp3': 'audio/mpeg'}
+
+
+class FakeYouTube:
+    """Threaded HTTP server publishing ``videos`` synthetic videos, all in one playlist."""
+
+    def __init__(
+        self,
+        videos: int = 10,
+        media_size: int = 1024 * 1024,
+        bandwidth: Optional[float] = None,
+        latency: float = 0.0,
+        media_file: Optional[Path] = None,
+        host: str = '127.0.0.1',
+        port: int = 0
+        ) -> None:
+        """``media_file`` replaces the synthetic bytes with a real file, e.g. an encoded track for MP3 runs."""
+        self.video_ids = [f"vid{index:05d}" for index in range(1, videos + 1)]
+        self.bandwidth = bandwidth
+        self.latency = latency
+        if media_file is not None:
+            self.media = Path(media_file).read_bytes()
+            self.ext = Path(media_file).suffix.lstrip('.')
+        else:
+            self.media = bytes(range(256)) * (media_size // 256) + bytes(media_size % 256)
+            self.ext = 'mp4'
+        self.requests: Dict[str, int] = {'watch': 0, 'playlist': 0, 'media': 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(
+        self
+        ) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def watch_url(
+        self,
+        video_id: str
+        ) -> str:
+        return f"{self.base_url}/watch?v={video_id}"
+
+    def playlist_url(
+        self,
+        playlist_id: str = 'PLbenchmark'
+        ) -> str:
+        return f"{self.base_url}/playlist?list={playlist_id}"
+
+    def start(
+        self
+        ) -> 'FakeYouTube':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-youtube', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(
+        self
+        ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(
+        self
+        ) -> 'FakeYouTube':
+        return self.start()
+
+    def __exit__(
+        self,
+        *exc_info: Any
+        ) -> None:
+        self.stop()
+
+    def _count(
+        self,
+        kind: str
+        ) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _watch_page(
+        self,
+        video_id: str
+        ) -> bytes:
+        title = html.escape(f"Benchmark video {video_id}")
+        return (
+            f"<!DOCTYPE html><html><head><title>{title}</title>"
+            f'<meta property="og:title" content="{title}">'
+            f'<meta property="og:video" content="{self.base_url}/media/{video_id}.{self.ext}">'
+            f'<meta property="og:video:type" content="{MEDIA_TYPES.get(self.ext, "video/mp4")}">'
+            f"</head><body></body></html>"
+        ).encode()
+
+    def _playlist_feed(
+        self,
+        playlist_id: str
+        ) -> bytes:
+        items = ''.join(
+            f"<item><title>Benchmark video {video_id}</title><guid>{video_id}</guid>"
+            f"<link>{self.watch_url(video_id)}</link></item>"
+            for video_id in self.video_ids
+        )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Benchmark playlist {html.escape(playlist_id)}</title>{items}</channel></rss>"
+        ).encode()
+
+    def _handler(
+        self
+        ) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_HEAD(self) -> None:
+                self._respond(head=True)
+
+            def do_GET(self) -> None:
+                self._respond(head=False)
+
+            def _respond(self, head: bool) -> None:
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                media = re.fullmatch(r'/media/(\w+)\.\w+', parts.path)
+                if parts.path == '/watch' and query.get('v', [''])[0] in server.video_ids:
+                    server._count('watch')
+                    self._send_body(server._watch_page(query['v'][0]), 'text/html; charset=utf-8', head)
+                elif parts.path == '/playlist' and query.get('list'):
+                    server._count('playlist')
+                    self._send_body(server._playlist_feed(query['list'][0]), 'application/rss+xml', head)
+                elif media and media.group(1) in server.video_ids:
+                    server._count('media')
+                    self._send_media(head)
+                else:
+                    self._send_body(b'Not Found', 'text/plain', head, status=404)
+
+            def _send_body(self, body: bytes, content_type: str, head: bool, status: int = 200) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def _send_media(self, head: bool) -> None:
+                size = len(server.media)
+                start, end = 0, size - 1
+                match = re.fullmatch(r'bytes=(\d*)-(\d*)', self.headers.get('Range', ''))
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+                    else:
+                        start = max(size - int(match.group(2)), 0)
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', MEDIA_TYPES.get(server.ext, 'application/octet-stream'))
+                self.send_header('Content-Length', str(end - start + 1))
+                self.send_header('Accept-Ranges', 'bytes')
+                self.end_headers()
+                if head:
+                    return
+
+                started = time.monotonic()
+                sent = 0
+                try:
+                    for offset in range(start, end + 1, CHUNK_SIZE):
+                        chunk = server.media[offset:min(offset + CHUNK_SIZE, end + 1)]
+                        self.wfile.write(chunk)
+                        sent += len(chunk)
+                        if server.bandwidth:
+                            ahead = sent / server.bandwidth - (time.monotonic() - started)
+                            if ahead > 0:
+                                time.sleep(ahead)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        return Handler
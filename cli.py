@@ -1,18 +1,28 @@
-from src.youtube_downloader import YouTubeDownloader
-from src.config import setup_directories
-from typing import Annotated
-import shutil
-import subprocess
+from src.config import setup_directories, AUDIO_POLICIES
+from src.progress import format_progress
+from src.ffmpeg_probe import probe_ffmpeg
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List, Optional, Tuple, TYPE_CHECKING
+import sys
+import time
 import typer
 
+if TYPE_CHECKING:
+    from src.youtube_downloader import YouTubeDownloader
+else:
+    # Imported by load_downloader() on the download path only: yt-dlp and its
+    # extractors make up most of the CLI's startup time, and --help, argument
+    # errors and --ffmpeg checks never need them
+    YouTubeDownloader = None
+
 app = typer.Typer()
 
 @app.command()
 def main(
-    url: Annotated[
-        str,
-        typer.Argument(help='\"https://www.youtube.com/watch?v=VIDEO_ID\"')
-    ],
+    urls: Annotated[
+        Optional[List[str]],
+        typer.Argument(help='\"https://www.youtube.com/watch?v=VIDEO_ID\" One or more video or playlist URLs.', show_default=False)
+    ] = None,
     audio_only: Annotated[
         str,
         typer.Option("--audio", "-a", help='Download MP3 Audio only. The value provided is the bitrate desired.')
@@ -23,26 +33,76 @@ def main(
     ] = None,
     output_dir: Annotated[
         str | None,
-        typer.Option("--output-dir", "-o", help='Copy download to specified folder.')
+        typer.Option("--output-dir", "-o", help='Save downloads to specified folder.')
     ] = None,
     validate_install: Annotated[
         bool | None,
         typer.Option("--ffmpeg", help='Verify FFmpeg is installed.')
-    ] = None
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option("--workers", "-w", min=1, help='Number of playlist videos to download in parallel.')
+    ] = 1,
+    sync: Annotated[
+        bool,
+        typer.Option("--sync", help='Only download playlist videos that were not downloaded before.')
+    ] = False,
+    batch_file: Annotated[
+        str | None,
+        typer.Option("--batch-file", "-f", help='Read URLs from a file, one per line. Use - for stdin.')
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help='Number of URLs to download in parallel.')
+    ] = 1,
+    audio_policy: Annotated[
+        str | None,
+        typer.Option("--audio-policy", help='With --audio: mp3 (always re-encode), best-native (keep the source codec) or auto (re-encode only when needed).')
+    ] = None,
+    progress: Annotated[
+        bool,
+        typer.Option("--progress", help='Print byte progress, speed and ETA while downloading.')
+    ] = False
 
 ):
 
     print("\nYouTube Downloader - College Project\n")
 
+    urls = list(urls or [])
+    if batch_file:
+        urls.extend(read_batch_file(batch_file))
+    if not urls:
+        typer.echo("Error: Missing argument 'URLS...'. Pass one or more URLs or --batch-file.", err=True)
+        raise typer.Exit(code=2)
+
+    if audio_policy and audio_policy not in AUDIO_POLICIES:
+        raise typer.BadParameter(f"choose from {', '.join(AUDIO_POLICIES)}", param_hint="'--audio-policy'")
+    download_options = {'audio_policy': audio_policy} if audio_policy else {}
+    if progress:
+        download_options['on_progress'] = print_progress
+
     verify_ffmpeg(validate_install)
+
+    if len(urls) > 1 or batch_file:
+        setup_directories()
+        downloader = load_downloader()()
+        format = 'mp3' if audio_only else 'mp4'
+        results = download_batch(downloader, urls, jobs, format=format, resolution=resolution, bitrate=audio_only,
+                                 output_dir=output_dir, max_workers=workers, sync=sync, **download_options)
+        print_summary(results)
+        if any(status != 'ok' for _, status, _, _ in results):
+            raise typer.Exit(code=1)
+        return
+
+    url = urls[0]
     
     # Catch Invalid Video URL
-    if not url.startswith(('https://www.youtube.com/', 'https://youtu.be/')):
+    if not is_youtube_url(url):
         raise ValueError(f"Error: {url} is not a valid YouTube URL.")
 
     setup_directories()
     
-    downloader = YouTubeDownloader()
+    downloader = load_downloader()()
     
     # Check if this is a playlist
     if downloader.is_playlist_url(url):
@@ -52,7 +112,7 @@ def main(
         if playlist_info:
             print(f"Playlist: {playlist_info['title']}")
             print(f"Uploader: {playlist_info['uploader']}")
-            print(f"Videos in playlist: {playlist_info['video_count']}")
+            print(f"Videos in playlist: {playlist_info['video_count'] if playlist_info['video_count'] is not None else 'unknown'}")
             print()
         
         # How we are tracking the status
@@ -61,7 +121,9 @@ def main(
         
         print("Starting playlist download...")
         format = 'mp3' if audio_only else 'mp4'
-        success = downloader.download(url, format=format, resolution=resolution, bitrate=audio_only, output_dir=output_dir, progress_callback=progress_callback)
+        success = downloader.download(url, format=format, resolution=resolution, bitrate=audio_only, output_dir=output_dir, progress_callback=progress_callback, max_workers=workers, sync=sync, **download_options)
+        if sync and success:
+            print(f"Skipped {success.summary['skipped']} already downloaded, fetched {success.summary['fetched']}.")
     else:
         print(f"Getting video information...")
         info = downloader.get_video_info(url)
@@ -77,30 +139,88 @@ def main(
         
         print("Starting download...")
         format = 'mp3' if audio_only else 'mp4'
-        success = downloader.download(url, format=format, resolution=resolution, bitrate=audio_only, output_dir=output_dir)
+        success = downloader.download(url, format=format, resolution=resolution, bitrate=audio_only, output_dir=output_dir, **download_options)
     
     if success:
         print("Download completed!")
     else:
         raise Exception("Error: Download failed.")
+
+def load_downloader() -> 'type[YouTubeDownloader]':
+    """The YouTubeDownloader class, importing yt-dlp the first time it is needed."""
+    global YouTubeDownloader
+    if YouTubeDownloader is None:
+        from src.youtube_downloader import YouTubeDownloader
+    return YouTubeDownloader
+
+def is_youtube_url(url: str) -> bool:
+    return url.startswith(('https://www.youtube.com/', 'https://youtu.be/'))
+
+def print_progress(event: dict) -> None:
+    typer.echo(f"  {format_progress(event)}")
+
+def read_batch_file(path: str) -> List[str]:
+    """URLs listed in ``path`` (or stdin for ``-``), skipping blank lines and # comments."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        try:
+            with open(path, encoding='utf-8') as batch:
+                lines = batch.read().splitlines()
+        except OSError as e:
+            raise typer.BadParameter(str(e), param_hint="'--batch-file'")
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def download_batch(
+    downloader: 'YouTubeDownloader',
+    urls: List[str],
+    jobs: int,
+    **options
+    ) -> List[Tuple[str, str, str, float]]:
+    """Download every URL with one shared downloader, ``jobs`` at a time.
+
+    Returns one (url, status, detail, seconds) row per URL, in input order.
+    """
+    def download_one(url: str) -> Tuple[str, str, str, float]:
+        started = time.monotonic()
+        if not is_youtube_url(url):
+            return url, 'invalid', 'not a YouTube URL', 0.0
+        try:
+            result = downloader.download(url, **options)
+        except Exception as e:
+            return url, 'failed', str(e), time.monotonic() - started
+        elapsed = time.monotonic() - started
+        if not result:
+            return url, 'failed', getattr(result, 'error', None) or 'download failed', elapsed
+        files = getattr(result, 'files', [])
+        return url, 'ok', f"{len(files)} file(s)", elapsed
+
+    print(f"Downloading {len(urls)} URLs ({jobs} at a time)...")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(download_one, urls))
+
+def print_summary(results: List[Tuple[str, str, str, float]]) -> None:
+    url_width = min(max(len(url) for url, _, _, _ in results), 60)
+    print()
+    print(f"{'URL':<{url_width}}  {'STATUS':<8}  {'TIME':>7}  DETAIL")
+    for url, status, detail, elapsed in results:
+        print(f"{url[:url_width]:<{url_width}}  {status:<8}  {elapsed:>6.1f}s  {detail}")
+    failed = sum(1 for _, status, _, _ in results if status != 'ok')
+    print(f"\n{len(results) - failed}/{len(results)} succeeded.")
       
 def verify_ffmpeg(validate_install):
-    ffmpeg_path = shutil.which('ffmpeg')
-    if not ffmpeg_path:
+    # Runs before setup_directories, so nothing is written under downloads/ yet
+    capabilities = probe_ffmpeg(persist=False)
+    if capabilities is None:
         raise Exception(f"Error: FFmpeg is not installed.\n")
 
-    verified = subprocess.run(
-            [ffmpeg_path, '-version'],
-            capture_output=True,
-            text=True,
-            timeout=3
-        )
-    
-    if not verified:
+    if not capabilities.ok:
         raise Exception(f"Error: FFmpeg validation failed.\n")
     
     if validate_install != None:
-        print(f"FFmpeg Install Verified.\n")
+        print(f"FFmpeg Install Verified: version {capabilities.version} at {capabilities.path}")
+        print(f"  {len(capabilities.encoders)} encoders, {len(capabilities.muxers)} muxers, "
+              f"{len(capabilities.filters)} filters, hardware acceleration: {', '.join(capabilities.hwaccels) or 'none'}\n")
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
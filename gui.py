@@ -1,24 +1,18 @@
-from flask import Flask, render_template, request, jsonify
-import threading
-from typing import Optional
-import shutil
-import subprocess
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+import json
 from src.youtube_downloader import YouTubeDownloader
-from src.config import setup_directories
-from pathlib import Path
+from src.download_result import DownloadResult
+from src.config import setup_directories, PLAYLIST_MAX_WORKERS, MAX_CONCURRENT_JOBS, EVENT_STREAM_KEEPALIVE
+from src.jobs import Job, JobManager
+from src.history import HistoryIndex, HISTORY_SORT_COLUMNS, HISTORY_EXTENSIONS
+from src.ffmpeg_probe import probe_ffmpeg
+from src.metrics import REGISTRY, Registry, QUEUE_DEPTH, ACTIVE_WORKERS
+from typing import Optional
 app = Flask(__name__)
 
 setup_directories()
 downloader = YouTubeDownloader()
-download_status = {
-    'in_progress': False,
-    'messages': [],
-    'current_video': None,
-    'is_playlist': False,
-    'playlist_info': None,
-    'current_video_index': 0,
-    'total_videos': 0
-}
+history_index = HistoryIndex(downloader.output_dir / '.cache' / 'history.sqlite3')
 
 @app.route('/')
 def index():
@@ -26,26 +20,11 @@ def index():
 
 @app.get('/api/verify-ffmpeg')
 def verify_ffmpeg():
-    ffmpeg_path = shutil.which('ffmpeg')
-    if not ffmpeg_path:
-        return jsonify({'ok': False}), 200
-
-    try:
-        completed = subprocess.run(
-            [ffmpeg_path, '-version'],
-            capture_output=True,
-            text=True,
-            timeout=3
-        )
-        return jsonify({'ok': completed.returncode == 0}), 200
-    except Exception:
-        return jsonify({'ok': False}), 200
+    capabilities = probe_ffmpeg()
+    return jsonify({'ok': capabilities is not None and capabilities.ok}), 200
 
 @app.route('/download', methods=['POST'])
 def download():
-    if download_status['in_progress']:
-        return jsonify({'error': 'Download already in progress'}), 400
-
     url = request.form.get('url', '').strip()
 
     selected_format = (request.form.get('format', 'mp3') or 'mp3').strip().lower()
@@ -53,6 +32,7 @@ def download():
     bitrate = (request.form.get('bitrate', 'best') or 'best').strip()
 
     custom_directory = request.form.get('custom_directory', '').strip() or None
+    sync = request.form.get('sync', '').strip().lower() in ('1', 'true', 'on')
 
     if not url:
         return jsonify({'error': 'Please enter a YouTube URL'}), 400
@@ -69,58 +49,130 @@ def download():
     if selected_format == 'mp3' and bitrate not in ('best', '320', '256', '192', '160', '128', '96'):
         return jsonify({'error': 'Invalid bitrate selection'}), 400
 
-    download_status['messages'] = []
-    download_status['in_progress'] = True
-    download_status['current_video'] = None
-    download_status['is_playlist'] = False
-    download_status['playlist_info'] = None
-    download_status['current_video_index'] = 0
-    download_status['total_videos'] = 0
-
-    thread = threading.Thread(
-        target=download_worker,
-        args=(url, selected_format, resolution, bitrate, custom_directory)
-    )
-    thread.daemon = True
-    thread.start()
+    job = Job(url, selected_format, resolution, bitrate, custom_directory, sync)
+    job_manager.submit(job)
 
-    return jsonify({'success': 'Download started'})
+    return jsonify({'success': 'Download started', 'job_id': job.id})
 
 @app.route('/status')
 def status():
-    return jsonify(download_status)
+    """Status of the most recently submitted job.
+
+    Pass the previous response's ``next_since`` as ``?since=`` to receive only new messages.
+    """
+    job = job_manager.latest()
+    if not job:
+        return jsonify({
+            'in_progress': False,
+            'messages': [],
+            'next_since': 0,
+            'current_video': None,
+            'is_playlist': False,
+            'playlist_info': None,
+            'current_video_index': 0,
+            'total_videos': 0
+        })
+    return jsonify(job.to_dict(since=request.args.get('since', type=int)))
+
+@app.get('/jobs')
+def list_jobs():
+    return jsonify({
+        'jobs': [job.to_dict() for job in job_manager.jobs()],
+        'queue_depth': job_manager.queue_depth,
+        'active_workers': job_manager.active_workers
+    })
+
+@app.get('/jobs/<job_id>')
+def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict(since=request.args.get('since', type=int)))
+
+def _sse(
+    event: str,
+    data: dict,
+    event_id: int
+    ) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get('/jobs/<job_id>/events')
+def job_events(job_id: str):
+    """Stream a job's progress as Server-Sent Events until it finishes.
+
+    A fresh subscriber first gets a ``snapshot`` with the full status, then only
+    the changes: ``message``, ``status``, ``progress`` and ``state`` events. A
+    reconnecting client resumes from its ``Last-Event-ID`` (or ``?since=``).
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
 
-def add_message(
-    message: str
-    ) -> None:
-    download_status['messages'].append(message)
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    cursor = int(cursor) if cursor and cursor.isdigit() else None
+
+    def stream():
+        since = cursor
+        if since is None:
+            snapshot = job.to_dict()
+            since = snapshot['last_event_id']
+            yield _sse('snapshot', snapshot, since)
+        while True:
+            events, complete = job.wait_for_events(since, timeout=EVENT_STREAM_KEEPALIVE)
+            if not complete:
+                snapshot = job.to_dict()
+                since = snapshot['last_event_id']
+                yield _sse('snapshot', snapshot, since)
+                continue
+            for event_id, event, data in events:
+                yield _sse(event, data, event_id)
+                since = event_id
+            if not job.in_progress and since >= job.last_event_id:
+                yield _sse('end', {'state': job.state}, since)
+                return
+            if not events:
+                yield ": keepalive\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.post('/jobs/<job_id>/cancel')
+def cancel_job(job_id: str):
+    if not job_manager.get(job_id):
+        return jsonify({'error': 'Unknown job'}), 404
+    if not job_manager.cancel(job_id):
+        return jsonify({'error': 'Job already finished'}), 400
+    return jsonify({'success': 'Cancellation requested'})
 
 def download_worker(
-    url: str, 
-    selected_format: str, 
-    resolution: str, 
-    bitrate: str, 
-    custom_directory: Optional[str] = None
-    ) -> None:
+    job: Job
+    ) -> bool:
+    url = job.url
+    selected_format = job.options['format']
+    resolution = job.options['resolution']
+    bitrate = job.options['bitrate']
+    custom_directory = job.options['custom_directory']
+    sync = job.options['sync']
+    add_message = job.add_message
     try:
         # Check if this is a playlist
         if downloader.is_playlist_url(url):
-            download_status['is_playlist'] = True
+            job.update(is_playlist=True)
             add_message("Getting playlist information...")
             
             playlist_info = downloader.get_playlist_info(url)
             if playlist_info:
-                download_status['playlist_info'] = playlist_info
-                download_status['total_videos'] = playlist_info['video_count']
+                job.update(playlist_info=playlist_info, total_videos=playlist_info['video_count'] or 0)
                 add_message(f"Playlist: {playlist_info['title']}")
                 add_message(f"Uploader: {playlist_info['uploader']}")
-                add_message(f"Videos in playlist: {playlist_info['video_count']}")
+                add_message(f"Videos in playlist: {playlist_info['video_count'] if playlist_info['video_count'] is not None else 'unknown'}")
                 add_message("")
             
             # Enable tracking for GUI
             def progress_callback(current: int, total: int, video_title: str) -> None:
-                download_status['current_video_index'] = current
-                download_status['total_videos'] = total
+                job.update(current_video_index=current, total_videos=total)
                 add_message(f"Downloading video {current}/{total}: {video_title}")
             
             add_message("Starting playlist download...")
@@ -130,15 +182,27 @@ def download_worker(
                 resolution=resolution,
                 bitrate=bitrate,
                 output_dir=custom_directory,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                max_workers=PLAYLIST_MAX_WORKERS,
+                sync=sync,
+                cancel_event=job.cancel_event,
+                on_progress=job.set_progress
             )
+            if success and sync:
+                add_message(f"Skipped {success.summary['skipped']} already downloaded, fetched {success.summary['fetched']}.")
+            if isinstance(success, DownloadResult):
+                if success.summary.get('retried'):
+                    add_message(f"Retried {success.summary['retried']} videos with fallback options.")
+                for entry in success.entries:
+                    if not entry['success']:
+                        add_message(f"Abandoned: {entry['title']} ({entry['error']})")
         else:
             # Not downloading a playlist
             add_message("Getting video information...")
             info = downloader.get_video_info(url)
 
             if info:
-                download_status['current_video'] = info
+                job.update(current_video=info)
                 add_message(f"Title: {info['title']}")
                 add_message(f"Uploader: {info['uploader']}")
                 if info['duration']:
@@ -153,51 +217,79 @@ def download_worker(
                 format=selected_format,
                 resolution=resolution,
                 bitrate=bitrate,
-                output_dir=custom_directory
+                output_dir=custom_directory,
+                cancel_event=job.cancel_event,
+                on_progress=job.set_progress
             )
 
+        if job.cancelled:
+            return False
+
+        for path in success.files if isinstance(success, DownloadResult) else []:
+            history_index.record(path, video_id=success.video_ids.get(path), job_id=job.id)
+
         if success:
-            if download_status['is_playlist']:
+            if job.get('is_playlist'):
                 if custom_directory:
-                    add_message(f"Playlist download completed and copied to: {custom_directory}")
+                    add_message(f"Playlist download completed and saved to: {custom_directory}")
                 else:
                     add_message("Playlist download completed!")
             else:
                 if custom_directory:
-                    add_message(f"Download completed and copied to: {custom_directory}")
+                    add_message(f"Download completed and saved to: {custom_directory}")
                 else:
                     add_message("Download completed!")
         else:
-            if download_status['is_playlist']:
+            if job.get('is_playlist'):
                 add_message("Playlist download failed.")
             else:
                 add_message("Download failed.")
+        return bool(success)
 
     except Exception as e:
         add_message(f"Error: {str(e)}")
+        return False
+
+job_manager = JobManager(download_worker, workers=MAX_CONCURRENT_JOBS)
+QUEUE_DEPTH.set_function(lambda: job_manager.queue_depth)
+ACTIVE_WORKERS.set_function(lambda: job_manager.active_workers)
+
+def get_download_history(
+    page: int = 1,
+    per_page: int = 50,
+    format: Optional[str] = None,
+    sort: str = 'downloaded',
+    order: str = 'desc'
+    ):
+    """One page of the history index, after picking up files added to or removed from the download directories."""
+    # Custom destinations are indexed too; each costs one stat unless it changed
+    for directory in {downloader.output_dir.resolve(), *history_index.directories()}:
+        history_index.reconcile(directory)
+    return history_index.query(page, per_page, format, sort, order)
 
-    finally:
-        download_status['in_progress'] = False  
-
-def get_download_history():
-    downloads_path = Path("downloads")
-    if not downloads_path.exists():
-        return []
-    
-    files = []
-    for file_path in downloads_path.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in ['.mp4', '.mp3']:
-            files.append({
-                'filename': file_path.name,
-                'format': file_path.suffix[1:].upper(),
-                'size': file_path.stat().st_size,
-                'downloaded': file_path.stat().st_mtime
-            })
-    print(files)
-    return sorted(files, key=lambda x: x['downloaded'], reverse=True)
 @app.route('/history')
 def history():
-    return jsonify({'history': get_download_history()})
+    page = request.args.get('page', 1, type=int)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+    file_format = (request.args.get('format') or '').strip().lower() or None
+    sort = request.args.get('sort', 'downloaded')
+    order = request.args.get('order', 'desc')
+
+    if file_format and f'.{file_format}' not in HISTORY_EXTENSIONS:
+        return jsonify({'error': 'Invalid format filter'}), 400
+    if sort not in HISTORY_SORT_COLUMNS:
+        return jsonify({'error': 'Invalid sort option'}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'Invalid sort order'}), 400
+
+    entries, total = get_download_history(page, per_page, file_format, sort, order)
+    return jsonify({'history': entries, 'total': total, 'page': page, 'per_page': per_page})
+
+@app.route('/metrics')
+def metrics():
+    """Download counters and latency histograms in the Prometheus text format."""
+    return Response(REGISTRY.render(), content_type=Registry.CONTENT_TYPE)
+
 def main() -> None:
     """Entry point for the GUI application."""
     app.run(debug=False, host='0.0.0.0', port=5000)
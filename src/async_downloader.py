@@ -0,0 +1,221 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Deque, Generator
+
+from .config import ASYNC_LOOKUP_WORKERS, ASYNC_DOWNLOAD_WORKERS, ASYNC_MAX_PENDING_EVENTS
+from .download_result import DownloadResult
+from .youtube_downloader import YouTubeDownloader
+
+
+class DownloadTask:
+    """A download running on the download executor.
+
+    Iterate it with ``async for`` to receive its progress events, and await it
+    for the DownloadResult. Events are the byte-progress dicts described in
+    ProgressTracker, plus ``{'status': 'entry', 'current', 'total', 'title'}``
+    when a playlist moves on to its next video. At most ``max_pending`` events
+    wait for a slow reader: consecutive byte-progress events are coalesced into
+    the latest one, and beyond that the oldest events are dropped, so the
+    download thread never blocks on the consumer.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        cancel_event: threading.Event,
+        max_pending: int = ASYNC_MAX_PENDING_EVENTS
+        ) -> None:
+        self._loop = loop
+        self.cancel_event = cancel_event
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._done = False
+        self._future: 'Optional[asyncio.Future[DownloadResult]]' = None
+
+    def _start(
+        self,
+        future: 'asyncio.Future[DownloadResult]'
+        ) -> None:
+        self._future = future
+        future.add_done_callback(lambda _: self._finish())
+
+    def _finish(
+        self
+        ) -> None:
+        self._done = True
+        self._wakeup.set()
+
+    def _push(
+        self,
+        event: Dict[str, Any]
+        ) -> None:
+        """Queue ``event`` for the reader; runs on the event loop."""
+        if event.get('status') == 'downloading' and self._pending and self._pending[-1].get('status') == 'downloading':
+            self._pending[-1] = event
+        else:
+            self._pending.append(event)
+            if len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+        self._wakeup.set()
+
+    def publish(
+        self,
+        event: Dict[str, Any]
+        ) -> None:
+        """Hand ``event`` over from a worker thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._push, event)
+        except RuntimeError:
+            # The loop closed while the download was still running; nobody is listening
+            pass
+
+    def __aiter__(
+        self
+        ) -> 'DownloadTask':
+        return self
+
+    async def __anext__(
+        self
+        ) -> Dict[str, Any]:
+        # Events are handed over in order, so all of them are in once the download is done
+        while not self._pending:
+            if self._done:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._pending.popleft()
+
+    def __await__(
+        self
+        ) -> Generator[Any, None, DownloadResult]:
+        return self._result().__await__()
+
+    async def _result(
+        self
+        ) -> DownloadResult:
+        try:
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            # The thread keeps running until the downloader notices the event
+            self.cancel()
+            raise
+
+    def cancel(
+        self
+        ) -> None:
+        """Stop the download at its next progress update."""
+        self.cancel_event.set()
+
+    def done(
+        self
+        ) -> bool:
+        return self._done
+
+
+class AsyncYouTubeDownloader:
+    """Asyncio front end to YouTubeDownloader.
+
+    Blocking work runs on two bounded thread pools: ``lookup_workers`` threads
+    for metadata extraction and ``download_workers`` for downloads, so an async
+    server can have hundreds of lookups and tens of downloads in flight without
+    a thread per request; requests beyond the pool sizes wait their turn. Both
+    pools share one YouTubeDownloader, and with it the metadata cache, warm
+    yt-dlp sessions and rate limiter. A playlist still streaming its entries
+    when ``extract`` returns is extracted again by its download, since its
+    remaining pages belong to the lookup thread's yt-dlp instance.
+
+        async with AsyncYouTubeDownloader() as downloader:
+            info = await downloader.extract(url)
+            task = downloader.start_download(url, format='mp3')
+            async for event in task:
+                print(format_progress(event))
+            result = await task
+    """
+
+    def __init__(
+        self,
+        downloader: Optional[YouTubeDownloader] = None,
+        lookup_workers: int = ASYNC_LOOKUP_WORKERS,
+        download_workers: int = ASYNC_DOWNLOAD_WORKERS
+        ) -> None:
+        self.downloader = downloader or YouTubeDownloader()
+        self._lookups = ThreadPoolExecutor(max_workers=lookup_workers, thread_name_prefix='lookup')
+        self._downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix='download')
+
+    async def extract(
+        self,
+        url: str
+        ) -> Optional[Dict[str, Any]]:
+        """Video or playlist information for ``url`` (see get_video_info and get_playlist_info)."""
+        if self.downloader.is_playlist_url(url):
+            lookup = self.downloader.get_playlist_info
+        else:
+            lookup = self.downloader.get_video_info
+        return await asyncio.get_running_loop().run_in_executor(self._lookups, lookup, url)
+
+    def start_download(
+        self,
+        url: str,
+        **options: Any
+        ) -> DownloadTask:
+        """Queue a download of ``url`` and return its task right away.
+
+        ``options`` are those of YouTubeDownloader.download. ``cancel_event``,
+        ``on_progress`` and ``progress_callback`` may be given as well; they are
+        called from the download thread in addition to feeding the task's events.
+        """
+        loop = asyncio.get_running_loop()
+        cancel_event = options.pop('cancel_event', None) or threading.Event()
+        task = DownloadTask(loop, cancel_event)
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = options.pop('on_progress', None)
+        progress_callback: Optional[Callable[[int, int, str], None]] = options.pop('progress_callback', None)
+
+        def progress(event: Dict[str, Any]) -> None:
+            task.publish(event)
+            if on_progress is not None:
+                on_progress(event)
+
+        def entry(current: int, total: int, title: str) -> None:
+            task.publish({'status': 'entry', 'current': current, 'total': total, 'title': title})
+            if progress_callback is not None:
+                progress_callback(current, total, title)
+
+        call = partial(
+            self.downloader.download, url, cancel_event=cancel_event, on_progress=progress,
+            progress_callback=entry, **options
+        )
+        task._start(loop.run_in_executor(self._downloads, call))
+        return task
+
+    async def download(
+        self,
+        url: str,
+        **options: Any
+        ) -> DownloadResult:
+        """Download ``url`` and return its DownloadResult; cancelling the await stops the download."""
+        return await self.start_download(url, **options)
+
+    async def aclose(
+        self
+        ) -> None:
+        """Wait for running work to finish and release the thread pools."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._lookups.shutdown, wait=True))
+        await loop.run_in_executor(None, partial(self._downloads.shutdown, wait=True))
+
+    async def __aenter__(
+        self
+        ) -> 'AsyncYouTubeDownloader':
+        return self
+
+    async def __aexit__(
+        self,
+        *exc_info: Any
+        ) -> None:
+        await self.aclose()
@@ -0,0 +1,384 @@
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Iterable, Union
+
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import DownloadError
+
+from .config import (
+    EXTRACTOR_BACKEND, SYNTHETIC_LATENCY, SYNTHETIC_BANDWIDTH, SYNTHETIC_MEDIA_SIZE,
+    SYNTHETIC_POSTPROCESS_TIME, SYNTHETIC_FAILURE_RATE, SYNTHETIC_THROTTLE_RATE, SYNTHETIC_PLAYLIST_SIZE,
+    SYNTHETIC_SEED
+)
+from .ratelimit import AdaptiveRateLimiter, shared_rate_limiter, record_outcome
+from .session import YoutubeDLSession
+
+
+class Backend(ABC):
+    """Where YouTubeDownloader sends its extraction, download and post-processing work.
+
+    ``use(opts, *postprocessors)`` is a context manager yielding a handle that
+    takes yt-dlp options and offers the part of the ``YoutubeDL`` API the
+    downloader relies on: ``extract_info(url, download=True, process=True)``,
+    ``process_ie_result(info, download=True)`` and ``download(urls)``. The
+    handle calls the ``progress_hooks``, ``postprocessor_hooks`` and
+    ``match_filter`` in ``opts``, runs ``postprocessors`` on every finished
+    file, and honours ``ignoreerrors``. The outcome of each call is reported
+    to ``rate_limiter``.
+
+    ``produces_media`` tells whether the files written are real media that
+    ffmpeg can convert.
+    """
+
+    name = ''
+    produces_media = True
+    rate_limiter: AdaptiveRateLimiter
+
+    @abstractmethod
+    def use(
+        self,
+        opts: Dict[str, Any],
+        *postprocessors: PostProcessor
+        ) -> Any:
+        """Context manager yielding a handle configured with ``opts``."""
+
+    def reap(
+        self
+        ) -> int:
+        """Release what threads that have exited left behind; returns how much was released."""
+        return 0
+
+    def close(
+        self
+        ) -> None:
+        pass
+
+
+class YtDlpBackend(YoutubeDLSession, Backend):
+    """The real thing: pooled ``yt_dlp.YoutubeDL`` instances (see YoutubeDLSession)."""
+
+    name = 'yt-dlp'
+
+
+class _SyntheticYoutubeDL:
+    """The handle yielded by SyntheticBackend.use, for one set of options."""
+
+    def __init__(
+        self,
+        backend: 'SyntheticBackend',
+        opts: Dict[str, Any],
+        postprocessors: List[PostProcessor]
+        ) -> None:
+        self.backend = backend
+        self.params = opts
+        self.postprocessors = postprocessors
+        self.errors: List[DownloadError] = []
+        self._retcode = 0
+
+    def _report(
+        self,
+        error: Exception,
+        stage: str
+        ) -> None:
+        """Raise ``error`` unless ``ignoreerrors`` covers this stage, as YoutubeDL does."""
+        ignore = self.params.get('ignoreerrors')
+        if ignore is True or (ignore == 'only_download' and stage == 'download'):
+            self._retcode = 1
+            self.errors.append(error)
+            return
+        raise error
+
+    def extract_info(
+        self,
+        url: str,
+        download: bool = True,
+        process: bool = True
+        ) -> Optional[Dict[str, Any]]:
+        try:
+            info = self.backend.extract(url, self.params)
+        except DownloadError as e:
+            self._report(e, 'extract')
+            return None
+        if not process:
+            return info
+        return self.process_ie_result(info, download=download)
+
+    def process_ie_result(
+        self,
+        info: Dict[str, Any],
+        download: bool = True
+        ) -> Optional[Dict[str, Any]]:
+        if info.get('_type') == 'playlist':
+            entries = []
+            for entry in info.get('entries') or []:
+                if entry:
+                    entries.append(self.extract_info(entry['url'], download=download))
+            return dict(info, entries=entries)
+        if info.get('_type') == 'url':
+            return self.extract_info(info['url'], download=download)
+        if download:
+            try:
+                return self.backend.download(info, self.params, self.postprocessors)
+            except DownloadError as e:
+                self._report(e, 'download')
+                return None
+        return info
+
+    def download(
+        self,
+        urls: Iterable[str]
+        ) -> int:
+        for url in urls:
+            self.extract_info(url, download=True)
+        return self._retcode
+
+
+class SyntheticBackend(Backend):
+    """In-process stand-in for YouTube, for load tests and offline runs.
+
+    Any URL is accepted. URLs with a ``list=`` parameter are playlists of
+    ``playlist_size`` videos, and the video ID comes from ``v=``, a youtu.be
+    link or the last path segment. Each extraction takes ``latency`` seconds,
+    downloads write ``media_size`` bytes paced to ``bandwidth`` bytes per
+    second, and an audio conversion requested through ``FFmpegExtractAudio``
+    takes ``postprocess_time`` seconds. Extractions are throttled (HTTP 429)
+    with probability ``throttle_rate`` and downloads fail with probability
+    ``failure_rate``; both draws come from a generator seeded with ``seed``,
+    so a single-threaded run is reproducible.
+
+    The files written hold placeholder bytes rather than media.
+    """
+
+    name = 'synthetic'
+    produces_media = False
+
+    _CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        latency: float = SYNTHETIC_LATENCY,
+        bandwidth: Optional[float] = SYNTHETIC_BANDWIDTH,
+        media_size: int = SYNTHETIC_MEDIA_SIZE,
+        postprocess_time: float = SYNTHETIC_POSTPROCESS_TIME,
+        failure_rate: float = SYNTHETIC_FAILURE_RATE,
+        throttle_rate: float = SYNTHETIC_THROTTLE_RATE,
+        playlist_size: int = SYNTHETIC_PLAYLIST_SIZE,
+        seed: Optional[int] = SYNTHETIC_SEED,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+        ) -> None:
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.media_size = media_size
+        self.postprocess_time = postprocess_time
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self.playlist_size = playlist_size
+        self.rate_limiter = rate_limiter or shared_rate_limiter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {'extract': 0, 'download': 0, 'throttled': 0, 'failed': 0}
+
+    @contextmanager
+    def use(
+        self,
+        opts: Dict[str, Any],
+        *postprocessors: PostProcessor
+        ) -> Iterator[_SyntheticYoutubeDL]:
+        handle = _SyntheticYoutubeDL(self, opts, list(postprocessors))
+        try:
+            yield handle
+        except BaseException as e:
+            self.rate_limiter.record_failure(e)
+            raise
+        else:
+            record_outcome(self.rate_limiter, handle.errors)
+
+    def _draw(
+        self,
+        counter: str,
+        rate: float
+        ) -> bool:
+        """Count a call under ``counter`` and whether it hits a ``rate`` chance."""
+        with self._lock:
+            self.calls[counter] += 1
+            return rate > 0 and self._random.random() < rate
+
+    @staticmethod
+    def _video_id(
+        url: str
+        ) -> str:
+        match = re.search(r'[?&]v=([\w-]+)', url) or re.search(r'youtu\.be/([\w-]+)', url)
+        if match:
+            return match.group(1)
+        return url.rstrip('/').rsplit('/', 1)[-1].split('?')[0] or 'video'
+
+    def _video_info(
+        self,
+        video_id: str,
+        opts: Dict[str, Any]
+        ) -> Dict[str, Any]:
+        audio = str(opts.get('format', '')).startswith('bestaudio')
+        return {
+            '_type': 'video',
+            'id': video_id,
+            'title': f"Synthetic video {video_id}",
+            'uploader': 'Synthetic Uploader',
+            'duration': 180,
+            'ext': 'm4a' if audio else 'mp4',
+            'webpage_url': f"https://www.youtube.com/watch?v={video_id}",
+            'extractor': 'youtube',
+        }
+
+    def extract(
+        self,
+        url: str,
+        opts: Dict[str, Any]
+        ) -> Dict[str, Any]:
+        """Metadata for ``url``: a video, or a playlist of flat entries."""
+        if self.latency:
+            time.sleep(self.latency)
+        if self._draw('extract', self.throttle_rate):
+            with self._lock:
+                self.calls['throttled'] += 1
+            raise DownloadError("ERROR: [youtube] Unable to download API page: HTTP Error 429: Too Many Requests")
+
+        playlist = re.search(r'[?&]list=([\w-]+)', url)
+        if playlist and not (opts.get('noplaylist') and re.search(r'[?&]v=', url)):
+            playlist_id = playlist.group(1)
+            entries = []
+            for index in range(1, self.playlist_size + 1):
+                video_id = f"{playlist_id[:6]}{index:05d}"
+                entries.append({
+                    '_type': 'url',
+                    'ie_key': 'Youtube',
+                    'id': video_id,
+                    'url': f"https://www.youtube.com/watch?v={video_id}",
+                    'title': f"Synthetic video {video_id}",
+                    'duration': 180,
+                })
+            return {
+                '_type': 'playlist',
+                'id': playlist_id,
+                'title': f"Synthetic playlist {playlist_id}",
+                'uploader': 'Synthetic Uploader',
+                'playlist_count': len(entries),
+                'webpage_url': url,
+                'entries': entries,
+            }
+        return self._video_info(self._video_id(url), opts)
+
+    @staticmethod
+    def _output_path(
+        opts: Dict[str, Any],
+        info: Dict[str, Any]
+        ) -> Path:
+        template: Union[str, Dict[str, str]] = opts.get('outtmpl') or '%(title)s.%(ext)s'
+        if isinstance(template, dict):
+            template = template.get('default') or '%(title)s.%(ext)s'
+
+        class _Fields(dict):
+            def __missing__(self, key: str) -> str:
+                return 'NA'
+
+        return Path(template % _Fields(info))
+
+    def download(
+        self,
+        info: Dict[str, Any],
+        opts: Dict[str, Any],
+        postprocessors: List[PostProcessor]
+        ) -> Dict[str, Any]:
+        """Write the file for a video ``info``, post-process it and return the final info."""
+        match_filter = opts.get('match_filter')
+        if match_filter is not None and match_filter(info, incomplete=False):
+            return info
+        if self._draw('download', self.failure_rate):
+            with self._lock:
+                self.calls['failed'] += 1
+            raise DownloadError(f"ERROR: [youtube] {info['id']}: Unable to download video data: HTTP Error 500: Internal Server Error")
+
+        path = self._output_path(opts, info)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = path.with_name(f"{path.name}.part")
+        hooks = list(opts.get('progress_hooks') or [])
+        chunk = bytes(self._CHUNK_SIZE)
+        started = time.monotonic()
+        written = 0
+        with open(part_path, 'wb') as media_file:
+            while written < self.media_size:
+                size = min(self._CHUNK_SIZE, self.media_size - written)
+                media_file.write(chunk[:size])
+                written += size
+                elapsed = time.monotonic() - started
+                if self.bandwidth:
+                    ahead = written / self.bandwidth - elapsed
+                    if ahead > 0:
+                        time.sleep(ahead)
+                        elapsed += ahead
+                speed = written / elapsed if elapsed > 0 else None
+                for hook in hooks:
+                    hook({
+                        'status': 'downloading', 'filename': str(path), 'tmpfilename': str(part_path),
+                        'downloaded_bytes': written, 'total_bytes': self.media_size, 'speed': speed,
+                        'eta': int((self.media_size - written) / speed) if speed else None,
+                        'elapsed': elapsed, 'info_dict': info,
+                    })
+        part_path.replace(path)
+        for hook in hooks:
+            hook({
+                'status': 'finished', 'filename': str(path), 'downloaded_bytes': written,
+                'total_bytes': self.media_size, 'elapsed': time.monotonic() - started, 'info_dict': info,
+            })
+
+        info = dict(info, filepath=str(path))
+        for spec in opts.get('postprocessors') or []:
+            if spec.get('key') == 'FFmpegExtractAudio':
+                info = self._extract_audio(info, spec, opts)
+        for pp in postprocessors:
+            _, info = pp.run(info)
+        return info
+
+    def _extract_audio(
+        self,
+        info: Dict[str, Any],
+        spec: Dict[str, Any],
+        opts: Dict[str, Any]
+        ) -> Dict[str, Any]:
+        """Simulate FFmpegExtractAudio: take ``postprocess_time`` and rename to the target codec."""
+        hooks = list(opts.get('postprocessor_hooks') or [])
+        for hook in hooks:
+            hook({'status': 'started', 'postprocessor': 'ExtractAudio', 'info_dict': info})
+        if self.postprocess_time:
+            time.sleep(self.postprocess_time)
+        codec = spec.get('preferredcodec') or 'best'
+        # A single codec converts; 'best' and remux mappings such as m4a>m4a/... keep the source
+        if re.fullmatch(r'\w+', codec) and codec != 'best' and codec != info['ext']:
+            source = Path(info['filepath'])
+            dest = source.with_suffix(f'.{codec}')
+            source.replace(dest)
+            info = dict(info, ext=codec, filepath=str(dest))
+        for hook in hooks:
+            hook({'status': 'finished', 'postprocessor': 'ExtractAudio', 'info_dict': info})
+        return info
+
+
+BACKENDS = {
+    YtDlpBackend.name: YtDlpBackend,
+    SyntheticBackend.name: SyntheticBackend,
+}
+
+
+def create_backend(
+    name: Optional[str] = None,
+    **options: Any
+    ) -> Backend:
+    """Build the backend registered as ``name``, by default the one picked by EXTRACTOR_BACKEND."""
+    name = name or EXTRACTOR_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extractor backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
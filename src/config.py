@@ -1,7 +1,58 @@
+import os
 from pathlib import Path
 
 DOWNLOADS_DIR = Path("downloads")
 DEFAULT_FORMAT = "mp4"
+# Number of playlist entries downloaded in parallel by the web interface
+PLAYLIST_MAX_WORKERS = 4
+# Number of jobs the web interface downloads at the same time
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", "2"))
+# Seconds between keep-alive comments on an idle progress event stream
+EVENT_STREAM_KEEPALIVE = 15
+# Extraction results are reused for this many seconds; 0 disables the metadata cache
+METADATA_CACHE_TTL = 60 * 60
+METADATA_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# How MP3 mode treats the source audio: mp3 (always re-encode), best-native (never
+# re-encode) or auto (re-encode only when the bitrate or container requires it)
+AUDIO_POLICY = "mp3"
+AUDIO_POLICIES = ("mp3", "best-native", "auto")
+# ffmpeg processes converting playlist audio to MP3 alongside downloads; 0 uses one per CPU core
+TRANSCODE_WORKERS = 0
+# Requests per second to YouTube shared by all downloads, the burst allowed before
+# pacing starts, and the floor the rate backs off to when YouTube throttles
+RATE_LIMIT_RATE = 2.0
+RATE_LIMIT_BURST = 5
+RATE_LIMIT_MIN_RATE = 0.05
+# Seconds between byte-progress updates sent to a download's progress callback
+PROGRESS_INTERVAL = 0.5
+# ffmpeg capabilities (version, codecs, muxers, filters) probed once per binary and cached here
+FFMPEG_PROBE_CACHE = DOWNLOADS_DIR / ".cache" / "ffmpeg.json"
+# Backend doing the extraction and downloads: yt-dlp, or synthetic to load-test offline
+EXTRACTOR_BACKEND = os.environ.get("EXTRACTOR_BACKEND", "yt-dlp")
+# Behaviour of the synthetic backend: seconds per extraction, bytes per second per download
+# (0 is unlimited), bytes per file, seconds per audio conversion, chance that a download
+# fails or an extraction is throttled, videos per playlist, and the seed for those chances
+SYNTHETIC_LATENCY = float(os.environ.get("SYNTHETIC_LATENCY", "0.2"))
+SYNTHETIC_BANDWIDTH = float(os.environ.get("SYNTHETIC_BANDWIDTH", str(8 * 1024 * 1024)))
+SYNTHETIC_MEDIA_SIZE = int(os.environ.get("SYNTHETIC_MEDIA_SIZE", str(4 * 1024 * 1024)))
+SYNTHETIC_POSTPROCESS_TIME = float(os.environ.get("SYNTHETIC_POSTPROCESS_TIME", "0.5"))
+SYNTHETIC_FAILURE_RATE = float(os.environ.get("SYNTHETIC_FAILURE_RATE", "0"))
+SYNTHETIC_THROTTLE_RATE = float(os.environ.get("SYNTHETIC_THROTTLE_RATE", "0"))
+SYNTHETIC_PLAYLIST_SIZE = int(os.environ.get("SYNTHETIC_PLAYLIST_SIZE", "10"))
+SYNTHETIC_SEED = int(os.environ.get("SYNTHETIC_SEED", "0"))
+# Threads the asyncio API runs blocking work on: metadata lookups, and downloads;
+# further requests wait for a free thread instead of starting one each
+ASYNC_LOOKUP_WORKERS = int(os.environ.get("ASYNC_LOOKUP_WORKERS", "32"))
+ASYNC_DOWNLOAD_WORKERS = int(os.environ.get("ASYNC_DOWNLOAD_WORKERS", "8"))
+# Progress events held for a slow async reader before the oldest are dropped
+ASYNC_MAX_PENDING_EVENTS = 1000
+# Warm YoutubeDL instances kept per thread, one per option profile; 0 disables reuse
+SESSION_MAX_INSTANCES = 8
+# How finished files reach a custom output directory: auto, move, hardlink, reflink or copy
+DELIVERY_STRATEGY = "auto"
+# Download into DOWNLOADS_DIR first and deliver to the custom directory afterwards,
+# instead of writing straight into it
+STAGE_DOWNLOADS = False
 
 
 def setup_directories():
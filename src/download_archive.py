@@ -0,0 +1,53 @@
+import threading
+from pathlib import Path
+from typing import Set
+
+
+class DownloadArchive:
+    """Record of completed video IDs, stored in yt-dlp's ``--download-archive`` format.
+
+    Each line holds ``<extractor> <video id>``, so the same file can be handed to
+    yt-dlp directly. IDs are loaded once and new ones are appended as they finish.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        extractor: str = 'youtube'
+        ) -> None:
+        self.path = Path(path)
+        self.extractor = extractor
+        self._lock = threading.Lock()
+        self._ids: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[0] == self.extractor:
+                        self._ids.add(parts[1])
+
+    def __contains__(
+        self,
+        video_id: object
+        ) -> bool:
+        with self._lock:
+            return video_id in self._ids
+
+    def __len__(
+        self
+        ) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def add(
+        self,
+        video_id: str
+        ) -> None:
+        """Record ``video_id`` as downloaded."""
+        with self._lock:
+            if not video_id or video_id in self._ids:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as archive_file:
+                archive_file.write(f"{self.extractor} {video_id}\n")
+            self._ids.add(video_id)
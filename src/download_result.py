@@ -0,0 +1,54 @@
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+
+class DownloadResult:
+    """Outcome of a download job.
+
+    ``files`` holds the final output paths reported by yt-dlp, ``video_ids`` the
+    source video of each of those paths, ``entries`` the per-video results of a
+    playlist job and ``summary`` its counts. The result
+    is truthy when the job succeeded, so it can be used like the bool it replaces.
+    """
+
+    def __init__(
+        self,
+        success: bool = False,
+        files: Optional[List[Path]] = None,
+        entries: Optional[List[Dict[str, Any]]] = None,
+        summary: Optional[Dict[str, int]] = None,
+        error: Optional[str] = None,
+        video_ids: Optional[Dict[Path, str]] = None
+        ) -> None:
+        self.success = success
+        self.files = files if files is not None else []
+        self.entries = entries if entries is not None else []
+        self.summary = summary if summary is not None else {}
+        self.error = error
+        self.video_ids = video_ids if video_ids is not None else {}
+
+    def __bool__(
+        self
+        ) -> bool:
+        return self.success
+
+    def __repr__(
+        self
+        ) -> str:
+        return f"DownloadResult(success={self.success}, files={len(self.files)}, entries={len(self.entries)})"
+
+    def to_dict(
+        self
+        ) -> Dict[str, Any]:
+        """JSON-friendly representation of the result."""
+        return {
+            'success': self.success,
+            'files': [str(path) for path in self.files],
+            'video_ids': {str(path): video_id for path, video_id in self.video_ids.items()},
+            'entries': [
+                {**entry, 'files': [str(path) for path in entry.get('files', [])]}
+                for entry in self.entries
+            ],
+            'summary': dict(self.summary),
+            'error': self.error,
+        }
@@ -0,0 +1,236 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from .config import FFMPEG_PROBE_CACHE
+
+# Seconds each ffmpeg listing command may take before the probe gives up on it
+PROBE_TIMEOUT = 10
+
+
+class FFmpegCapabilities:
+    """What an ffmpeg binary can do: its version, codecs, muxers, filters and hardware accelerators."""
+
+    def __init__(
+        self,
+        path: str,
+        version: Optional[str],
+        encoders: List[str],
+        decoders: List[str],
+        muxers: List[str],
+        filters: List[str],
+        hwaccels: List[str]
+        ) -> None:
+        self.path = path
+        self.version = version
+        self.encoders = encoders
+        self.decoders = decoders
+        self.muxers = muxers
+        self.filters = filters
+        self.hwaccels = hwaccels
+
+    @property
+    def ok(
+        self
+        ) -> bool:
+        """Whether ``ffmpeg -version`` ran successfully."""
+        return self.version is not None
+
+    def has_encoder(
+        self,
+        name: str
+        ) -> bool:
+        return name in self.encoders
+
+    def has_muxer(
+        self,
+        name: str
+        ) -> bool:
+        return name in self.muxers
+
+    def has_filter(
+        self,
+        name: str
+        ) -> bool:
+        return name in self.filters
+
+    def to_dict(
+        self
+        ) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'version': self.version,
+            'encoders': self.encoders,
+            'decoders': self.decoders,
+            'muxers': self.muxers,
+            'filters': self.filters,
+            'hwaccels': self.hwaccels,
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any]
+        ) -> 'FFmpegCapabilities':
+        return cls(
+            data['path'], data.get('version'), data.get('encoders', []), data.get('decoders', []),
+            data.get('muxers', []), data.get('filters', []), data.get('hwaccels', [])
+        )
+
+
+def _run(
+    ffmpeg_path: str,
+    *args: str
+    ) -> Optional[str]:
+    """Output of ``ffmpeg -hide_banner <args>``, or None if it failed."""
+    try:
+        completed = subprocess.run(
+            [ffmpeg_path, '-hide_banner', *args],
+            capture_output=True,
+            text=True,
+            timeout=PROBE_TIMEOUT
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout
+
+
+def _parse_version(
+    output: Optional[str]
+    ) -> Optional[str]:
+    """Version from the first line of ``ffmpeg -version``, e.g. ``ffmpeg version 6.1.1 Copyright ...``."""
+    if not output:
+        return None
+    words = output.split()
+    return words[2] if len(words) > 2 and words[:2] == ['ffmpeg', 'version'] else 'unknown'
+
+
+def _parse_table(
+    output: Optional[str]
+    ) -> List[str]:
+    """Names from a ``-encoders``, ``-decoders`` or ``-muxers`` listing: ``<flags> <name> <description>`` rows below a dashed line."""
+    names: List[str] = []
+    in_table = False
+    for line in (output or '').splitlines():
+        if not in_table:
+            in_table = line.strip().startswith('--')
+            continue
+        fields = line.split()
+        if len(fields) >= 2:
+            # Muxers list aliases as a comma-separated name, e.g. mov,mp4,m4a
+            names.extend(fields[1].split(','))
+    return sorted(set(names))
+
+
+def _parse_filters(
+    output: Optional[str]
+    ) -> List[str]:
+    """Names from ``-filters`` rows such as `` TSC volume  A->A  Change input volume.``"""
+    names = set()
+    for line in (output or '').splitlines():
+        fields = line.split()
+        if len(fields) >= 3 and '->' in fields[2]:
+            names.add(fields[1])
+    return sorted(names)
+
+
+def _parse_hwaccels(
+    output: Optional[str]
+    ) -> List[str]:
+    lines = [line.strip() for line in (output or '').splitlines()]
+    return [line for line in lines if line and not line.endswith(':')]
+
+
+def _probe(
+    ffmpeg_path: str
+    ) -> FFmpegCapabilities:
+    """Run the ffmpeg listing commands and collect their results."""
+    return FFmpegCapabilities(
+        path=ffmpeg_path,
+        version=_parse_version(_run(ffmpeg_path, '-version')),
+        encoders=_parse_table(_run(ffmpeg_path, '-encoders')),
+        decoders=_parse_table(_run(ffmpeg_path, '-decoders')),
+        muxers=_parse_table(_run(ffmpeg_path, '-muxers')),
+        filters=_parse_filters(_run(ffmpeg_path, '-filters')),
+        hwaccels=_parse_hwaccels(_run(ffmpeg_path, '-hwaccels')),
+    )
+
+
+_lock = threading.Lock()
+_probed: Dict[Tuple[str, int], FFmpegCapabilities] = {}
+
+
+def _read_cache(
+    cache_path: Path
+    ) -> Dict[str, Any]:
+    try:
+        with open(cache_path, encoding='utf-8') as cache_file:
+            data = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache(
+    cache_path: Path,
+    data: Dict[str, Any]
+    ) -> None:
+    tmp_path = cache_path.with_name(f".{cache_path.name}.part")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+            json.dump(data, cache_file)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not cache FFmpeg capabilities: {str(e)}")
+
+
+def probe_ffmpeg(
+    ffmpeg_path: Optional[str] = None,
+    cache_path: Optional[Path] = None,
+    refresh: bool = False,
+    persist: bool = True
+    ) -> Optional[FFmpegCapabilities]:
+    """Capabilities of ``ffmpeg_path`` (default: ffmpeg on PATH), or None if there is no such binary.
+
+    Results are cached in memory and in ``cache_path`` (default: FFMPEG_PROBE_CACHE),
+    keyed by the binary's resolved path and modification time, so ffmpeg only
+    runs again after it was replaced or upgraded, or when ``refresh`` is set.
+    With ``persist`` unset a fresh probe is kept in memory only, for callers
+    that run before the downloads directory is set up.
+    """
+    ffmpeg_path = ffmpeg_path or shutil.which('ffmpeg')
+    if not ffmpeg_path:
+        return None
+    try:
+        resolved = str(Path(ffmpeg_path).resolve())
+        mtime = os.stat(resolved).st_mtime_ns
+    except OSError:
+        return None
+    cache_path = Path(cache_path or FFMPEG_PROBE_CACHE)
+    key = (resolved, mtime)
+
+    with _lock:
+        if not refresh:
+            if key in _probed:
+                return _probed[key]
+            cached = _read_cache(cache_path).get(resolved)
+            if cached and cached.get('mtime') == mtime:
+                capabilities = FFmpegCapabilities.from_dict(cached['capabilities'])
+                _probed[key] = capabilities
+                return capabilities
+
+        capabilities = _probe(ffmpeg_path)
+        _probed[key] = capabilities
+        # A binary that failed to run is probed again next process rather than remembered as broken
+        if capabilities.ok and persist:
+            data = _read_cache(cache_path)
+            data[resolved] = {'mtime': mtime, 'capabilities': capabilities.to_dict()}
+            _write_cache(cache_path, data)
+        return capabilities
@@ -0,0 +1,225 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+HISTORY_EXTENSIONS = ('.mp4', '.mp3', '.m4a', '.opus', '.ogg')
+HISTORY_SORT_COLUMNS = {
+    'downloaded': 'mtime',
+    'size': 'size',
+    'filename': 'filename COLLATE NOCASE',
+}
+
+
+class HistoryIndex:
+    """SQLite index of downloaded files backing the history view.
+
+    Completed downloads are recorded as they finish, with the source video and
+    job IDs. ``reconcile`` brings a directory's rows in line with the files on
+    disk, but only rescans when the directory's own mtime has changed since the
+    last scan, so repeated history requests cost a single ``stat`` per directory.
+    """
+
+    def __init__(
+        self,
+        path: Path
+        ) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS downloads ('
+                'path TEXT PRIMARY KEY, '
+                'directory TEXT NOT NULL, '
+                'filename TEXT NOT NULL, '
+                'format TEXT NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'mtime REAL NOT NULL, '
+                'video_id TEXT, '
+                'job_id TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS downloads_mtime ON downloads (mtime)')
+            conn.execute('CREATE INDEX IF NOT EXISTS downloads_format ON downloads (format, mtime)')
+            conn.execute('CREATE INDEX IF NOT EXISTS downloads_directory ON downloads (directory)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS scans ('
+                'directory TEXT PRIMARY KEY, '
+                'mtime REAL NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(
+        self
+        ) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(
+        path: Path,
+        stat: os.stat_result,
+        video_id: Optional[str] = None,
+        job_id: Optional[str] = None
+        ) -> Tuple[Any, ...]:
+        return (
+            str(path), str(path.parent), path.name, path.suffix[1:].upper(),
+            stat.st_size, stat.st_mtime, video_id, job_id
+        )
+
+    def record(
+        self,
+        path: Path,
+        video_id: Optional[str] = None,
+        job_id: Optional[str] = None
+        ) -> None:
+        """Add or refresh the entry for a finished download."""
+        path = Path(path).resolve()
+        try:
+            stat = path.stat()
+        except OSError as e:
+            print(f"History index skipped {path.name}: {str(e)}")
+            return
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO downloads '
+                    '(path, directory, filename, format, size, mtime, video_id, job_id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    self._row(path, stat, video_id, job_id)
+                )
+        except sqlite3.Error as e:
+            print(f"History index write failed: {str(e)}")
+
+    def reconcile(
+        self,
+        directory: Path
+        ) -> int:
+        """Sync the rows for ``directory`` with its files. Returns the number of rows changed.
+
+        Skipped when the directory mtime matches the last scan. Rows that were
+        recorded with a video or job ID keep them when the file is rescanned.
+        A directory that no longer exists loses all of its rows.
+        """
+        directory = Path(directory).resolve()
+        try:
+            dir_mtime = directory.stat().st_mtime
+        except FileNotFoundError:
+            return self._forget(directory)
+        except OSError:
+            return 0
+
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute('SELECT mtime FROM scans WHERE directory = ?', (str(directory),)).fetchone()
+                if row and row[0] == dir_mtime:
+                    return 0
+
+                known = {
+                    path: (size, mtime) for path, size, mtime in conn.execute(
+                        'SELECT path, size, mtime FROM downloads WHERE directory = ?', (str(directory),)
+                    )
+                }
+                changed = []
+                seen = set()
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in HISTORY_EXTENSIONS:
+                            continue
+                        stat = entry.stat()
+                        path = str(directory / entry.name)
+                        seen.add(path)
+                        if known.get(path) != (stat.st_size, stat.st_mtime):
+                            changed.append(self._row(Path(path), stat))
+
+                conn.executemany(
+                    'INSERT INTO downloads (path, directory, filename, format, size, mtime, video_id, job_id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime',
+                    changed
+                )
+                removed = [(path,) for path in known if path not in seen]
+                conn.executemany('DELETE FROM downloads WHERE path = ?', removed)
+                conn.execute(
+                    'INSERT OR REPLACE INTO scans (directory, mtime) VALUES (?, ?)',
+                    (str(directory), dir_mtime)
+                )
+                return len(changed) + len(removed)
+        except (sqlite3.Error, OSError) as e:
+            print(f"History index reconcile failed: {str(e)}")
+            return 0
+
+    def _forget(
+        self,
+        directory: Path
+        ) -> int:
+        """Drop the rows and scan record of ``directory``. Returns the number of rows removed."""
+        try:
+            with self._lock, self._connect() as conn:
+                removed = conn.execute('DELETE FROM downloads WHERE directory = ?', (str(directory),)).rowcount
+                conn.execute('DELETE FROM scans WHERE directory = ?', (str(directory),))
+                return removed
+        except sqlite3.Error as e:
+            print(f"History index reconcile failed: {str(e)}")
+            return 0
+
+    def directories(
+        self
+        ) -> List[Path]:
+        """Every directory holding indexed files, including custom download locations."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute('SELECT DISTINCT directory FROM downloads').fetchall()
+        return [Path(directory) for directory, in rows]
+
+    def query(
+        self,
+        page: int = 1,
+        per_page: int = 50,
+        format: Optional[str] = None,
+        sort: str = 'downloaded',
+        order: str = 'desc'
+        ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of entries and the total number of matching entries."""
+        if sort not in HISTORY_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort: {sort}")
+        direction = 'ASC' if order == 'asc' else 'DESC'
+        where = ''
+        params: List[Any] = []
+        if format:
+            where = 'WHERE format = ?'
+            params.append(format.upper())
+
+        page = max(1, page)
+        with self._lock, self._connect() as conn:
+            total = conn.execute(f'SELECT COUNT(*) FROM downloads {where}', params).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT filename, format, size, mtime, video_id, job_id FROM downloads {where} '
+                f'ORDER BY {HISTORY_SORT_COLUMNS[sort]} {direction}, path LIMIT ? OFFSET ?',
+                params + [per_page, (page - 1) * per_page]
+            ).fetchall()
+        return [
+            {
+                'filename': filename,
+                'format': file_format,
+                'size': size,
+                'downloaded': mtime,
+                'video_id': video_id,
+                'job_id': job_id,
+            }
+            for filename, file_format, size, mtime, video_id, job_id in rows
+        ], total
+
+    def clear(
+        self
+        ) -> None:
+        """Remove every entry and forget previous scans."""
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM downloads')
+            conn.execute('DELETE FROM scans')
@@ -0,0 +1,331 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+# Event tuples are (sequence number, event type, payload)
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+class Job:
+    """A queued download request with its own status and message log.
+
+    The handler running the job reports through ``add_message``, ``update`` and
+    ``set_progress``; ``to_dict`` returns the status shape served by the web
+    interface. Every change is also recorded as a numbered event in a bounded
+    buffer, which ``wait_for_events`` hands out incrementally to streaming clients.
+    Consecutive byte-progress events are coalesced, so a slow reader only ever
+    sees the latest one.
+
+    Messages are numbered from 0 and only the most recent ``max_messages`` are
+    kept, so memory stays flat however long the job runs. Pollers pass the
+    returned ``next_since`` back as ``to_dict(since=...)`` to get only new messages.
+    """
+
+    max_events = 1000
+    max_messages = 500
+
+    def __init__(
+        self,
+        url: str,
+        format: str = 'mp4',
+        resolution: str = '720',
+        bitrate: str = 'best',
+        custom_directory: Optional[str] = None,
+        sync: bool = False
+        ) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.options = {
+            'format': format,
+            'resolution': resolution,
+            'bitrate': bitrate,
+            'custom_directory': custom_directory,
+            'sync': sync,
+        }
+        self.state = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._seq = 0
+        self._evicted = 0
+        self._events: "deque[Event]" = deque(maxlen=self.max_events)
+        self._messages: "deque[str]" = deque(maxlen=self.max_messages)
+        self._message_count = 0
+        self._status: Dict[str, Any] = {
+            'current_video': None,
+            'is_playlist': False,
+            'playlist_info': None,
+            'current_video_index': 0,
+            'total_videos': 0,
+            'progress': None,
+        }
+
+    @property
+    def in_progress(
+        self
+        ) -> bool:
+        return self.state in ('queued', 'running')
+
+    @property
+    def cancelled(
+        self
+        ) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def last_event_id(
+        self
+        ) -> int:
+        with self._lock:
+            return self._seq
+
+    def _record(
+        self,
+        kind: str,
+        payload: Dict[str, Any]
+        ) -> None:
+        """Append an event and wake up waiting readers. Caller holds the lock."""
+        if kind == 'progress' and self._events and self._events[-1][1] == 'progress':
+            self._events.pop()
+        elif len(self._events) == self._events.maxlen:
+            self._evicted = self._events[0][0]
+        self._seq += 1
+        self._events.append((self._seq, kind, payload))
+        self._changed.notify_all()
+
+    def add_message(
+        self,
+        message: str
+        ) -> None:
+        with self._lock:
+            self._messages.append(message)
+            self._message_count += 1
+            self._record('message', {'message': message})
+
+    def update(
+        self,
+        **fields: Any
+        ) -> None:
+        """Update status fields such as ``current_video_index`` or ``playlist_info``."""
+        with self._lock:
+            self._status.update(fields)
+            self._record('status', dict(fields))
+
+    def set_progress(
+        self,
+        progress: Dict[str, Any]
+        ) -> None:
+        """Record byte-level progress of the file currently downloading."""
+        with self._lock:
+            self._status['progress'] = progress
+            self._record('progress', progress)
+
+    def set_state(
+        self,
+        state: str
+        ) -> None:
+        """Move the job to ``state``, stamping start and finish times."""
+        with self._lock:
+            self.state = state
+            if state == 'running':
+                self.started_at = time.time()
+            elif state in ('completed', 'failed', 'cancelled'):
+                self.finished_at = time.time()
+            self._record('state', {'state': state, 'in_progress': self.in_progress})
+
+    def wait_for_events(
+        self,
+        since: int,
+        timeout: Optional[float] = None
+        ) -> Tuple[List[Event], bool]:
+        """Events newer than ``since``, waiting up to ``timeout`` for the first one.
+
+        The flag is False when events after ``since`` have already dropped out of
+        the buffer, in which case the caller should resynchronise from ``to_dict``.
+        """
+        with self._changed:
+            if self._seq <= since and self.in_progress:
+                self._changed.wait(timeout)
+            events = [event for event in self._events if event[0] > since]
+            return events, since >= self._evicted
+
+    def get(
+        self,
+        field: str
+        ) -> Any:
+        with self._lock:
+            return self._status.get(field)
+
+    def cancel(
+        self
+        ) -> None:
+        self.cancel_event.set()
+
+    def to_dict(
+        self,
+        since: Optional[int] = None
+        ) -> Dict[str, Any]:
+        """Job status. With ``since``, ``messages`` only holds messages numbered ``since`` or later.
+
+        ``next_since`` is the cursor for the following call, and ``messages_dropped``
+        tells how many requested messages had already left the buffer.
+        """
+        with self._lock:
+            status = dict(self._status)
+            first = self._message_count - len(self._messages)
+            start = max(since or 0, first)
+            status['messages'] = list(self._messages)[start - first:]
+            status['next_since'] = self._message_count
+            status['messages_dropped'] = start - min(since or 0, start)
+            status['last_event_id'] = self._seq
+        status.update({
+            'id': self.id,
+            'url': self.url,
+            'state': self.state,
+            'in_progress': self.in_progress,
+            'options': dict(self.options),
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        })
+        return status
+
+
+class JobManager:
+    """Queue of download jobs served by a fixed pool of worker threads.
+
+    ``handler(job)`` does the work and returns a truthy value on success. Jobs
+    cancelled while queued never start; running jobs see ``job.cancel_event``
+    and are expected to stop at the next opportunity. Only the most recent
+    ``max_finished`` finished jobs are kept.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Job], Any],
+        workers: int = 2,
+        max_finished: int = 100
+        ) -> None:
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_finished = max_finished
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._active = 0
+
+    def _start_workers(
+        self
+        ) -> None:
+        """Start the worker threads on first use, so importing the app stays cheap."""
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"download-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(
+        self,
+        job: Job
+        ) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            self._start_workers()
+        self._queue.put(job)
+        return job
+
+    def get(
+        self,
+        job_id: str
+        ) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(
+        self
+        ) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def latest(
+        self
+        ) -> Optional[Job]:
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def cancel(
+        self,
+        job_id: str
+        ) -> bool:
+        """Request cancellation. Returns False for unknown or already finished jobs."""
+        job = self.get(job_id)
+        if not job or not job.in_progress:
+            return False
+        job.cancel()
+        with self._lock:
+            if job.state == 'queued':
+                job.set_state('cancelled')
+        job.add_message("Download cancelled.")
+        return True
+
+    @property
+    def queue_depth(
+        self
+        ) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.state == 'queued')
+
+    @property
+    def active_workers(
+        self
+        ) -> int:
+        with self._lock:
+            return self._active
+
+    def shutdown(
+        self
+        ) -> None:
+        """Stop the workers after the jobs already queued."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _prune(
+        self
+        ) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if not job.in_progress]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _work(
+        self
+        ) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.state != 'queued':
+                    continue
+                job.set_state('running')
+                self._active += 1
+            try:
+                success = self.handler(job)
+                state = 'cancelled' if job.cancelled else ('completed' if success else 'failed')
+            except Exception as e:
+                job.add_message(f"Error: {str(e)}")
+                state = 'cancelled' if job.cancelled else 'failed'
+            with self._lock:
+                job.set_state(state)
+                self._active -= 1
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator
+from .config import METADATA_CACHE_TTL, METADATA_CACHE_MAX_BYTES
+
+
+class MetadataCache:
+    """SQLite-backed cache of yt-dlp extraction results.
+
+    Entries are keyed by video or playlist ID plus a hash of the extractor
+    options that produced them. Entries older than ``ttl`` seconds are ignored,
+    and the least recently used entries are evicted once the stored JSON grows
+    past ``max_bytes``. Only unprocessed extractions are stored, without the
+    request headers and cookies yt-dlp attaches to them.
+    """
+
+    # Bumped when the stored info changes shape, so older entries are never served
+    _SCHEMA = 2
+    _PRIVATE_KEYS = ('http_headers', 'cookies')
+
+    _VIDEO_ID_PATTERNS = [
+        r'[?&]v=([\w-]{11})',
+        r'youtu\.be/([\w-]{11})',
+        r'/(?:shorts|embed|live)/([\w-]{11})',
+    ]
+    _PLAYLIST_ID_PATTERN = r'[?&]list=([\w-]+)'
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = METADATA_CACHE_TTL,
+        max_bytes: int = METADATA_CACHE_MAX_BYTES
+        ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS metadata ('
+                'key TEXT PRIMARY KEY, '
+                'info TEXT NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'created_at REAL NOT NULL, '
+                'accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS metadata_accessed ON metadata (accessed_at)')
+
+    @contextmanager
+    def _connect(
+        self
+        ) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @classmethod
+    def make_key(
+        cls,
+        url: str,
+        options: Dict[str, Any],
+        playlist: bool = False
+        ) -> str:
+        """Build a cache key from the media ID in ``url`` and the extractor options."""
+        media_id = None
+        if playlist:
+            match = re.search(cls._PLAYLIST_ID_PATTERN, url, re.IGNORECASE)
+            media_id = match.group(1) if match else None
+        else:
+            for pattern in cls._VIDEO_ID_PATTERNS:
+                match = re.search(pattern, url)
+                if match:
+                    media_id = match.group(1)
+                    break
+
+        kind = 'playlist' if playlist else 'video'
+        options_hash = hashlib.sha1(
+            json.dumps(options, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()[:16]
+        return f"{kind}:v{cls._SCHEMA}:{media_id or url}:{options_hash}"
+
+    @classmethod
+    def _strip_private(
+        cls,
+        value: Any
+        ) -> Any:
+        """``value`` without request headers and cookies, at any depth."""
+        if isinstance(value, dict):
+            return {key: cls._strip_private(item) for key, item in value.items() if key not in cls._PRIVATE_KEYS}
+        if isinstance(value, list):
+            return [cls._strip_private(item) for item in value]
+        return value
+
+    def get(
+        self,
+        key: str
+        ) -> Optional[Dict[str, Any]]:
+        """Return the cached info for ``key``, or None when missing or expired."""
+        if self.ttl <= 0:
+            return None
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    'SELECT info, created_at FROM metadata WHERE key = ?', (key,)
+                ).fetchone()
+                if not row:
+                    return None
+                if now - row[1] > self.ttl:
+                    conn.execute('DELETE FROM metadata WHERE key = ?', (key,))
+                    return None
+                conn.execute('UPDATE metadata SET accessed_at = ? WHERE key = ?', (now, key))
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Metadata cache read failed: {str(e)}")
+            return None
+
+    def set(
+        self,
+        key: str,
+        info: Dict[str, Any]
+        ) -> None:
+        """Store ``info`` under ``key`` and evict expired or excess entries."""
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        try:
+            data = json.dumps(self._strip_private(info), default=str)
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO metadata (key, info, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, data, len(data), now, now)
+                )
+                conn.execute('DELETE FROM metadata WHERE created_at < ?', (now - self.ttl,))
+                self._evict(conn)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Metadata cache write failed: {str(e)}")
+
+    def _evict(
+        self,
+        conn: sqlite3.Connection
+        ) -> None:
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM metadata').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute('SELECT key, size FROM metadata ORDER BY accessed_at ASC').fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM metadata WHERE key = ?', expired)
+
+    def clear(
+        self
+        ) -> None:
+        """Remove every cached entry."""
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM metadata')
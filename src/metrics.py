@@ -0,0 +1,284 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+# Seconds; covers quick metadata lookups up to long playlist downloads
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _format_labels(
+    labelnames: Tuple[str, ...],
+    values: Tuple[str, ...],
+    extra: Optional[Tuple[str, str]] = None
+    ) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(
+    value: float
+    ) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """A named metric with optional labels, rendered in the Prometheus text format."""
+
+    kind = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = ()
+        ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(
+        self,
+        labels: Dict[str, Any]
+        ) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(
+        self
+        ) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(
+        self
+        ) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = ()
+        ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(
+        self,
+        amount: float = 1,
+        **labels: Any
+        ) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(
+        self,
+        **labels: Any
+        ) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(
+        self
+        ) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Gauge(_Metric):
+    """Current value, either set directly or read from a function at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str
+        ) -> None:
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(
+        self,
+        value: float
+        ) -> None:
+        with self._lock:
+            self._value = value
+
+    def set_function(
+        self,
+        function: Optional[Callable[[], float]]
+        ) -> None:
+        with self._lock:
+            self._function = function
+
+    def value(
+        self
+        ) -> float:
+        with self._lock:
+            function, value = self._function, self._value
+        return function() if function is not None else value
+
+    def samples(
+        self
+        ) -> List[Tuple[str, str, float]]:
+        return [(self.name, '', self.value())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+        ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Per label set: bucket counts, sum, count
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(
+        self,
+        value: float,
+        **labels: Any
+        ) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(
+        self,
+        **labels: Any
+        ) -> Iterator[None]:
+        """Observe the duration of the enclosed block, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(
+        self,
+        **labels: Any
+        ) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def samples(
+        self
+        ) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            series = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        samples = []
+        for key, (counts, total, count) in series:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = ('le', _format_value(bound))
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, le), bucket_count))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), count))
+        return samples
+
+
+class Registry:
+    """Set of metrics rendered together for a /metrics scrape."""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(
+        self
+        ) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        metric: _Metric
+        ) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(
+        self
+        ) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+DOWNLOADS_STARTED = REGISTRY.register(Counter(
+    'ytdl_downloads_started_total', 'Downloads started, by kind (video or playlist).', ('kind',)))
+DOWNLOADS_SUCCEEDED = REGISTRY.register(Counter(
+    'ytdl_downloads_succeeded_total', 'Downloads that finished successfully, by kind.', ('kind',)))
+DOWNLOADS_FAILED = REGISTRY.register(Counter(
+    'ytdl_downloads_failed_total', 'Downloads that failed or were cancelled, by kind.', ('kind',)))
+FALLBACKS_USED = REGISTRY.register(Counter(
+    'ytdl_fallbacks_used_total', 'Downloads retried with the fallback options, by scope (video or playlist).', ('scope',)))
+BYTES_DOWNLOADED = REGISTRY.register(Counter(
+    'ytdl_downloaded_bytes_total', 'Size of the files produced by successful downloads.'))
+THROTTLED = REGISTRY.register(Counter(
+    'ytdl_throttled_total', 'Responses from YouTube treated as throttling by the rate limiter.'))
+EXTRACTION_SECONDS = REGISTRY.register(Histogram(
+    'ytdl_extraction_seconds', 'Time spent extracting video or playlist metadata.', ('kind',)))
+DOWNLOAD_SECONDS = REGISTRY.register(Histogram(
+    'ytdl_download_seconds', 'Duration of download calls, by kind.', ('kind',)))
+POSTPROCESS_SECONDS = REGISTRY.register(Histogram(
+    'ytdl_postprocess_seconds', 'Time spent in post processors and transcodes, by post processor.', ('postprocessor',)))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'ytdl_queue_depth', 'Download jobs waiting for a worker.'))
+ACTIVE_WORKERS = REGISTRY.register(Gauge(
+    'ytdl_active_workers', 'Workers currently running a download job.'))
+
+_postprocess_started = threading.local()
+
+
+def postprocessor_hook(
+    d: Dict[str, Any]
+    ) -> None:
+    """yt-dlp ``postprocessor_hooks`` entry timing each post processor run."""
+    name = d.get('postprocessor') or 'unknown'
+    started: Dict[str, float] = _postprocess_started.__dict__.setdefault('started', {})
+    if d.get('status') == 'started':
+        started[name] = time.perf_counter()
+    elif d.get('status') == 'finished' and name in started:
+        POSTPROCESS_SECONDS.observe(time.perf_counter() - started.pop(name), postprocessor=name)
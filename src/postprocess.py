@@ -0,0 +1,104 @@
+import atexit
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List
+
+from .config import TRANSCODE_WORKERS
+from .metrics import POSTPROCESS_SECONDS
+from .ffmpeg_probe import probe_ffmpeg
+
+
+class TranscodePool:
+    """Converts downloaded audio to MP3 on a pool of ffmpeg processes.
+
+    Downloads hand their source files to ``submit`` and move on to the next
+    entry while earlier files are still being encoded. Each worker thread only
+    supervises one ffmpeg process, so the encoding itself runs in parallel
+    across ``workers`` cores. The MP3 is written next to the source, which is
+    removed once the conversion succeeded, as yt-dlp's FFmpegExtractAudio does.
+    While its workers are running the pool is shut down at interpreter exit,
+    so conversions in progress finish instead of being abandoned.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        ffmpeg_path: Optional[str] = None
+        ) -> None:
+        self.workers = workers or TRANSCODE_WORKERS or os.cpu_count() or 1
+        self.ffmpeg_path = ffmpeg_path or shutil.which('ffmpeg')
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(
+        self
+        ) -> bool:
+        """Whether ffmpeg is installed, runs, and has an MP3 encoder."""
+        if self.ffmpeg_path is None:
+            return False
+        capabilities = probe_ffmpeg(self.ffmpeg_path)
+        return capabilities is not None and capabilities.ok and capabilities.has_encoder('libmp3lame')
+
+    def _command(
+        self,
+        source: Path,
+        dest: Path,
+        bitrate: Optional[str]
+        ) -> List[str]:
+        command = [self.ffmpeg_path, '-y', '-loglevel', 'error', '-i', str(source), '-vn', '-codec:a', 'libmp3lame']
+        if bitrate and bitrate != 'best':
+            command += ['-b:a', f'{bitrate}k']
+        return command + ['-f', 'mp3', str(dest)]
+
+    def transcode(
+        self,
+        source: Path,
+        bitrate: Optional[str] = None
+        ) -> Path:
+        """Convert ``source`` to MP3 in the calling thread and return the new path."""
+        source = Path(source)
+        if source.suffix.lower() == '.mp3':
+            return source
+        dest = source.with_suffix('.mp3')
+        tmp_path = dest.with_name(f".{dest.name}.part")
+        try:
+            with POSTPROCESS_SECONDS.time(postprocessor='Transcode'):
+                completed = subprocess.run(self._command(source, tmp_path, bitrate), capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed for {source.name}: {completed.stderr.strip()}")
+            os.replace(tmp_path, dest)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        source.unlink()
+        print(f"Transcoded: {dest.name}")
+        return dest
+
+    def submit(
+        self,
+        source: Path,
+        bitrate: Optional[str] = None
+        ) -> 'Future[Path]':
+        """Queue ``source`` for conversion; the future resolves to the MP3 path."""
+        # Playlist workers submit concurrently; they must all share one executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='transcode')
+                atexit.register(self.shutdown)
+            return self._executor.submit(self.transcode, source, bitrate)
+
+    def shutdown(
+        self,
+        wait: bool = True
+        ) -> None:
+        """Stop the workers, by default after the conversions already queued."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            atexit.unregister(self.shutdown)
+            executor.shutdown(wait=wait)
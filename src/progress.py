@@ -0,0 +1,141 @@
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Union
+
+from .config import PROGRESS_INTERVAL
+
+
+class ProgressTracker:
+    """Turns yt-dlp progress hooks into throttled byte-level progress events.
+
+    Every event describes the file that triggered it, with ``status``,
+    ``filename``, ``video_id``, ``downloaded_bytes``, ``total_bytes``,
+    ``speed`` (instantaneous), ``average_speed``, ``eta``, ``fragment_index``
+    and ``fragment_count``, and carries an ``aggregate`` dict over every file
+    of the download: ``downloaded_bytes``, ``total_bytes``, ``speed`` (sum of
+    the active files), ``average_speed`` (since the tracker was created),
+    ``eta``, ``files_finished``, ``files_active`` and ``elapsed``.
+
+    Updates are folded into the tracker's state on every hook call, but the
+    callback runs at most once per ``interval`` seconds, plus once for each
+    finished file, so a slow callback never holds up the download threads.
+    One tracker can be shared by the concurrent downloads of a playlist.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        interval: float = PROGRESS_INTERVAL
+        ) -> None:
+        self.callback = callback
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_emit: Optional[float] = None
+        self._active: Dict[str, Dict[str, Any]] = {}
+        self._finished_bytes = 0
+        self._files_finished = 0
+
+    @classmethod
+    def wrap(
+        cls,
+        on_progress: Union['ProgressTracker', Callable[[Dict[str, Any]], None], None]
+        ) -> Optional['ProgressTracker']:
+        """Return ``on_progress`` as a tracker, creating one for a plain callback."""
+        if on_progress is None or isinstance(on_progress, ProgressTracker):
+            return on_progress
+        return cls(on_progress)
+
+    def hook(
+        self,
+        d: Dict[str, Any]
+        ) -> None:
+        """yt-dlp progress hook."""
+        status = d.get('status')
+        if status not in ('downloading', 'finished'):
+            return
+        key = d.get('filename') or d.get('tmpfilename') or ''
+        downloaded = d.get('downloaded_bytes') or 0
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        now = time.monotonic()
+
+        with self._lock:
+            if status == 'finished':
+                self._active.pop(key, None)
+                self._finished_bytes += total or downloaded
+                self._files_finished += 1
+            else:
+                self._active[key] = {'downloaded': downloaded, 'total': total, 'speed': d.get('speed')}
+            if status == 'downloading' and self._last_emit is not None and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+            aggregate = self._aggregate(now)
+
+        elapsed = d.get('elapsed')
+        info = d.get('info_dict') or {}
+        self.callback({
+            'status': status,
+            'filename': Path(key).name if key else None,
+            'video_id': info.get('id'),
+            'downloaded_bytes': d.get('downloaded_bytes'),
+            'total_bytes': total,
+            'speed': d.get('speed'),
+            'average_speed': downloaded / elapsed if elapsed else None,
+            'eta': d.get('eta'),
+            'fragment_index': d.get('fragment_index'),
+            'fragment_count': d.get('fragment_count'),
+            'aggregate': aggregate,
+        })
+
+    def _aggregate(
+        self,
+        now: float
+        ) -> Dict[str, Any]:
+        downloaded = self._finished_bytes + sum(f['downloaded'] for f in self._active.values())
+        totals = [f['total'] for f in self._active.values()]
+        total = self._finished_bytes + sum(totals) if all(totals) else None
+        speeds = [f['speed'] for f in self._active.values() if f['speed']]
+        speed = sum(speeds) if speeds else None
+        elapsed = now - self._started
+        return {
+            'downloaded_bytes': downloaded,
+            'total_bytes': total,
+            'speed': speed,
+            'average_speed': downloaded / elapsed if elapsed > 0 else None,
+            'eta': int((total - downloaded) / speed) if total is not None and speed else None,
+            'files_finished': self._files_finished,
+            'files_active': len(self._active),
+            'elapsed': elapsed,
+        }
+
+
+def format_progress(
+    event: Dict[str, Any]
+    ) -> str:
+    """One-line summary of a progress event, for terminal output."""
+    def mb(value: Optional[float]) -> str:
+        return f"{(value or 0) / (1024 * 1024):.1f}"
+
+    parts = [event.get('filename') or 'download']
+    total = event.get('total_bytes')
+    done = event.get('downloaded_bytes')
+    if event.get('status') == 'finished':
+        parts.append(f"done, {mb(total or done)} MB")
+    else:
+        percent = f" ({int(100 * done / total)}%)" if done and total else ''
+        parts.append(f"{mb(done)}/{mb(total)} MB{percent}")
+        if event.get('speed'):
+            parts.append(f"{mb(event['speed'])} MB/s")
+        if event.get('eta') is not None:
+            parts.append(f"ETA {event['eta']}s")
+        if event.get('fragment_count'):
+            parts.append(f"fragment {event.get('fragment_index') or 0}/{event['fragment_count']}")
+
+    aggregate = event.get('aggregate') or {}
+    if aggregate.get('files_finished') or aggregate.get('files_active', 0) > 1:
+        overall = f"total {mb(aggregate.get('downloaded_bytes'))} MB"
+        if aggregate.get('average_speed'):
+            overall += f" at {mb(aggregate['average_speed'])} MB/s avg"
+        parts.append(overall)
+    return ' | '.join(parts)
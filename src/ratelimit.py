@@ -0,0 +1,148 @@
+import threading
+import time
+from typing import Optional, Dict, Any, Sequence
+
+from yt_dlp.utils import ExtractorError
+
+from .config import RATE_LIMIT_RATE, RATE_LIMIT_BURST, RATE_LIMIT_MIN_RATE
+from .metrics import THROTTLED
+
+# HTTP statuses YouTube answers with when it wants clients to slow down
+THROTTLE_STATUSES = (403, 429)
+THROTTLE_MESSAGES = ('HTTP Error 429', 'HTTP Error 403', 'Too Many Requests', 'rate-limit', 'not a bot')
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by every request to YouTube, with AIMD backoff.
+
+    Each video download or extraction takes one token. While YouTube accepts
+    requests the bucket refills at ``rate`` tokens per second with room for a
+    ``burst``, so normal use never sleeps. A throttling response (HTTP 429 or
+    403, or an unexpected extractor error) halves the rate and empties the
+    bucket, and every success adds ``increase`` back until ``max_rate`` is
+    reached again. All threads using one limiter share the same budget.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RATE,
+        burst: int = RATE_LIMIT_BURST,
+        min_rate: float = RATE_LIMIT_MIN_RATE,
+        increase: float = 0.1,
+        decrease: float = 0.5
+        ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(
+        self,
+        now: float
+        ) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(
+        self
+        ) -> float:
+        """Take one token, sleeping until one is available. Returns the time slept."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve the token now so waiting threads queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            print(f"Rate limited, waiting {wait:.1f}s")
+            time.sleep(wait)
+        return wait
+
+    def match_filter(
+        self,
+        info: Dict[str, Any],
+        incomplete: bool = False
+        ) -> None:
+        """yt-dlp ``match_filter`` that takes a token before each video is downloaded."""
+        if not incomplete:
+            self.acquire()
+        return None
+
+    def record_success(
+        self
+        ) -> None:
+        """Additive increase: let the rate recover after an accepted request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_failure(
+        self,
+        error: BaseException
+        ) -> bool:
+        """Multiplicative decrease when ``error`` means YouTube pushed back. Returns whether it did."""
+        if not self.is_throttled(error):
+            return False
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+        THROTTLED.inc()
+        print(f"Throttled by YouTube, slowing down to {self.rate:.2f} requests/s")
+        return True
+
+    @staticmethod
+    def is_throttled(
+        error: Optional[BaseException]
+        ) -> bool:
+        """Whether ``error``, or an error it wraps, is a throttling response."""
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            status = getattr(error, 'status', None) or getattr(error, 'code', None)
+            if status in THROTTLE_STATUSES:
+                return True
+            if isinstance(error, ExtractorError) and not error.expected:
+                return True
+            if any(message in str(error) for message in THROTTLE_MESSAGES):
+                return True
+            # yt-dlp's DownloadError keeps the original error in exc_info
+            exc_info = getattr(error, 'exc_info', None)
+            wrapped = exc_info[1] if exc_info else None
+            error = wrapped or error.__cause__ or error.__context__
+        return False
+
+
+_shared: Optional[AdaptiveRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(
+    ) -> AdaptiveRateLimiter:
+    """The limiter used by default, so every downloader in the process shares one budget."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AdaptiveRateLimiter()
+        return _shared
+
+
+def record_outcome(
+    rate_limiter: AdaptiveRateLimiter,
+    errors: Sequence[BaseException]
+    ) -> None:
+    """Report a call that returned normally, with the ``errors`` yt-dlp reported instead of raising.
+
+    Under ``ignoreerrors`` a throttled request does not raise, so the errors
+    are checked here: one throttling error backs off once, other errors leave
+    the rate alone, and only a call without errors counts as a success.
+    """
+    for error in errors:
+        if rate_limiter.record_failure(error):
+            return
+    if not errors:
+        rate_limiter.record_success()
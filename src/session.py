@@ -0,0 +1,215 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import yt_dlp
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import DownloadError
+
+from .config import SESSION_MAX_INSTANCES
+from .ratelimit import AdaptiveRateLimiter, shared_rate_limiter, record_outcome
+
+
+class _PostProcessorDispatcher(PostProcessor):
+    """Forwards finished files to the post processors of the call currently using the instance."""
+
+    def __init__(
+        self,
+        pooled: '_PooledInstance'
+        ) -> None:
+        super().__init__()
+        self.pooled = pooled
+
+    def run(
+        self,
+        info: Dict[str, Any]
+        ) -> Tuple[List[str], Dict[str, Any]]:
+        files_to_delete: List[str] = []
+        for pp in list(self.pooled.postprocessors):
+            delete, info = pp.run(info)
+            files_to_delete.extend(delete)
+        return files_to_delete, info
+
+
+class _PooledInstance:
+    """A warm YoutubeDL plus the per-call hooks and post processors it dispatches to."""
+
+    def __init__(
+        self,
+        opts: Dict[str, Any]
+        ) -> None:
+        self.hooks: List[Any] = []
+        self.postprocessors: List[PostProcessor] = []
+        self.errors: List[BaseException] = []
+        self.busy = False
+        pooled_opts = dict(opts)
+        pooled_opts['progress_hooks'] = [self._dispatch_progress]
+        self._context = yt_dlp.YoutubeDL(pooled_opts)
+        self.ydl = self._context.__enter__()
+        self.ydl.add_post_processor(_PostProcessorDispatcher(self), when='after_move')
+        self._trouble = self.ydl.trouble
+        self.ydl.trouble = self._record_trouble
+
+    def _record_trouble(
+        self,
+        message: Optional[str] = None,
+        tb: Optional[str] = None,
+        is_error: bool = True
+        ) -> None:
+        """Keep every error yt-dlp reports, including those ``ignoreerrors`` swallows."""
+        if is_error:
+            exc_info = sys.exc_info()
+            self.errors.append(DownloadError(message or '', exc_info if exc_info[0] else None))
+        self._trouble(message, tb, is_error)
+
+    def _dispatch_progress(
+        self,
+        d: Dict[str, Any]
+        ) -> None:
+        for hook in list(self.hooks):
+            hook(d)
+
+    def close(
+        self
+        ) -> None:
+        try:
+            self._context.__exit__(None, None, None)
+        except Exception as e:
+            print(f"Error closing downloader session: {str(e)}")
+
+
+class YoutubeDLSession:
+    """Keeps warm ``YoutubeDL`` instances, keyed by option profile, for reuse across calls.
+
+    Building a ``YoutubeDL`` loads the extractors, cookie jar and HTTP handlers;
+    reusing one keeps all of that, including open keep-alive connections. Each
+    thread gets its own instances, so concurrent jobs never share one, and each
+    thread keeps at most ``max_instances`` profiles, closing the least recently
+    used. Instances of threads that have exited, such as a finished playlist's
+    workers, are closed by ``reap``, which also runs whenever a new thread
+    first uses the session. ``progress_hooks`` are not part of the profile:
+    they, and the post processors passed to ``use``, apply only to the current
+    call. An instance whose call raised is closed rather than reused.
+
+    The outcome of every call is reported to ``rate_limiter``, by default the
+    one shared by the whole process, so throttling seen by any call slows all
+    of them down. Errors swallowed by ``ignoreerrors`` count too.
+    """
+
+    # Files written are real media that ffmpeg can convert
+    produces_media = True
+
+    def __init__(
+        self,
+        max_instances: int = SESSION_MAX_INSTANCES,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None
+        ) -> None:
+        self.max_instances = max_instances
+        self.rate_limiter = rate_limiter or shared_rate_limiter()
+        self._lock = threading.Lock()
+        # Held past the thread's exit, so reap can close what it left behind
+        self._pools: 'Dict[threading.Thread, OrderedDict[str, _PooledInstance]]' = {}
+
+    @staticmethod
+    def profile_key(
+        opts: Dict[str, Any]
+        ) -> str:
+        """Identify an option profile, ignoring per-call progress hooks."""
+        profile = {key: value for key, value in opts.items() if key != 'progress_hooks'}
+        return hashlib.sha1(json.dumps(profile, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+    def _instances(
+        self
+        ) -> 'OrderedDict[str, _PooledInstance]':
+        thread = threading.current_thread()
+        with self._lock:
+            instances = self._pools.get(thread)
+            if instances is not None:
+                return instances
+            instances = self._pools[thread] = OrderedDict()
+        self.reap()
+        return instances
+
+    def reap(
+        self
+        ) -> int:
+        """Close the instances of threads that have exited. Returns how many were closed."""
+        with self._lock:
+            finished = [thread for thread in self._pools if not thread.is_alive()]
+            closing = [pooled for thread in finished for pooled in self._pools.pop(thread).values()]
+        for pooled in closing:
+            pooled.close()
+        return len(closing)
+
+    def _acquire(
+        self,
+        key: str,
+        opts: Dict[str, Any]
+        ) -> Tuple[_PooledInstance, bool]:
+        """Return an idle instance for ``key`` and whether it belongs to the pool."""
+        instances = self._instances()
+        pooled = instances.get(key)
+        if pooled is not None and not pooled.busy:
+            instances.move_to_end(key)
+            return pooled, True
+        if pooled is not None or self.max_instances <= 0:
+            # Nested use of the same profile on one thread gets a private instance
+            return _PooledInstance(opts), False
+
+        pooled = _PooledInstance(opts)
+        instances[key] = pooled
+        while len(instances) > self.max_instances:
+            _, evicted = instances.popitem(last=False)
+            evicted.close()
+        return pooled, True
+
+    @contextmanager
+    def use(
+        self,
+        opts: Dict[str, Any],
+        *postprocessors: PostProcessor
+        ) -> Iterator[Any]:
+        """Yield a ``YoutubeDL`` configured with ``opts``.
+
+        ``postprocessors`` run after each file is moved to its final location,
+        for this call only.
+        """
+        key = self.profile_key(opts)
+        pooled, shared = self._acquire(key, opts)
+        pooled.busy = True
+        pooled.hooks = list(opts.get('progress_hooks') or [])
+        pooled.postprocessors = list(postprocessors)
+        pooled.errors = []
+        failed = False
+        try:
+            yield pooled.ydl
+        except BaseException as e:
+            failed = True
+            self.rate_limiter.record_failure(e)
+            raise
+        else:
+            record_outcome(self.rate_limiter, pooled.errors)
+        finally:
+            pooled.hooks = []
+            pooled.postprocessors = []
+            pooled.errors = []
+            pooled.busy = False
+            if shared and failed:
+                self._instances().pop(key, None)
+                pooled.close()
+            elif not shared:
+                pooled.close()
+
+    def close(
+        self
+        ) -> None:
+        """Close every pooled instance, on all threads."""
+        with self._lock:
+            instances = [pooled for pools in self._pools.values() for pooled in pools.values()]
+            self._pools = {}
+        for pooled in instances:
+            pooled.close()
@@ -1,11 +1,56 @@
-import yt_dlp
-import shutil
+from yt_dlp.postprocessor import PostProcessor
+from yt_dlp.utils import DownloadCancelled
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple, List, Callable
-from .config import DOWNLOADS_DIR, DEFAULT_FORMAT
+from typing import Optional, Dict, Any, Tuple, List, Callable, Union, Iterator
+from .config import DOWNLOADS_DIR, DEFAULT_FORMAT, DELIVERY_STRATEGY, STAGE_DOWNLOADS, AUDIO_POLICY, AUDIO_POLICIES
+from .metadata_cache import MetadataCache
+from .download_archive import DownloadArchive
+from .download_result import DownloadResult
+from .delivery import deliver_file
+from .session import YoutubeDLSession
+from .backends import Backend, create_backend
+from .postprocess import TranscodePool
+from .progress import ProgressTracker
+from .metrics import (
+    DOWNLOADS_STARTED, DOWNLOADS_SUCCEEDED, DOWNLOADS_FAILED, FALLBACKS_USED, BYTES_DOWNLOADED,
+    EXTRACTION_SECONDS, DOWNLOAD_SECONDS, postprocessor_hook
+)
 import re
 
+
+class _OutputCollector(PostProcessor):
+    """Records the final path of every file yt-dlp finishes, after all post-processing and moves.
+
+    Each path is also filed under its video ID and the URLs it was downloaded
+    from, so files can be matched to playlist entries that carry no ID.
+    """
+
+    def __init__(
+        self
+        ) -> None:
+        super().__init__()
+        self.files: List[Path] = []
+        self.video_ids: Dict[Path, str] = {}
+        self.source_urls: Dict[Path, List[str]] = {}
+
+    def run(
+        self, 
+        info: Dict[str, Any]
+        ) -> Tuple[List[str], Dict[str, Any]]:
+        filepath = info.get('filepath')
+        if filepath:
+            path = Path(filepath).resolve()
+            self.files.append(path)
+            if info.get('id'):
+                self.video_ids[path] = info['id']
+            self.source_urls[path] = list(dict.fromkeys(info[key] for key in ('original_url', 'webpage_url') if info.get(key)))
+        return [], info
+
+
 class YouTubeDownloader:
     # Common HTTP headers used across requests
     _COMMON_HEADERS = {
@@ -18,12 +63,73 @@ class YouTubeDownloader:
     _FALLBACK_HEADERS = {
         'User-Agent': 'com.google.android.youtube/19.02.39 (Linux; U; Android 11) gzip'
     }
+
+    # Number of info lookups kept around for the download that usually follows them
+    _MAX_PENDING_EXTRACTIONS = 16
     
     def __init__(
-        self
+        self,
+        metadata_cache: Optional[MetadataCache] = None,
+        delivery_strategy: str = DELIVERY_STRATEGY,
+        stage_downloads: bool = STAGE_DOWNLOADS,
+        session: Union[Backend, YoutubeDLSession, None] = None,
+        transcode_pool: Optional[TranscodePool] = None
         ) -> None:
         self.output_dir = DOWNLOADS_DIR
         self.output_dir.mkdir(exist_ok=True)
+        self.delivery_strategy = delivery_strategy
+        self.stage_downloads = stage_downloads
+        self.metadata_cache = metadata_cache or MetadataCache(self.output_dir / '.cache' / 'metadata.sqlite3')
+        self._extractions: OrderedDict = OrderedDict()
+        self._extractions_lock = threading.Lock()
+        # Extraction, downloads and post-processing go through the backend (see Backend)
+        self.session = session or create_backend()
+        self.transcode_pool = transcode_pool or TranscodePool()
+
+    def _cache_key(
+        self, 
+        url: str, 
+        ydl_opts: Dict[str, Any], 
+        playlist: bool = False
+        ) -> str:
+        """Metadata cache key for ``url`` under the extractor options in ``ydl_opts``."""
+        return MetadataCache.make_key(url, {'extractor_args': ydl_opts.get('extractor_args')}, playlist=playlist)
+
+    def _remember_extraction(
+        self, 
+        url: str, 
+        info: Dict[str, Any]
+        ) -> None:
+        """Keep a raw extraction result so the following download can reuse it.
+
+        A playlist whose entries are still streaming fetches its next pages with
+        the pooled instance of the thread that extracted it, so only that thread
+        may reuse it; other threads extract the playlist again.
+        """
+        owner = None if isinstance(info.get('entries', []), list) else threading.get_ident()
+        with self._extractions_lock:
+            self._extractions[url] = (owner, info)
+            self._extractions.move_to_end(url)
+            while len(self._extractions) > self._MAX_PENDING_EXTRACTIONS:
+                self._extractions.popitem(last=False)
+
+    def _peek_extraction(
+        self, 
+        url: str
+        ) -> Optional[Dict[str, Any]]:
+        """Return a remembered extraction result without consuming it."""
+        with self._extractions_lock:
+            owner, info = self._extractions.get(url, (None, None))
+        return info if owner in (None, threading.get_ident()) else None
+
+    def _take_extraction(
+        self, 
+        url: str
+        ) -> Optional[Dict[str, Any]]:
+        """Consume a remembered extraction result, if there is one this thread may use."""
+        with self._extractions_lock:
+            owner, info = self._extractions.pop(url, (None, None))
+        return info if owner in (None, threading.get_ident()) else None
     
     def is_playlist_url(
         self, 
@@ -37,45 +143,126 @@ class YouTubeDownloader:
         ]
         return any(re.search(pattern, url, re.IGNORECASE) for pattern in playlist_patterns)
     
+    def _extract_playlist(
+        self, 
+        url: str
+        ) -> Optional[Dict[str, Any]]:
+        """Extract a playlist without resolving its entries, following watch-page redirects.
+
+        Only the first page is fetched here. When the extractor pages its entries,
+        the returned ``entries`` is an iterator that fetches further pages as it
+        advances (see _stream_entries), so work can start before a large playlist
+        or channel has been listed in full.
+        """
+        ydl_opts = {
+            'quiet': True,
+            'retries': 5,
+            'socket_timeout': 30,
+            'http_headers': self._COMMON_HEADERS,
+            'extractor_args': {
+                'youtube': {
+                    'player_client': ['android', 'web'],
+                    'player_skip': ['configs'],
+                }
+            },
+            'ignoreerrors': True,
+            'extract_flat': True,
+            'noplaylist': False,
+        }
+        
+        cache_key = self._cache_key(url, ydl_opts, playlist=True)
+        cached = self.metadata_cache.get(cache_key)
+        if cached:
+            return cached
+        
+        self.session.rate_limiter.acquire()
+        with EXTRACTION_SECONDS.time(kind='playlist'), self.session.use(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            
+            if info and info.get('_type') == 'url' and 'playlist' in info.get('url', ''):
+                playlist_url = info.get('url')
+                print(f"Following playlist redirect to: {playlist_url}")
+                info = ydl.extract_info(playlist_url, download=False, process=False)
+        
+        if not info or 'entries' not in info:
+            return None
+        if isinstance(info['entries'], list):
+            self.metadata_cache.set(cache_key, info)
+            return info
+        return dict(info, entries=self._stream_entries(ydl_opts, cache_key, info))
+
+    def _stream_entries(
+        self,
+        ydl_opts: Dict[str, Any],
+        cache_key: str,
+        info: Dict[str, Any]
+        ) -> Iterator[Dict[str, Any]]:
+        """Iterate the paged entries of a playlist extracted by _extract_playlist.
+
+        The extractor keeps using the session's instance for each page. Once every
+        entry has been seen the playlist is cached like a fully extracted one.
+        """
+        seen = []
+        with self.session.use(ydl_opts):
+            for entry in info['entries']:
+                seen.append(entry)
+                yield entry
+        self.metadata_cache.set(cache_key, dict(info, entries=seen))
+
+    @staticmethod
+    def _playlist_count(
+        info: Dict[str, Any]
+        ) -> Optional[int]:
+        """Number of videos in a playlist from its metadata, or None while entries are still streaming."""
+        if info.get('playlist_count') is not None:
+            return info['playlist_count']
+        entries = info.get('entries')
+        return len(entries) if isinstance(entries, list) else None
+
+    def iter_playlist_entries(
+        self,
+        url: str
+        ) -> Iterator[Dict[str, Any]]:
+        """Yield a lightweight record for each video in a playlist, as its page arrives.
+
+        Records hold the ``id``, ``title``, ``url`` and ``duration`` of the video.
+        A playlist remembered by get_playlist_info is consumed rather than extracted
+        again.
+        """
+        info = self._take_extraction(url) or self._extract_playlist(url)
+        if not info:
+            return
+        for entry in info.get('entries') or []:
+            if entry:
+                yield {
+                    'id': entry.get('id'),
+                    'title': entry.get('title'),
+                    'url': self._entry_url(entry),
+                    'duration': entry.get('duration'),
+                }
+    
     def get_playlist_info(
         self, 
         url: str
         ) -> Optional[Dict[str, Any]]:
-        """Extract playlist information without downloading."""
+        """Extract playlist information without downloading.
+        
+        The raw result is remembered so a following download does not extract it again.
+        ``video_count`` comes from the playlist metadata and is None when the
+        extractor does not report it up front.
+        """
         try:
-            ydl_opts = {
-                'quiet': True,
-                'retries': 5,
-                'socket_timeout': 30,
-                'http_headers': self._COMMON_HEADERS,
-                'extractor_args': {
-                    'youtube': {
-                        'player_client': ['android', 'web'],
-                        'player_skip': ['configs'],
-                    }
-                },
-                'ignoreerrors': True,
-                'extract_flat': True,
-                'noplaylist': False,
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                if info and info.get('_type') == 'url' and 'playlist' in info.get('url', ''):
-                    playlist_url = info.get('url')
-                    print(f"Following playlist redirect to: {playlist_url}")
-                    info = ydl.extract_info(playlist_url, download=False)
-                
-                if info and 'entries' in info:
-                    return {
-                        'title': info.get('title', 'Unknown Playlist'),
-                        'uploader': info.get('uploader', 'Unknown'),
-                        'video_count': len(list(info.get('entries', []))),
-                        'id': info.get('id', 'unknown'),
-                        'webpage_url': info.get('webpage_url', url)
-                    }
-                return None
+            info = self._peek_extraction(url) or self._extract_playlist(url)
+            if info:
+                self._remember_extraction(url, info)
+                return {
+                    'title': info.get('title', 'Unknown Playlist'),
+                    'uploader': info.get('uploader', 'Unknown'),
+                    'video_count': self._playlist_count(info),
+                    'id': info.get('id', 'unknown'),
+                    'webpage_url': info.get('webpage_url', url)
+                }
+            return None
         except Exception as e:
             print(f"Error getting playlist info: {str(e)}")
             return None
@@ -86,8 +273,14 @@ class YouTubeDownloader:
         resolution: str = '720', 
         bitrate: str = 'best', 
         output_dir: Optional[str] = None, 
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
-        ) -> bool:
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_workers: int = 1,
+        info: Optional[Dict[str, Any]] = None,
+        sync: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        audio_policy: str = AUDIO_POLICY
+        ) -> DownloadResult:
         """Download an entire YouTube playlist with progress tracking.
         
         Args:
@@ -97,94 +290,472 @@ class YouTubeDownloader:
             bitrate: Audio bitrate for mp3 downloads
             output_dir: Optional custom output directory
             progress_callback: Optional callback function for progress updates (current, total, video_title)
+            max_workers: Number of videos to download at once. Values above 1 switch to
+                the concurrent engine, which downloads each entry separately.
+            info: Optional raw playlist extraction result to reuse instead of extracting again.
+                Results from a previous get_playlist_info call are reused automatically.
+            sync: Skip entries already recorded in the download archive for this
+                format and quality, and record new ones as they complete.
+            cancel_event: Optional event that stops the download when set.
+            on_progress: Optional callback receiving throttled byte-level progress,
+                per file and for the whole playlist (see ProgressTracker).
+            audio_policy: How MP3 mode treats the source audio: 'mp3', 'best-native'
+                or 'auto' (see _audio_options).
             
         Returns:
-            bool: True if all videos downloaded successfully, False otherwise
+            DownloadResult: truthy if all videos downloaded successfully, with the output files
         """
+        if audio_policy not in AUDIO_POLICIES:
+            raise ValueError(f"Unknown audio policy: {audio_policy}")
+        # One tracker for every entry, so the aggregate covers the whole playlist
+        on_progress = ProgressTracker.wrap(on_progress)
+        if info:
+            self._remember_extraction(url, info)
+
+        download_dir = self._download_dir(output_dir)
+        if download_dir is None:
+            return DownloadResult(error="Invalid destination path")
+
+        # Playlists converted to MP3 always take the entry engine so encoding overlaps with the next download
+        if max_workers > 1 or sync or self._defers_transcode(format, bitrate, audio_policy):
+            return self._download_playlist_entries(
+                url, format, resolution, bitrate, output_dir, progress_callback, max_workers, sync, cancel_event,
+                on_progress, audio_policy
+            )
+
         try:
-            downloads_path = Path(self.output_dir)
-            files_before = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-            
             playlist_info = self.get_playlist_info(url)
             if not playlist_info:
                 print("Failed to get playlist information")
-                return False
+                return DownloadResult(error="Failed to get playlist information")
                 
             print(f"Starting playlist download: {playlist_info['title']}")
-            print(f"Videos in playlist: {playlist_info['video_count']}")
+            print(f"Videos in playlist: {playlist_info['video_count'] if playlist_info['video_count'] is not None else 'unknown'}")
             
-            self.current_video_index = 0
-            self.total_videos = playlist_info['video_count']
-            self.current_video_title = ""
-            self.processed_videos = set()
+            # Progress state is local to this call so concurrent jobs can share the downloader
+            total_videos = playlist_info['video_count']
+            current_video_title = ""
+            processed_videos = set()
             
             def progress_hook(d):
+                nonlocal current_video_title
                 if d['status'] == 'downloading':
                     if 'info_dict' in d and d['info_dict']:
                         video_id = d['info_dict'].get('id', '')
                         video_title = d['info_dict'].get('title', 'Unknown Title')
                         
-                        if video_id and video_id not in self.processed_videos:
-                            self.processed_videos.add(video_id)
-                            self.current_video_index = len(self.processed_videos)
-                            self.current_video_title = video_title
+                        if video_id and video_id not in processed_videos:
+                            processed_videos.add(video_id)
+                            current_video_title = video_title
                             
                             if progress_callback:
-                                progress_callback(self.current_video_index, self.total_videos, self.current_video_title)
-                            print(f"Downloading video {self.current_video_index}/{self.total_videos}: {self.current_video_title}")
+                                progress_callback(len(processed_videos), total_videos or len(processed_videos), current_video_title)
+                            print(f"Downloading video {len(processed_videos)}/{total_videos or '?'}: {current_video_title}")
                     
                     elif 'filename' in d:
                         filename = Path(d['filename']).stem
-                        if filename != self.current_video_title and filename not in self.processed_videos:
-                            self.processed_videos.add(filename)
-                            self.current_video_index = len(self.processed_videos)
-                            self.current_video_title = filename
+                        if filename != current_video_title and filename not in processed_videos:
+                            processed_videos.add(filename)
+                            current_video_title = filename
                             
                             if progress_callback:
-                                progress_callback(self.current_video_index, self.total_videos, self.current_video_title)
-                            print(f"Downloading video {self.current_video_index}/{self.total_videos}: {self.current_video_title}")
+                                progress_callback(len(processed_videos), total_videos or len(processed_videos), current_video_title)
+                            print(f"Downloading video {len(processed_videos)}/{total_videos or '?'}: {current_video_title}")
                             
                 elif d['status'] == 'finished':
                     print(f"Completed: {Path(d['filename']).name}")
             
-            ydl_opts = self._get_download_options(format, resolution, bitrate)
+            ydl_opts = self._get_download_options(
+                format, resolution, bitrate, download_dir, cancel_event, on_progress, audio_policy=audio_policy
+            )
             ydl_opts['noplaylist'] = False
-            ydl_opts['progress_hooks'] = [progress_hook]
+            ydl_opts['progress_hooks'].append(progress_hook)
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            print(f"Successfully downloaded playlist: {playlist_info['title']}")
-            
-            if output_dir:
-                files_after = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-                new_files = files_after - files_before
-                if new_files:
-                    self._copy_specific_files(output_dir, list(new_files))
+            playlist = self._take_extraction(url) or self.metadata_cache.get(self._cache_key(url, ydl_opts, playlist=True))
+            listed = []
+            listing_errors = []
+            if playlist:
+                # Keep going past failed entries; they are retried individually below
+                ydl_opts['ignoreerrors'] = 'only_download'
+                # Start on the first page instead of listing the whole playlist first
+                ydl_opts['lazy_playlist'] = True
+                if isinstance(playlist.get('entries'), list):
+                    listed = playlist['entries']
                 else:
-                    print("Warning: No new files detected after playlist download")
-            return True
+                    playlist = dict(
+                        playlist, entries=self._record_entries(playlist.get('entries') or [], listed, listing_errors)
+                    )
+            collector = _OutputCollector()
+            try:
+                with self.session.use(ydl_opts, collector) as ydl:
+                    if playlist:
+                        ydl.process_ie_result(playlist, download=True)
+                    else:
+                        ydl.download([url])
+            except Exception as e:
+                # Without the entry list there is nothing to retry selectively
+                if not playlist or (cancel_event is not None and cancel_event.is_set()):
+                    raise
+                print(f"Playlist download stopped early: {str(e)}")
+                if not isinstance(playlist['entries'], list):
+                    # List the entries never reached, so they are retried rather than dropped
+                    try:
+                        for _ in playlist['entries']:
+                            pass
+                    except Exception:
+                        pass
+
+            if cancel_event is not None and cancel_event.is_set():
+                print("Playlist download cancelled")
+                return DownloadResult(error="Cancelled")
+            if not playlist:
+                print(f"Successfully downloaded playlist: {playlist_info['title']}")
+                self._deliver_staged(output_dir, collector.files)
+                return DownloadResult(success=True, files=collector.files, video_ids=collector.video_ids)
+
+            results = self._match_entries(listed, collector)
+            if any(not r['success'] for r in results):
+                self._retry_failed_entries(results, format, resolution, bitrate, output_dir, audio_policy)
+            result = self._playlist_result(results, [], output_dir)
+            if listing_errors:
+                # The rest of the playlist is unknown, so it cannot count as complete
+                result.success = False
+                result.error = f"Playlist listing failed: {listing_errors[0]}"
+            return result
             
         except Exception as e:
+            if cancel_event is not None and cancel_event.is_set():
+                print("Playlist download cancelled")
+                return DownloadResult(error="Cancelled")
             print(f"Playlist download failed: {str(e)}")
             print("Trying fallback approach...")
-            return self._try_playlist_fallback(url, format, resolution, bitrate, output_dir, progress_callback)
+            return self._try_playlist_fallback(url, format, resolution, bitrate, output_dir, progress_callback, audio_policy)
     
+    @staticmethod
+    def _record_entries(
+        entries: Any,
+        listed: List[Dict[str, Any]],
+        errors: List[str]
+        ) -> Iterator[Dict[str, Any]]:
+        """Pass ``entries`` through, appending each to ``listed`` as it goes.
+
+        An error raised while listing is appended to ``errors`` before it propagates.
+        """
+        try:
+            for entry in entries:
+                listed.append(entry)
+                yield entry
+        except Exception as e:
+            errors.append(str(e))
+            raise
+
+    def _download_playlist_entries(
+        self, url: str, 
+        format: str, 
+        resolution: str, 
+        bitrate: str, 
+        output_dir: Optional[str], 
+        progress_callback: Optional[Callable[[int, int, str], None]], 
+        max_workers: int,
+        sync: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        audio_policy: str = AUDIO_POLICY
+        ) -> DownloadResult:
+        """Extract the playlist once and download its entries on a bounded worker pool.
+        
+        Entries are handed to the workers as their page of the playlist arrives.
+        Per-entry outcomes are returned in ``DownloadResult.entries`` (see _entry_result)
+        and the counts in ``DownloadResult.summary``. An entry whose download fails is
+        retried once with the fallback options. With ``sync`` set, entries found in
+        the download archive are skipped before any work is done for them.
+        Setting ``cancel_event`` stops running entries and skips the ones not yet started.
+        MP3 conversion is handed to the transcode pool, so workers fetch the next
+        entry while earlier ones are still encoding; an entry only counts as done,
+        and is archived, once its MP3 exists.
+        """
+        download_dir = self._download_dir(output_dir)
+        if download_dir is None:
+            return DownloadResult(error="Invalid destination path")
+
+        try:
+            playlist = self._take_extraction(url) or self._extract_playlist(url)
+        except Exception as e:
+            print(f"Error getting playlist info: {str(e)}")
+            playlist = None
+        if not playlist:
+            print("Failed to get playlist information")
+            return DownloadResult(error="Failed to get playlist information")
+
+        expected = self._playlist_count(playlist)
+        print(f"Starting playlist download: {playlist.get('title', 'Unknown Playlist')}")
+        print(f"Videos in playlist: {expected if expected is not None else 'unknown'} (workers: {max_workers})")
+
+        skipped_results = []
+        archive = self._get_archive(format, resolution, bitrate, audio_policy) if sync else None
+        submitted = 0
+        started = 0
+        lock = threading.Lock()
+
+        def planned() -> int:
+            # Entries this run will fetch, as far as the listing so far tells
+            if expected is None:
+                return submitted
+            return max(expected - len(skipped_results), submitted)
+
+        transcoder = self.transcode_pool if self._defers_transcode(format, bitrate, audio_policy) else None
+        transcodes: Dict[int, List[Any]] = {}
+        # Archive keys of each entry: its own key plus the IDs yt-dlp reported for its files
+        archive_keys: Dict[int, List[str]] = {}
+
+        def download_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+            nonlocal started
+            result = self._entry_result(entry)
+            entry_url, title = result['url'], result['title']
+            if cancel_event is not None and cancel_event.is_set():
+                result['error'] = 'Cancelled'
+                return result
+            with lock:
+                started += 1
+                current = started
+                total = planned()
+                if progress_callback:
+                    progress_callback(current, total, title)
+            print(f"Downloading video {current}/{total}: {title}")
+
+            try:
+                ydl_opts = self._get_download_options(
+                    format, resolution, bitrate, download_dir, cancel_event, on_progress,
+                    defer_transcode=transcoder is not None, audio_policy=audio_policy
+                )
+                collector = _OutputCollector()
+                with self.session.use(ydl_opts, collector) as ydl:
+                    ydl.download([entry_url])
+                result['success'] = True
+                result['files'] = collector.files
+                archive_keys[id(result)] = list(collector.video_ids.values())
+                if transcoder is not None:
+                    transcodes[id(result)] = [transcoder.submit(path, bitrate) for path in collector.files]
+                    return result
+            except Exception as e:
+                if cancel_event is not None and cancel_event.is_set():
+                    result['error'] = 'Cancelled'
+                    return result
+                print(f"Primary download failed for {title}: {str(e)}")
+                result['error'] = str(e)
+                self._retry_failed_entries([result], format, resolution, bitrate, output_dir, audio_policy)
+            if result['success'] and archive is not None:
+                self._archive_entry(archive, result, archive_keys.get(id(result), []))
+            return result
+
+        listing_error = None
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            try:
+                for entry in playlist.get('entries') or []:
+                    if not entry:
+                        continue
+                    if archive is not None and self._archive_key(entry) in archive:
+                        skipped = self._entry_result(entry)
+                        skipped['success'] = skipped['skipped'] = True
+                        skipped_results.append(skipped)
+                        continue
+                    with lock:
+                        submitted += 1
+                    futures.append(executor.submit(download_entry, entry))
+            except Exception as e:
+                # Entries listed so far still download; the rest of the playlist is unknown
+                print(f"Playlist listing stopped early: {str(e)}")
+                listing_error = str(e)
+            if sync:
+                print(f"Skipped {len(skipped_results)} already downloaded, fetching {len(futures)}")
+            fetched_results = [future.result() for future in futures]
+        # The worker threads have exited; close the yt-dlp instances they kept warm
+        self.session.reap()
+
+        for result in fetched_results:
+            if id(result) not in transcodes:
+                continue
+            try:
+                result['files'] = [future.result() for future in transcodes[id(result)]]
+            except Exception as e:
+                print(f"Transcoding failed for {result['title']}: {str(e)}")
+                result['success'] = False
+                result['error'] = str(e)
+                continue
+            if archive is not None:
+                self._archive_entry(archive, result, archive_keys.get(id(result), []))
+
+        result = self._playlist_result(fetched_results, skipped_results, output_dir)
+        if listing_error:
+            result.success = False
+            result.error = f"Playlist listing failed: {listing_error}"
+        return result
+
+    def _entry_result(
+        self,
+        entry: Dict[str, Any]
+        ) -> Dict[str, Any]:
+        """A blank per-entry outcome for a playlist entry.
+
+        ``success`` and ``files`` describe the final outcome, ``skipped`` marks entries
+        already in the download archive, ``retried`` those that needed the fallback
+        options and ``error`` why an entry was abandoned.
+        """
+        url = self._entry_url(entry)
+        return {
+            'id': entry.get('id'), 'title': entry.get('title') or url, 'url': url,
+            'success': False, 'skipped': False, 'retried': False, 'error': None, 'files': []
+        }
+
+    def _match_entries(
+        self,
+        listed: List[Dict[str, Any]],
+        collector: _OutputCollector
+        ) -> List[Dict[str, Any]]:
+        """Per-entry outcomes for the ``listed`` playlist entries, from the files ``collector`` saw."""
+        # Entries that produced no file failed or were never reached
+        done = {}
+        by_url = {}
+        for path, video_id in collector.video_ids.items():
+            done.setdefault(video_id, []).append(path)
+        for path, source_urls in collector.source_urls.items():
+            for source_url in source_urls:
+                by_url.setdefault(source_url, []).append(path)
+        results = []
+        for entry in listed:
+            if not entry:
+                continue
+            result = self._entry_result(entry)
+            if entry.get('id'):
+                result['files'] = done.get(entry['id'], [])
+            else:
+                # Entries of some feeds carry no ID, only the URL of their page
+                result['files'] = by_url.get(entry.get('url'), []) or by_url.get(result['url'], [])
+            result['success'] = bool(result['files'])
+            if not result['success']:
+                result['error'] = 'Download failed'
+            results.append(result)
+        return results
+
+    def _retry_failed_entries(
+        self,
+        results: List[Dict[str, Any]],
+        format: str,
+        resolution: str,
+        bitrate: str,
+        output_dir: Optional[str],
+        audio_policy: str = 'mp3'
+        ) -> None:
+        """Download the failed entries in ``results`` again with the fallback options, updating them in place."""
+        for result in results:
+            if result['success'] or result['error'] == 'Cancelled':
+                continue
+            print(f"Retrying with fallback options: {result['title']}")
+            fallback = self._try_fallback(result['url'], format, resolution, bitrate, output_dir, deliver=False, audio_policy=audio_policy)
+            result['retried'] = True
+            result['success'] = fallback.success
+            result['files'] = fallback.files
+            result['error'] = None if fallback.success else (fallback.error or result['error'])
+
+    def _playlist_result(
+        self,
+        fetched_results: List[Dict[str, Any]],
+        skipped_results: List[Dict[str, Any]],
+        output_dir: Optional[str]
+        ) -> DownloadResult:
+        """Summarise per-entry outcomes into a DownloadResult and deliver the files."""
+        total = len(fetched_results)
+        failed = [r for r in fetched_results if not r['success']]
+        retried = [r for r in fetched_results if r['retried']]
+        summary = {
+            'total': len(skipped_results) + total,
+            'skipped': len(skipped_results),
+            'fetched': total - len(failed),
+            'retried': len(retried),
+            'failed': len(failed),
+        }
+        print(f"Playlist download finished: {total - len(failed)}/{total} succeeded, "
+              f"{len(retried)} retried, {len(skipped_results)} skipped")
+        for result in failed:
+            print(f"Abandoned: {result['title']} ({result['error']})")
+
+        files = [path for r in fetched_results for path in r['files']]
+        video_ids = {path: r['id'] for r in fetched_results if r['id'] for path in r['files']}
+        self._deliver_staged(output_dir, files)
+        return DownloadResult(
+            success=not failed,
+            files=files,
+            video_ids=video_ids,
+            entries=skipped_results + fetched_results,
+            summary=summary,
+            error=f"{len(failed)} of {total} videos failed" if failed else None
+        )
+
+    def _get_archive(
+        self, 
+        format: str, 
+        resolution: str, 
+        bitrate: str,
+        audio_policy: str = 'mp3'
+        ) -> DownloadArchive:
+        """Download archive for one format/quality profile, so an MP3 sync does not skip MP4s."""
+        quality = (bitrate or 'best') if format == 'mp3' else (resolution or 'best')
+        if format == 'mp3' and audio_policy != 'mp3':
+            quality = f"{audio_policy}-{quality}"
+        return DownloadArchive(self.output_dir / '.archive' / f"{format}-{quality}.txt")
+
+    def _archive_key(
+        self,
+        entry: Dict[str, Any]
+        ) -> str:
+        """Key a playlist entry is archived under: its video ID, or its URL for entries listed without one."""
+        return entry.get('id') or self._entry_url(entry)
+
+    def _archive_entry(
+        self,
+        archive: DownloadArchive,
+        result: Dict[str, Any],
+        video_ids: List[str]
+        ) -> None:
+        """Record a downloaded entry under its archive key and the ``video_ids`` reported for its files."""
+        archive.add(self._archive_key(result))
+        for video_id in video_ids:
+            archive.add(video_id)
+
+    def _entry_url(
+        self, 
+        entry: Dict[str, Any]
+        ) -> str:
+        """Resolve a flat playlist entry to a downloadable video URL."""
+        url = entry.get('url') or entry.get('webpage_url') or ''
+        if url.startswith(('http://', 'https://')):
+            return url
+        return f"https://www.youtube.com/watch?v={entry.get('id') or url}"
+
     def _try_playlist_fallback(
         self, url: str, 
         format: str, 
         resolution: str, 
         bitrate: str, 
         output_dir: Optional[str], 
-        progress_callback: Optional[Callable[[int, int, str], None]]
-        ) -> bool:
-        """Try a fallback playlist download with simplified options."""
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        audio_policy: str = 'mp3'
+        ) -> DownloadResult:
+        """Try a fallback playlist download with simplified options.
+
+        Entries are matched to the files they produced as in the primary
+        download, so the result reports which ones failed, and a fallback
+        that produced nothing is a failure.
+        """
+        FALLBACKS_USED.inc(scope='playlist')
+        download_dir = self._download_dir(output_dir)
+        if download_dir is None:
+            return DownloadResult(error="Invalid destination path")
+
         try:
-            downloads_path = Path(self.output_dir)
-            files_before = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-            
             ydl_opts: Dict[str, Any] = {
-                'outtmpl': str(self.output_dir / '%(title)s.%(ext)s'),
+                'outtmpl': str(download_dir / '%(title)s.%(ext)s'),
                 'retries': 3,
                 'fragment_retries': 3,
                 'socket_timeout': 45,
@@ -194,39 +765,49 @@ class YouTubeDownloader:
                     }
                 },
                 'http_headers': self._FALLBACK_HEADERS,
-                'sleep_interval': 2,
-                'max_sleep_interval': 10,
+                'match_filter': self.session.rate_limiter.match_filter,
+                'postprocessor_hooks': [postprocessor_hook],
                 'ignoreerrors': True,
                 'noplaylist': False,
             }
             
             if format == 'mp3':
-                ydl_opts['format'] = 'bestaudio/best'
-                ydl_opts['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                }]
-                if bitrate and bitrate != 'best':
-                    ydl_opts['postprocessor_args'] = ['-b:a', f'{bitrate}k']
+                ydl_opts.update(self._audio_options(audio_policy, bitrate))
             else:
                 ydl_opts['format'] = 'best'
                 ydl_opts['merge_output_format'] = 'mp4'
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-            
-            print(f"Fallback playlist download successful")
-            
-            if output_dir:
-                files_after = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-                new_files = files_after - files_before
-                if new_files:
-                    self._copy_specific_files(output_dir, list(new_files))
-            return True
+            collector = _OutputCollector()
+            listed = []
+            listing_errors = []
+            with self.session.use(ydl_opts, collector) as ydl:
+                playlist = ydl.extract_info(url, download=False, process=False)
+                if not playlist:
+                    return DownloadResult(error="Fallback could not list the playlist")
+                if 'entries' in playlist:
+                    playlist = dict(
+                        playlist, entries=self._record_entries(playlist['entries'] or [], listed, listing_errors)
+                    )
+                ydl.process_ie_result(playlist, download=True)
+
+            if listed:
+                result = self._playlist_result(self._match_entries(listed, collector), [], output_dir)
+            else:
+                # Resolved through a redirect, so the entries were never seen here
+                self._deliver_staged(output_dir, collector.files)
+                result = DownloadResult(success=True, files=collector.files, video_ids=collector.video_ids)
+            if listing_errors:
+                result.success = False
+                result.error = f"Playlist listing failed: {listing_errors[0]}"
+            if not result.files:
+                result.success = False
+                result.error = result.error or "Fallback playlist download produced no files"
+            print(f"Fallback playlist download {'successful' if result.success else 'incomplete'}")
+            return result
             
         except Exception as e:
             print(f"Fallback playlist download also failed: {str(e)}")
-            return False
+            return DownloadResult(error=str(e))
 
     def download(
         self, url: str, 
@@ -234,50 +815,227 @@ class YouTubeDownloader:
         resolution: str = '720', 
         bitrate: str = 'best', 
         output_dir: Optional[str] = None, 
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
-        ) -> bool:
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_workers: int = 1,
+        info: Optional[Dict[str, Any]] = None,
+        sync: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        audio_policy: str = AUDIO_POLICY
+        ) -> DownloadResult:
         """Unified download method for both video and audio downloads.
         Automatically detects and handles playlist URLs.
+        ``max_workers`` and ``sync`` are only used for playlists, and ``audio_policy``
+        only for MP3 mode (see _audio_options). Setting
+        ``cancel_event`` stops the download at the next progress update, and
+        ``on_progress`` receives throttled byte-level progress (see ProgressTracker).
+
+        ``info`` may hold a raw yt-dlp extraction result for ``url``; it is downloaded
+        without extracting the page again. Results from a previous get_video_info or
+        get_playlist_info call for the same URL are reused automatically.
             
         Returns:
-            bool: True if download succeeded, False otherwise
+            DownloadResult: truthy if the download succeeded, with the final output paths
         """
-        if self.is_playlist_url(url):
-            return self.download_playlist(url, format, resolution, bitrate, output_dir, progress_callback)
-        
+        if audio_policy not in AUDIO_POLICIES:
+            raise ValueError(f"Unknown audio policy: {audio_policy}")
+        on_progress = ProgressTracker.wrap(on_progress)
+        kind = 'playlist' if self.is_playlist_url(url) else 'video'
+        DOWNLOADS_STARTED.inc(kind=kind)
         try:
-            downloads_path = Path(self.output_dir)
-            files_before = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
+            with DOWNLOAD_SECONDS.time(kind=kind):
+                if kind == 'playlist':
+                    result = self.download_playlist(
+                        url, format, resolution, bitrate, output_dir, progress_callback, max_workers, info, sync,
+                        cancel_event, on_progress, audio_policy
+                    )
+                else:
+                    result = self._download_video(
+                        url, format, resolution, bitrate, output_dir, info, cancel_event, on_progress, audio_policy
+                    )
+        except Exception:
+            DOWNLOADS_FAILED.inc(kind=kind)
+            raise
+        self._record_outcome(kind, result)
+        return result
 
-            ydl_opts = self._get_download_options(format, resolution, bitrate)
+    def _record_outcome(
+        self,
+        kind: str,
+        result: DownloadResult
+        ) -> None:
+        """Count a finished download, and the bytes it produced, in the metrics."""
+        if not result:
+            DOWNLOADS_FAILED.inc(kind=kind)
+            return
+        DOWNLOADS_SUCCEEDED.inc(kind=kind)
+        size = 0
+        for path in getattr(result, 'files', []):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        BYTES_DOWNLOADED.inc(size)
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+    def _download_video(
+        self, url: str,
+        format: str,
+        resolution: str,
+        bitrate: str,
+        output_dir: Optional[str],
+        info: Optional[Dict[str, Any]],
+        cancel_event: Optional[threading.Event],
+        on_progress: Optional[ProgressTracker],
+        audio_policy: str
+        ) -> DownloadResult:
+        """Download a single video; see download()."""
+        download_dir = self._download_dir(output_dir)
+        if download_dir is None:
+            return DownloadResult(error="Invalid destination path")
 
-            print(f"Successfully downloaded {format.upper()} from: {url}")
+        try:
+            ydl_opts = self._get_download_options(
+                format, resolution, bitrate, download_dir, cancel_event, on_progress, audio_policy=audio_policy
+            )
 
-            if output_dir:
-                files_after = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-                new_files = files_after - files_before
-                if new_files:
-                    self._copy_specific_files(output_dir, list(new_files))
+            info = info or self._take_extraction(url) or self.metadata_cache.get(self._cache_key(url, ydl_opts))
+            collector = _OutputCollector()
+            with self.session.use(ydl_opts, collector) as ydl:
+                if info:
+                    ydl.process_ie_result(info, download=True)
                 else:
-                    print("Warning: No new files detected after download")
-            return True
+                    ydl.download([url])
+
+            print(f"Successfully downloaded {format.upper()} from: {url}")
+
+            self._deliver_staged(output_dir, collector.files)
+            return DownloadResult(success=True, files=collector.files, video_ids=collector.video_ids)
 
         except Exception as e:
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"Download cancelled: {url}")
+                return DownloadResult(error="Cancelled")
             print(f"Primary download failed: {str(e)}")
             print("Trying fallback with simpler format selection...")
-            return self._try_fallback(url, format, resolution, bitrate, output_dir)
+            return self._try_fallback(url, format, resolution, bitrate, output_dir, audio_policy=audio_policy)
     
 
+    def _download_dir(
+        self, 
+        output_dir: Optional[str]
+        ) -> Optional[Path]:
+        """Directory a job writes into: the requested destination, or the staging directory.
+        
+        Partial and temporary files are kept next to the final output. Returns None
+        when the requested destination is not usable.
+        """
+        if not output_dir or self.stage_downloads:
+            return self.output_dir
+        is_valid, result = self._validate_path(output_dir)
+        if not is_valid:
+            print(f"Invalid destination path: {result}")
+            return None
+        return Path(result)
+
+    def _deliver_staged(
+        self, 
+        output_dir: Optional[str], 
+        files: List[Path]
+        ) -> None:
+        """Deliver files from the staging directory when downloads are staged."""
+        if not output_dir or not self.stage_downloads:
+            return
+        if files:
+            self._copy_specific_files(output_dir, files)
+        else:
+            print("Warning: No new files detected after download")
+
+    # Sources kept as they are by the 'auto' policy; webm audio is only moved into an audio container
+    _AUTO_AUDIO_MAPPING = 'm4a>m4a/mp4>m4a/mp3>mp3/opus>opus/ogg>ogg/webm>best/mp3'
+
+    @staticmethod
+    def _audio_transcodes(
+        audio_policy: str,
+        bitrate: Optional[str]
+        ) -> bool:
+        """Whether ``audio_policy`` re-encodes the audio to MP3."""
+        requested = bool(bitrate) and bitrate != 'best'
+        return audio_policy == 'mp3' or (audio_policy == 'auto' and requested)
+
+    def _defers_transcode(
+        self,
+        format: str,
+        bitrate: Optional[str],
+        audio_policy: str
+        ) -> bool:
+        """Whether MP3 conversion for this download can go to the transcode pool."""
+        return (format == 'mp3' and self._audio_transcodes(audio_policy, bitrate) and self.session.produces_media
+                and self.transcode_pool.available)
+
+    @classmethod
+    def _audio_options(
+        cls,
+        audio_policy: str,
+        bitrate: Optional[str],
+        transcode: bool = True
+        ) -> Dict[str, Any]:
+        """yt-dlp format and post-processing options for MP3 mode under ``audio_policy``.
+
+        ``mp3`` always re-encodes to MP3 at ``bitrate``. ``best-native`` never
+        re-encodes: the best audio stream, m4a preferred, is at most stream-copied
+        into an audio container. ``auto`` re-encodes only when a specific bitrate
+        was requested or the source codec has no plain audio container, and keeps
+        m4a, mp3, opus and ogg audio as it is otherwise. With ``transcode`` off,
+        MP3 conversion is left to the caller.
+        """
+        if cls._audio_transcodes(audio_policy, bitrate):
+            opts: Dict[str, Any] = {'format': 'bestaudio/best'}
+            if transcode:
+                opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                }]
+                if bitrate and bitrate != 'best':
+                    opts['postprocessor_args'] = ['-b:a', f'{bitrate}k']
+            return opts
+
+        return {
+            'format': 'bestaudio[ext=m4a]/bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'best' if audio_policy == 'best-native' else cls._AUTO_AUDIO_MAPPING,
+            }],
+        }
+
     def _get_download_options(
         self, format: str, 
-        resolution: str, bitrate: str
+        resolution: str, bitrate: str,
+        download_dir: Optional[Path] = None,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        defer_transcode: bool = False,
+        audio_policy: str = 'mp3'
         ) -> Dict[str, Any]:
-        """Get yt-dlp download options based on format and quality settings."""
+        """Get yt-dlp download options based on format and quality settings.
+        
+        Files are written to ``download_dir``, or the staging directory when it is not given.
+        MP3 mode follows ``audio_policy``; with ``defer_transcode``, a download that
+        needs converting keeps the source audio and leaves the conversion to the
+        caller instead of running ffmpeg inline.
+        A progress hook aborts the download once ``cancel_event`` is set, and feeds
+        yt-dlp's updates to ``on_progress``, a ProgressTracker or a callback that
+        gets one (see ProgressTracker for the events it receives).
+        """
+        tracker = ProgressTracker.wrap(on_progress)
+
+        def job_hook(d: Dict[str, Any]) -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                raise DownloadCancelled("Download cancelled")
+            if tracker is not None:
+                tracker.hook(d)
+
         base_opts: Dict[str, Any] = {
-            'outtmpl': str(self.output_dir / '%(title)s.%(ext)s'),
+            'outtmpl': str((download_dir or self.output_dir) / '%(title)s.%(ext)s'),
             'retries': 10,
             'fragment_retries': 10,
             'socket_timeout': 30,
@@ -289,21 +1047,16 @@ class YouTubeDownloader:
                     'player_skip': ['configs'],
                 }
             },
-            'sleep_interval': 1,
-            'max_sleep_interval': 5,
+            'match_filter': self.session.rate_limiter.match_filter,
+            'postprocessor_hooks': [postprocessor_hook],
             'ignoreerrors': False,
             'no_warnings': False,
             'noplaylist': True,
+            'progress_hooks': [job_hook],
         }
 
         if format == 'mp3':
-            base_opts['format'] = 'bestaudio/best'
-            base_opts['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-            }]
-            if bitrate and bitrate != 'best':
-                base_opts['postprocessor_args'] = ['-b:a', f'{bitrate}k']
+            base_opts.update(self._audio_options(audio_policy, bitrate, transcode=not defer_transcode))
         else:
             # mp4
             if resolution and resolution in ('1080', '720', '480', '360'):
@@ -342,13 +1095,27 @@ class YouTubeDownloader:
                 'ignoreerrors': True,
                 'noplaylist': True,
             }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return {
-                    'title': info.get('title', 'Unknown'),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'duration': info.get('duration', 0)
-                }
+            cache_key = self._cache_key(url, ydl_opts)
+            info = self.metadata_cache.get(cache_key)
+            if info is None:
+                self.session.rate_limiter.acquire()
+                with EXTRACTION_SECONDS.time(kind='video'), self.session.use(ydl_opts) as ydl:
+                    # Unprocessed, so the download still applies its own format selection
+                    info = ydl.extract_info(url, download=False, process=False)
+                    # Short links and embeds point at the video's own page
+                    for _ in range(3):
+                        if not info or info.get('_type') not in ('url', 'url_transparent'):
+                            break
+                        info = ydl.extract_info(info['url'], download=False, process=False)
+                if info:
+                    self.metadata_cache.set(cache_key, info)
+            if info:
+                self._remember_extraction(url, info)
+            return {
+                'title': info.get('title', 'Unknown'),
+                'uploader': info.get('uploader', 'Unknown'),
+                'duration': info.get('duration', 0)
+            }
         except Exception as e:
             print(f"Error getting video info: {str(e)}")
             return None
@@ -359,15 +1126,22 @@ class YouTubeDownloader:
         format: str, 
         resolution: str, 
         bitrate: str, 
-        output_dir: Optional[str]
-        ) -> bool:
-        """Try a fallback download with simplified options when the primary download fails."""
-        try:
-            downloads_path = Path(self.output_dir)
-            files_before = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
+        output_dir: Optional[str],
+        deliver: bool = True,
+        audio_policy: str = 'mp3'
+        ) -> DownloadResult:
+        """Try a fallback download with simplified options when the primary download fails.
+        
+        ``deliver`` is turned off by callers that deliver staged files themselves.
+        """
+        FALLBACKS_USED.inc(scope='video')
+        download_dir = self._download_dir(output_dir)
+        if download_dir is None:
+            return DownloadResult(error="Invalid destination path")
 
+        try:
             ydl_opts: Dict[str, Any] = {
-                'outtmpl': str(self.output_dir / '%(title)s.%(ext)s'),
+                'outtmpl': str(download_dir / '%(title)s.%(ext)s'),
                 'retries': 5,
                 'fragment_retries': 5,
                 'socket_timeout': 45,
@@ -377,21 +1151,16 @@ class YouTubeDownloader:
                     }
                 },
                 'http_headers': self._FALLBACK_HEADERS,
-                'sleep_interval': 2,
-                'max_sleep_interval': 10,
-                'ignoreerrors': True,
+                'match_filter': self.session.rate_limiter.match_filter,
+                'postprocessor_hooks': [postprocessor_hook],
+                # A failure must surface so the caller can count the video as abandoned
+                'ignoreerrors': False,
                 'noplaylist': True,
             }
 
             # Configure specific options for fallback
             if format == 'mp3':
-                ydl_opts['format'] = 'bestaudio/best'
-                ydl_opts['postprocessors'] = [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                }]
-                if bitrate and bitrate != 'best':
-                    ydl_opts['postprocessor_args'] = ['-b:a', f'{bitrate}k']
+                ydl_opts.update(self._audio_options(audio_policy, bitrate))
             else:
                 if resolution and resolution in ('1080', '720', '480', '360'):
                     ydl_opts['format'] = f"best[height<={resolution}]/best"
@@ -399,24 +1168,22 @@ class YouTubeDownloader:
                     ydl_opts['format'] = 'best'
                 ydl_opts['merge_output_format'] = 'mp4'
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            collector = _OutputCollector()
+            with self.session.use(ydl_opts, collector) as ydl:
                 ydl.download([url])
+            if not collector.files:
+                raise RuntimeError("No file was downloaded")
 
             print(f"Fallback download successful for: {url}")
 
-            if output_dir:
-                files_after = set(f.name for f in downloads_path.iterdir() if f.is_file()) if downloads_path.exists() else set()
-                new_files = files_after - files_before
-                if new_files:
-                    self._copy_specific_files(output_dir, list(new_files))
-                else:
-                    print("Warning: No new files detected after fallback download")
-            return True
+            if deliver:
+                self._deliver_staged(output_dir, collector.files)
+            return DownloadResult(success=True, files=collector.files, video_ids=collector.video_ids)
 
         except Exception as e:
             print(f"Fallback download also failed: {str(e)}")
             print("Media may not be available or have restrictions.")
-            return False
+            return DownloadResult(error=str(e))
 
     def _validate_path(
         self, 
@@ -440,9 +1207,15 @@ class YouTubeDownloader:
     def _copy_specific_files(
         self, 
         copyDest: str, 
-        filenames: List[str]
+        filenames: List[Union[str, Path]],
+        strategy: Optional[str] = None
         ) -> None:
-        """Copy specified files from downloads directory to custom destination."""
+        """Deliver specified files to custom destination.
+        
+        Entries may be paths reported by yt-dlp or names relative to the downloads directory.
+        ``strategy`` is one of 'auto', 'move', 'hardlink', 'reflink' or 'copy' and defaults
+        to the downloader's ``delivery_strategy``; see ``deliver_file``.
+        """
         if not copyDest or not filenames:
             return
 
@@ -455,11 +1228,13 @@ class YouTubeDownloader:
             dest_path = Path(result)
             downloads_path = Path(self.output_dir)
 
-            print(f"Copying {len(filenames)} file(s) to '{dest_path}'")
+            strategy = strategy or self.delivery_strategy
+            print(f"Copying {len(filenames)} file(s) to '{dest_path}' (strategy: {strategy})")
 
             copied_files = []
-            for filename in filenames:
-                source_file = downloads_path / filename
+            for source in filenames:
+                source_file = downloads_path / source
+                filename = source_file.name
 
                 if not source_file.exists():
                     print(f"File {filename} not found in downloads directory")
@@ -467,9 +1242,9 @@ class YouTubeDownloader:
 
                 try:
                     dest_file_path = dest_path / filename
-                    shutil.copy2(source_file, dest_file_path)
+                    used = deliver_file(source_file, dest_file_path, strategy)
                     copied_files.append(filename)
-                    print(f"Copied: {filename} to {dest_file_path}")
+                    print(f"Copied ({used}): {filename} to {dest_file_path}")
                 except Exception as file_error:
                     print(f"Failed to copy {filename}: {str(file_error)}")
 
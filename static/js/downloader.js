@@ -2,7 +2,10 @@ const form = document.getElementById('form');
 const btn = document.getElementById('download-btn');
 const message = document.getElementById('message');
 const status = document.getElementById('status');
+const cancelBtn = document.getElementById('cancel-btn');
 let interval;
+let currentJobId = null;
+let eventSource = null;
 
 const toggleOptions = () => {
     const selected = document.querySelector('input[name="format"]:checked')?.value;
@@ -100,6 +103,7 @@ const handleFormSubmit = async (e) => {
 
     const useCustomDir = document.getElementById('use-custom-dir').checked;
     const customDirectory = useCustomDir ? document.getElementById('custom-directory').value.trim() : '';
+    const syncPlaylist = document.getElementById('sync-playlist')?.checked;
 
     btn.disabled = true;
     message.innerHTML = '';
@@ -115,7 +119,8 @@ const handleFormSubmit = async (e) => {
         format: selectedFormat,
         resolution: resolution,
         bitrate: bitrate,
-        ...(useCustomDir && customDirectory && { custom_directory: customDirectory })
+        ...(useCustomDir && customDirectory && { custom_directory: customDirectory }),
+        ...(syncPlaylist && { sync: 'true' })
     });
 
     try {
@@ -128,8 +133,11 @@ const handleFormSubmit = async (e) => {
         const data = await response.json();
 
         if (response.ok) {
-            showSuccess('Download started!');
-            startPolling();
+            showSuccess('Download queued!');
+            currentJobId = data.job_id;
+            btn.disabled = false;
+            cancelBtn.style.display = 'inline-block';
+            subscribe(currentJobId);
         } else {
             showError(data.error || 'An error occurred');
             btn.disabled = false;
@@ -150,29 +158,73 @@ const showSuccess = (msg) => {
 
 form.addEventListener('submit', handleFormSubmit);
 
+cancelBtn.addEventListener('click', async () => {
+    if (!currentJobId) return;
+
+    const response = await fetch(`/jobs/${currentJobId}/cancel`, { method: 'POST' });
+    const data = await response.json();
+    if (!response.ok) showError(data.error || 'Could not cancel download');
+});
+
+const formatBytes = (bytes) => {
+    if (!bytes) return '0 MB';
+    return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+};
+
+const renderStatus = (data) => {
+    let statusText = data.messages.join('\n');
+
+    // playlist progress information
+    if (data.is_playlist && data.playlist_info) {
+        const progressInfo = `\n\nPlaylist: ${data.playlist_info.title}`;
+        if (data.current_video_index > 0 && data.total_videos > 0) {
+            const progressBar = `Progress: ${data.current_video_index}/${data.total_videos} videos`;
+            statusText = progressInfo + '\n' + progressBar + '\n\n' + statusText;
+        } else {
+            statusText = progressInfo + '\n\n' + statusText;
+        }
+    }
+
+    // byte progress of the file currently downloading, and of the whole job
+    if (data.in_progress && data.progress && data.progress.status === 'downloading') {
+        const { downloaded_bytes, total_bytes, filename, speed, eta, fragment_index, fragment_count } = data.progress;
+        const percent = total_bytes ? ` (${Math.floor(100 * downloaded_bytes / total_bytes)}%)` : '';
+        statusText += `\n${filename}: ${formatBytes(downloaded_bytes)} / ${formatBytes(total_bytes)}${percent}`;
+        if (speed) statusText += ` at ${formatBytes(speed)}/s`;
+        if (eta != null) statusText += `, ETA ${eta}s`;
+        if (fragment_count) statusText += `, fragment ${fragment_index || 0}/${fragment_count}`;
+
+        const aggregate = data.progress.aggregate;
+        if (aggregate && aggregate.files_finished > 0) {
+            const average = aggregate.average_speed ? ` at ${formatBytes(aggregate.average_speed)}/s average` : '';
+            statusText += `\nTotal: ${formatBytes(aggregate.downloaded_bytes)} in ${aggregate.files_finished} finished files${average}`;
+        }
+    }
+
+    status.textContent = statusText;
+};
+
+const finishJob = () => {
+    cancelBtn.style.display = 'none';
+};
+
+// Fallback for browsers without EventSource: poll for status, fetching only new messages
 const startPolling = () => {
+    clearInterval(interval);
+    let since = 0;
+    let messages = [];
     interval = setInterval(async () => {
         try {
-            const response = await fetch('/status');
+            const url = currentJobId ? `/jobs/${currentJobId}` : '/status';
+            const response = await fetch(`${url}?since=${since}`);
             const data = await response.json();
 
-            let statusText = data.messages.join('\n');
-            
-            // playlist progress information
-            if (data.is_playlist && data.playlist_info) {
-                const progressInfo = `\n\nPlaylist: ${data.playlist_info.title}`;
-                if (data.current_video_index > 0 && data.total_videos > 0) {
-                    const progressBar = `Progress: ${data.current_video_index}/${data.total_videos} videos`;
-                    statusText = progressInfo + '\n' + progressBar + '\n\n' + statusText;
-                } else {
-                    statusText = progressInfo + '\n\n' + statusText;
-                }
-            }
-            
-            status.textContent = statusText;
+            messages = messages.concat(data.messages);
+            since = data.next_since;
+            renderStatus({ ...data, messages });
 
             if (!data.in_progress) {
-                btn.disabled = false;
+                finishJob();
                 clearInterval(interval);
             }
         } catch (error) {
@@ -181,11 +233,61 @@ const startPolling = () => {
     }, 1000);
 };
 
-document.getElementById("history-btn").addEventListener("click", () => {
-    fetch("/history")
+// Subscribe to the job's event stream; the server pushes only what changed
+const subscribe = (jobId) => {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    if (eventSource) eventSource.close();
+    eventSource = new EventSource(`/jobs/${jobId}/events`);
+    let jobState = null;
+
+    const on = (name, handler) => eventSource.addEventListener(name, (e) => {
+        const data = JSON.parse(e.data);
+        if (name === 'snapshot') {
+            jobState = data;
+        } else if (!jobState) {
+            return;
+        } else {
+            handler(data);
+        }
+        renderStatus(jobState);
+    });
+
+    on('snapshot', () => {});
+    on('message', (data) => jobState.messages.push(data.message));
+    on('status', (data) => Object.assign(jobState, data));
+    on('progress', (data) => { jobState.progress = data; });
+    on('state', (data) => Object.assign(jobState, data));
+
+    eventSource.addEventListener('end', () => {
+        eventSource.close();
+        eventSource = null;
+        finishJob();
+    });
+};
+
+const HISTORY_PAGE_SIZE = 50;
+let historyPage = 1;
+
+const loadHistory = (page = 1) => {
+    const format = document.getElementById("history-format").value;
+    const sort = document.getElementById("history-sort").value;
+    const order = sort === 'downloaded' || sort === 'size' ? 'desc' : 'asc';
+    const params = new URLSearchParams({ page, per_page: HISTORY_PAGE_SIZE, sort, order, ...(format && { format }) });
+
+    fetch(`/history?${params}`)
         .then(response => response.json())
         .then(data => {
             const box = document.getElementById("history-box")
+            const pages = Math.max(1, Math.ceil(data.total / data.per_page));
+            historyPage = data.page;
+            document.getElementById("history-page").textContent = `Page ${data.page} of ${pages} (${data.total} files)`;
+            document.getElementById("history-prev").disabled = data.page <= 1;
+            document.getElementById("history-next").disabled = data.page >= pages;
+
             if (data.history.length === 0) {
                 box.textContent = "No downloads yet"
             } else {
@@ -223,5 +325,10 @@ document.getElementById("history-btn").addEventListener("click", () => {
             
             box.style.display = "block";
         });
-});
+};
 
+document.getElementById("history-btn").addEventListener("click", () => loadHistory(1));
+document.getElementById("history-format").addEventListener("change", () => loadHistory(1));
+document.getElementById("history-sort").addEventListener("change", () => loadHistory(1));
+document.getElementById("history-prev").addEventListener("click", () => loadHistory(historyPage - 1));
+document.getElementById("history-next").addEventListener("click", () => loadHistory(historyPage + 1));
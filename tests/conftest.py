@@ -3,9 +3,13 @@ Configuration provided to support, simplify, and standardize across our tests.
 """
 import pytest
 from pathlib import Path
+from unittest.mock import patch
 import tempfile
 import shutil
 
+from src.backends import SyntheticBackend
+from src.ratelimit import AdaptiveRateLimiter
+
 
 @pytest.fixture
 def temp_downloads_dir():
@@ -21,3 +25,28 @@ def mock_video_info():
         'uploader': 'Test Uploader', 
         'duration': 180
     }
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    """Give each test its own rate limiter, so pacing from one test never slows another."""
+    limiter = AdaptiveRateLimiter()
+    with patch('src.ratelimit._shared', limiter):
+        yield limiter
+
+
+@pytest.fixture
+def downloads(temp_downloads_dir):
+    """A temporary directory standing in for downloads/."""
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        yield temp_downloads_dir
+
+
+@pytest.fixture
+def synthetic():
+    """Factory for fast synthetic backends; keyword arguments override the defaults."""
+    def create(**options):
+        defaults = {'latency': 0, 'bandwidth': None, 'media_size': 1000, 'postprocess_time': 0, 'playlist_size': 3,
+                    'rate_limiter': AdaptiveRateLimiter(rate=1000, burst=1000)}
+        return SyntheticBackend(**dict(defaults, **options))
+    return create
@@ -0,0 +1,145 @@
+"""
+Tests for the asyncio API, running on the synthetic backend.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch, Mock
+
+from src.async_downloader import AsyncYouTubeDownloader, DownloadTask
+from src.download_result import DownloadResult
+from src.youtube_downloader import YouTubeDownloader
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_extract_video_and_playlist(downloads, synthetic):
+    async def main():
+        async with AsyncYouTubeDownloader(YouTubeDownloader(session=synthetic())) as downloader:
+            return await asyncio.gather(
+                downloader.extract('https://www.youtube.com/watch?v=abc123'),
+                downloader.extract('https://www.youtube.com/playlist?list=PLabc'),
+            )
+
+    video, playlist = run(main())
+
+    assert video['title'] == 'Synthetic video abc123'
+    assert playlist['video_count'] == 3
+
+
+def test_download_returns_result(downloads, synthetic):
+    async def main():
+        async with AsyncYouTubeDownloader(YouTubeDownloader(session=synthetic())) as downloader:
+            return await downloader.download('https://www.youtube.com/watch?v=abc123')
+
+    result = run(main())
+
+    assert isinstance(result, DownloadResult)
+    assert result.success and result.files[0].name == 'Synthetic video abc123.mp4'
+
+
+def test_progress_events_iterated(downloads, synthetic):
+    async def main():
+        async with AsyncYouTubeDownloader(YouTubeDownloader(session=synthetic())) as downloader:
+            task = downloader.start_download('https://www.youtube.com/playlist?list=PLabc', max_workers=2)
+            events = [event async for event in task]
+            return events, await task
+
+    events, result = run(main())
+
+    assert result.success
+    assert [e for e in events if e['status'] == 'entry'][-1]['current'] == 3
+    assert sum(e['status'] == 'finished' for e in events) == 3
+
+
+def test_streamed_playlist_extracted_again_on_download_thread(downloads, synthetic):
+    backend = synthetic()
+    downloader = YouTubeDownloader(session=backend)
+    url = 'https://www.youtube.com/playlist?list=PLabc'
+    threads = []
+
+    def extract_streaming(playlist_url):
+        threads.append(threading.current_thread().name)
+        with backend.use({}) as ydl:
+            info = ydl.extract_info(playlist_url, download=False, process=False)
+        return dict(info, entries=iter(info['entries']))
+
+    async def main():
+        async with AsyncYouTubeDownloader(downloader) as client:
+            await client.extract(url)
+            return await client.download(url, max_workers=2)
+
+    with patch.object(downloader, '_extract_playlist', side_effect=extract_streaming):
+        result = run(main())
+
+    assert result.success and result.summary['fetched'] == 3
+    assert [name.split('_')[0] for name in threads] == ['lookup', 'download']
+
+
+def test_lookups_bounded_by_pool(downloads):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def lookup(url):
+        with lock:
+            active.append(url)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(url)
+        return {'id': url}
+
+    downloader = Mock(is_playlist_url=Mock(return_value=False), get_video_info=lookup)
+
+    async def main():
+        async with AsyncYouTubeDownloader(downloader, lookup_workers=4) as client:
+            return await asyncio.gather(*(client.extract(f'url{i}') for i in range(40)))
+
+    results = run(main())
+
+    assert len(results) == 40
+    assert max(peak) <= 4
+
+
+def test_cancelling_await_stops_download(downloads):
+    started = threading.Event()
+    seen = {}
+
+    def download(url, cancel_event=None, **options):
+        seen['cancel_event'] = cancel_event
+        started.set()
+        cancel_event.wait(5)
+        return DownloadResult(error='Cancelled')
+
+    downloader = Mock(download=download)
+
+    async def main():
+        async with AsyncYouTubeDownloader(downloader) as client:
+            waiter = asyncio.ensure_future(client.download('https://www.youtube.com/watch?v=abc'))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    run(main())
+
+    assert seen['cancel_event'].is_set()
+
+
+def test_slow_reader_coalesces_and_drops_events():
+    async def main():
+        task = DownloadTask(asyncio.get_running_loop(), threading.Event(), max_pending=3)
+        for downloaded in range(5):
+            task._push({'status': 'downloading', 'downloaded_bytes': downloaded})
+        for index in range(4):
+            task._push({'status': 'entry', 'current': index})
+        return task
+
+    task = run(main())
+
+    assert list(task._pending) == [{'status': 'entry', 'current': index} for index in (1, 2, 3)]
+    assert task.dropped == 2
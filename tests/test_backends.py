@@ -0,0 +1,302 @@
+"""
+Tests for the extractor backends, and the downloader running on the synthetic one.
+"""
+import threading
+import pytest
+from unittest.mock import patch, Mock
+from yt_dlp.utils import DownloadError
+
+from src.backends import Backend, SyntheticBackend, YtDlpBackend, create_backend
+from src.ratelimit import AdaptiveRateLimiter
+from src.youtube_downloader import YouTubeDownloader, _OutputCollector
+
+
+def test_create_backend():
+    assert isinstance(create_backend('yt-dlp'), YtDlpBackend)
+    assert isinstance(create_backend('synthetic', latency=0), SyntheticBackend)
+    with pytest.raises(ValueError):
+        create_backend('nope')
+
+
+def test_backend_requires_use():
+    with pytest.raises(TypeError):
+        Backend()
+
+
+def test_default_backend_from_config(downloads):
+    with patch('src.backends.EXTRACTOR_BACKEND', 'synthetic'):
+        downloader = YouTubeDownloader()
+
+    assert isinstance(downloader.session, SyntheticBackend)
+
+
+def test_download_writes_file_and_runs_hooks(temp_downloads_dir, synthetic):
+    backend = synthetic(media_size=200 * 1024)
+    events = []
+    collector = _OutputCollector()
+    opts = {'outtmpl': str(temp_downloads_dir / '%(title)s.%(ext)s'), 'progress_hooks': [events.append]}
+
+    with backend.use(opts, collector) as ydl:
+        assert ydl.download(['https://www.youtube.com/watch?v=abc123']) == 0
+
+    path = temp_downloads_dir / 'Synthetic video abc123.mp4'
+    assert path.stat().st_size == 200 * 1024
+    assert collector.files == [path.resolve()]
+    assert collector.video_ids[path.resolve()] == 'abc123'
+    assert [e['status'] for e in events] == ['downloading'] * 4 + ['finished']
+
+
+def test_playlist_extracted_flat(synthetic):
+    backend = synthetic(playlist_size=5)
+
+    with backend.use({'extract_flat': True}) as ydl:
+        info = ydl.extract_info('https://www.youtube.com/playlist?list=PLabc', download=False, process=False)
+
+    assert info['_type'] == 'playlist'
+    assert info['playlist_count'] == 5
+    assert [entry['id'] for entry in info['entries']] == [f'PLabc0000{i}' for i in range(1, 6)]
+
+
+def test_audio_conversion_simulated(temp_downloads_dir, synthetic):
+    backend = synthetic()
+    pp_events = []
+    opts = {
+        'outtmpl': str(temp_downloads_dir / '%(title)s.%(ext)s'),
+        'format': 'bestaudio[ext=m4a]/bestaudio/best',
+        'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}],
+        'postprocessor_hooks': [pp_events.append],
+    }
+
+    with backend.use(opts) as ydl:
+        info = ydl.extract_info('https://youtu.be/abc123')
+
+    assert info['filepath'].endswith('Synthetic video abc123.mp3')
+    assert [e['status'] for e in pp_events] == ['started', 'finished']
+    assert not (temp_downloads_dir / 'Synthetic video abc123.m4a').exists()
+
+
+def test_failures_follow_ignoreerrors(temp_downloads_dir, synthetic):
+    opts = {'outtmpl': str(temp_downloads_dir / '%(title)s.%(ext)s')}
+
+    with synthetic(failure_rate=1).use(dict(opts, ignoreerrors=True)) as ydl:
+        assert ydl.download(['https://www.youtube.com/watch?v=abc']) == 1
+    with pytest.raises(DownloadError):
+        with synthetic(failure_rate=1).use(dict(opts, ignoreerrors=False)) as ydl:
+            ydl.download(['https://www.youtube.com/watch?v=abc'])
+    with pytest.raises(DownloadError):
+        with synthetic(throttle_rate=1).use(dict(opts, ignoreerrors='only_download')) as ydl:
+            ydl.download(['https://www.youtube.com/watch?v=abc'])
+
+
+def test_throttling_reported_to_rate_limiter(synthetic):
+    limiter = Mock()
+    backend = synthetic(throttle_rate=1, rate_limiter=limiter)
+
+    with pytest.raises(DownloadError):
+        with backend.use({}) as ydl:
+            ydl.extract_info('https://www.youtube.com/watch?v=abc', download=False)
+
+    assert AdaptiveRateLimiter.is_throttled(limiter.record_failure.call_args[0][0])
+    assert backend.calls['throttled'] == 1
+
+
+def test_ignored_throttling_backs_off(downloads, synthetic):
+    limiter = AdaptiveRateLimiter(rate=1000, burst=1000)
+    downloader = YouTubeDownloader(session=synthetic(throttle_rate=1, rate_limiter=limiter))
+
+    assert downloader.get_video_info('https://www.youtube.com/watch?v=abc') is None
+
+    assert limiter.rate == 500
+
+
+def test_seeded_failures_reproducible(synthetic):
+    def outcomes():
+        backend = synthetic(failure_rate=0.5, seed=7)
+        return [backend._draw('download', backend.failure_rate) for _ in range(20)]
+
+    assert outcomes() == outcomes()
+
+
+def test_downloader_on_synthetic_backend(downloads, synthetic):
+    downloader = YouTubeDownloader(session=synthetic())
+
+    info = downloader.get_video_info('https://www.youtube.com/watch?v=abc123')
+    result = downloader.download('https://www.youtube.com/watch?v=abc123')
+    playlist = downloader.download('https://www.youtube.com/playlist?list=PLabc', max_workers=2)
+
+    assert info['title'] == 'Synthetic video abc123'
+    assert result.success and result.files[0].name == 'Synthetic video abc123.mp4'
+    assert playlist.success and playlist.summary['fetched'] == 3
+
+
+def test_downloader_falls_back_on_synthetic_failures(downloads, synthetic):
+    backend = synthetic(failure_rate=0.5, seed=1, playlist_size=6)
+    downloader = YouTubeDownloader(session=backend)
+
+    result = downloader.download('https://www.youtube.com/playlist?list=PLabc', max_workers=1, sync=True)
+
+    assert backend.calls['failed'] > 0
+    assert result.summary['retried'] > 0
+    assert result.summary['fetched'] + result.summary['failed'] == 6
+
+
+def test_failed_retries_abandon_entries(downloads, capsys, synthetic):
+    downloader = YouTubeDownloader(session=synthetic(failure_rate=1))
+
+    playlist = downloader.download('https://www.youtube.com/playlist?list=PLabc', max_workers=2)
+    video = downloader.download('https://www.youtube.com/watch?v=abc123')
+
+    assert not playlist.success and playlist.files == []
+    assert playlist.summary['retried'] == 3 and playlist.summary['failed'] == 3
+    assert capsys.readouterr().out.count('Abandoned:') == 3
+    assert not video.success
+
+
+def test_playlist_fallback_reports_failed_entries(downloads, synthetic):
+    backend = synthetic()
+    extract = backend.extract
+
+    def extract_failing(url, opts):
+        if url.endswith(('00002', '00003')):
+            raise DownloadError('ERROR: [youtube] Video unavailable')
+        return extract(url, opts)
+
+    downloader = YouTubeDownloader(session=backend)
+    url = 'https://www.youtube.com/playlist?list=PLabc'
+    with patch.object(backend, 'extract', side_effect=extract_failing):
+        result = downloader._try_playlist_fallback(url, 'mp4', '720', 'best', None, None)
+
+    assert not result.success
+    assert result.summary['fetched'] == 1 and result.summary['failed'] == 2
+    assert [entry['success'] for entry in result.entries] == [True, False, False]
+    assert len(result.files) == 1
+
+
+def test_playlist_fallback_without_files_fails(downloads, synthetic):
+    backend = synthetic()
+    extract = backend.extract
+    downloader = YouTubeDownloader(session=backend)
+    url = 'https://www.youtube.com/playlist?list=PLabc'
+
+    def extract_failing(entry_url, opts):
+        if entry_url != url:
+            raise DownloadError('ERROR: [youtube] Video unavailable')
+        return extract(entry_url, opts)
+
+    with patch.object(backend, 'extract', side_effect=extract_failing):
+        result = downloader._try_playlist_fallback(url, 'mp4', '720', 'best', None, None)
+
+    assert not result.success and result.error
+    assert result.files == []
+    assert result.summary['failed'] == 3
+
+
+def streamed_playlist(size, fail_after=None):
+    """A flat playlist whose entries arrive from a generator, as paged playlists do."""
+    def entries():
+        for index in range(1, size + 1):
+            if index == fail_after:
+                raise DownloadError('Unable to download playlist page')
+            yield {'_type': 'url', 'id': f'vid{index:02d}', 'url': f'https://www.youtube.com/watch?v=vid{index:02d}',
+                   'title': f'Synthetic video vid{index:02d}'}
+    return {'_type': 'playlist', 'id': 'PLabc', 'title': 'Streamed', 'entries': entries()}
+
+
+def test_sequential_playlist_retries_entries_never_reached(downloads, synthetic):
+    backend = synthetic()
+    extract = backend.extract
+    failures = []
+
+    def extract_once_failing(url, opts):
+        if url.endswith('vid03') and not failures:
+            failures.append(url)
+            raise DownloadError('ERROR: [youtube] vid03: Video unavailable')
+        return extract(url, opts)
+
+    downloader = YouTubeDownloader(session=backend)
+    url = 'https://www.youtube.com/playlist?list=PLabc'
+    with patch.object(backend, 'extract', side_effect=extract_once_failing):
+        result = downloader.download(url, info=streamed_playlist(10))
+
+    assert result.success
+    assert result.summary == {'total': 10, 'skipped': 0, 'fetched': 10, 'retried': 8, 'failed': 0}
+    assert len(result.files) == 10
+
+
+def test_sequential_playlist_matches_entries_without_ids(downloads, synthetic):
+    downloader = YouTubeDownloader(session=synthetic())
+    entries = [{'_type': 'url', 'url': f'https://www.youtube.com/watch?v=vid{index}', 'title': f'Video {index}'}
+               for index in range(1, 4)]
+
+    result = downloader.download('https://www.youtube.com/playlist?list=PLabc',
+                                 info={'_type': 'playlist', 'id': 'PLabc', 'title': 'Feed', 'entries': entries})
+
+    assert result.success
+    assert result.summary['fetched'] == 3 and result.summary['retried'] == 0
+    assert len(result.files) == 3
+
+
+def test_streamed_extraction_reused_only_by_its_thread(downloads, synthetic):
+    downloader = YouTubeDownloader(session=synthetic())
+    listed = {'_type': 'playlist', 'entries': [{'id': 'a'}]}
+    streamed = {'_type': 'playlist', 'entries': iter([{'id': 'a'}])}
+    downloader._remember_extraction('listed', listed)
+    downloader._remember_extraction('streamed', streamed)
+    seen = {}
+
+    def take():
+        seen['listed'] = downloader._take_extraction('listed')
+        seen['streamed'] = downloader._peek_extraction('streamed')
+
+    thread = threading.Thread(target=take)
+    thread.start()
+    thread.join()
+
+    assert seen == {'listed': listed, 'streamed': None}
+    assert downloader._take_extraction('streamed') is streamed
+
+
+def test_sync_skips_entries_without_ids(downloads, synthetic):
+    downloader = YouTubeDownloader(session=synthetic())
+    url = 'https://www.youtube.com/playlist?list=PLabc'
+    entries = [{'_type': 'url', 'url': f'https://www.youtube.com/watch?v=vid{index}', 'title': f'Video {index}'}
+               for index in range(1, 4)]
+    feed = {'_type': 'playlist', 'id': 'PLabc', 'title': 'Feed', 'entries': entries}
+
+    first = downloader.download(url, info=feed, sync=True)
+    second = downloader.download(url, info=feed, sync=True)
+
+    assert first.summary['fetched'] == 3
+    assert second.summary['skipped'] == 3 and second.summary['fetched'] == 0
+    archived = (downloads / '.archive' / 'mp4-720.txt').read_text().split()
+    assert 'vid1' in archived and 'https://www.youtube.com/watch?v=vid1' in archived
+
+
+def test_output_collector_files_source_urls(tmp_path):
+    collector = _OutputCollector()
+    url = 'https://example.com/watch?v=vid1'
+
+    collector.run({'filepath': str(tmp_path / 'a.mp4'), 'original_url': url, 'webpage_url': url})
+
+    assert collector.source_urls == {(tmp_path / 'a.mp4').resolve(): [url]}
+
+
+def test_sequential_playlist_listing_failure_not_complete(downloads, synthetic):
+    downloader = YouTubeDownloader(session=synthetic())
+
+    result = downloader.download('https://www.youtube.com/playlist?list=PLabc', info=streamed_playlist(10, fail_after=4))
+
+    assert not result.success
+    assert 'Playlist listing failed' in result.error
+    assert result.summary['fetched'] == 3 and len(result.files) == 3
+
+
+def test_mp3_playlist_skips_transcode_pool(downloads, synthetic):
+    pool = Mock(available=True)
+    downloader = YouTubeDownloader(session=synthetic(), transcode_pool=pool)
+
+    result = downloader.download('https://www.youtube.com/playlist?list=PLabc', format='mp3', max_workers=2)
+
+    assert result.success
+    assert all(path.suffix == '.mp3' for path in result.files)
+    pool.submit.assert_not_called()
@@ -2,6 +2,9 @@
 Test different ways to use the application's CLI and ensure it functions within expected behavior.
 """
 import pytest
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import patch, Mock
 from typer.testing import CliRunner
 import cli
@@ -155,11 +158,140 @@ def test_main_with_playlist_url(mock_downloader_class, mock_setup, mock_ffmpeg):
     assert "Download completed!" in result.stdout
 
 
+@patch('cli.verify_ffmpeg')
+@patch('cli.setup_directories')
+@patch('cli.YouTubeDownloader')
+def test_main_batch_urls(mock_downloader_class, mock_setup, mock_ffmpeg):
+    """Test that several URLs share one downloader and get a summary table."""
+    mock_downloader = Mock()
+    mock_downloader_class.return_value = mock_downloader
+    mock_downloader.download.return_value = True
+    urls = ['https://www.youtube.com/watch?v=one', 'https://www.youtube.com/watch?v=two']
+
+    result = runner.invoke(cli.app, urls + ['--jobs', '2'])
+
+    assert result.exit_code == 0
+    mock_downloader_class.assert_called_once()
+    mock_ffmpeg.assert_called_once()
+    downloaded = sorted(call.args[0] for call in mock_downloader.download.call_args_list)
+    assert downloaded == urls
+    assert "STATUS" in result.stdout
+    assert "2/2 succeeded." in result.stdout
+
+
+@patch('cli.verify_ffmpeg')
+@patch('cli.setup_directories')
+@patch('cli.YouTubeDownloader')
+def test_main_batch_failure_exit_code(mock_downloader_class, mock_setup, mock_ffmpeg):
+    """Test that the batch exits non-zero when any URL fails."""
+    mock_downloader = Mock()
+    mock_downloader_class.return_value = mock_downloader
+    mock_downloader.download.side_effect = lambda url, **kwargs: url.endswith('good')
+
+    result = runner.invoke(cli.app, [
+        'https://www.youtube.com/watch?v=good',
+        'https://www.youtube.com/watch?v=bad',
+        'https://example.com/video'
+    ])
+
+    assert result.exit_code == 1
+    assert mock_downloader.download.call_count == 2
+    assert "invalid" in result.stdout
+    assert "1/3 succeeded." in result.stdout
+
+
+@patch('cli.verify_ffmpeg')
+@patch('cli.setup_directories')
+@patch('cli.YouTubeDownloader')
+def test_main_batch_file_and_stdin(mock_downloader_class, mock_setup, mock_ffmpeg, temp_downloads_dir):
+    """Test reading URLs from a file or stdin, skipping blanks and comments."""
+    mock_downloader = Mock()
+    mock_downloader_class.return_value = mock_downloader
+    mock_downloader.download.return_value = True
+    batch = temp_downloads_dir / 'urls.txt'
+    batch.write_text("# favourites\nhttps://www.youtube.com/watch?v=one\n\nhttps://youtu.be/two\n")
+
+    result = runner.invoke(cli.app, ['--batch-file', str(batch), '-a', '192'])
+
+    assert result.exit_code == 0
+    assert mock_downloader.download.call_count == 2
+    assert mock_downloader.download.call_args[1]['format'] == 'mp3'
+
+    result = runner.invoke(cli.app, ['-f', '-'], input="https://www.youtube.com/watch?v=three\n")
+
+    assert result.exit_code == 0
+    assert mock_downloader.download.call_args[0][0] == 'https://www.youtube.com/watch?v=three'
+
+
+@patch('cli.verify_ffmpeg')
+@patch('cli.setup_directories')
+@patch('cli.YouTubeDownloader')
+def test_main_audio_policy(mock_downloader_class, mock_setup, mock_ffmpeg, mock_video_info):
+    """Test that --audio-policy is validated and passed to the downloader."""
+    mock_downloader = Mock()
+    mock_downloader_class.return_value = mock_downloader
+    mock_downloader.is_playlist_url.return_value = False
+    mock_downloader.get_video_info.return_value = mock_video_info
+    mock_downloader.download.return_value = True
+    url = 'https://www.youtube.com/watch?v=test'
+
+    result = runner.invoke(cli.app, [url, '-a', 'best', '--audio-policy', 'best-native'])
+
+    assert result.exit_code == 0
+    assert mock_downloader.download.call_args[1]['audio_policy'] == 'best-native'
+
+    result = runner.invoke(cli.app, [url, '-a', 'best', '--audio-policy', 'flac'])
+
+    assert result.exit_code == 2
+
+
+@patch('cli.verify_ffmpeg')
+@patch('cli.setup_directories')
+@patch('cli.YouTubeDownloader')
+def test_main_progress(mock_downloader_class, mock_setup, mock_ffmpeg, mock_video_info):
+    """Test that --progress prints the progress events the downloader reports."""
+    mock_downloader = Mock()
+    mock_downloader_class.return_value = mock_downloader
+    mock_downloader.is_playlist_url.return_value = False
+    mock_downloader.get_video_info.return_value = mock_video_info
+
+    def download(url, **kwargs):
+        kwargs['on_progress']({'status': 'downloading', 'filename': 'video.mp4', 'downloaded_bytes': 1048576,
+                               'total_bytes': 2097152, 'speed': None, 'eta': 3})
+        return True
+
+    mock_downloader.download.side_effect = download
+
+    result = runner.invoke(cli.app, ['https://www.youtube.com/watch?v=test', '--progress'])
+
+    assert result.exit_code == 0
+    assert "video.mp4 | 1.0/2.0 MB (50%) | ETA 3s" in result.stdout
+
+
+def test_import_does_not_load_yt_dlp():
+    """--help and argument errors must not pay for importing yt-dlp."""
+    completed = subprocess.run(
+        [sys.executable, '-c', "import sys, cli; print('yt_dlp' in sys.modules, 'src.youtube_downloader' in sys.modules)"],
+        capture_output=True,
+        text=True,
+        cwd=Path(cli.__file__).parent
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.split() == ['False', 'False']
+
+
+def test_load_downloader_imports_on_demand():
+    with patch('cli.YouTubeDownloader', None):
+        from src.youtube_downloader import YouTubeDownloader
+
+        assert cli.load_downloader() is YouTubeDownloader
+
+
 def test_main_entry_point():
     """Test the if __name__ == '__main__' entry point."""
     with patch('cli.app') as mock_app:
         # Import and execute the module
-        import importlib
         import sys
         
         # Temporarily modify sys.argv to avoid issues
@@ -40,10 +40,8 @@ def test_file_copying(temp_downloads_dir):
 
 
 def test_flask_endpoint_with_custom_directory():
-    gui.download_status['in_progress'] = False
-    
     with gui.app.test_client() as client:
-        with patch('gui.threading.Thread') as mock_thread:
+        with patch('gui.job_manager') as mock_manager:
             response = client.post('/download', data={
                 'url': 'https://www.youtube.com/watch?v=test',
                 'custom_directory': '/custom/path'
@@ -53,23 +51,21 @@ def test_flask_endpoint_with_custom_directory():
     data = json.loads(response.data)
     assert data['success'] == 'Download started'
     
-    args = mock_thread.call_args[1]['args']
-    assert args[4] == '/custom/path'
+    job = mock_manager.submit.call_args[0][0]
+    assert job.options['custom_directory'] == '/custom/path'
 
 
 def test_flask_endpoint_without_custom_directory():
-    gui.download_status['in_progress'] = False
-    
     with gui.app.test_client() as client:
-        with patch('gui.threading.Thread') as mock_thread:
+        with patch('gui.job_manager') as mock_manager:
             response = client.post('/download', data={
                 'url': 'https://www.youtube.com/watch?v=test'
             })
     
     assert response.status_code == 200
     
-    args = mock_thread.call_args[1]['args']
-    assert args[4] is None
+    job = mock_manager.submit.call_args[0][0]
+    assert job.options['custom_directory'] is None
 
 
 if __name__ == '__main__':
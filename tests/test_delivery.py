@@ -0,0 +1,76 @@
+"""
+Tests for delivering finished files to custom output directories.
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from src.delivery import deliver_file
+
+
+@pytest.fixture
+def source_file(temp_downloads_dir):
+    source = temp_downloads_dir / 'video.mp4'
+    source.write_text('media content')
+    return source
+
+
+def test_auto_same_device_avoids_copy(source_file, temp_downloads_dir):
+    dest_dir = temp_downloads_dir / 'custom'
+    dest_dir.mkdir()
+
+    with patch('src.delivery.shutil.copy2') as mock_copy:
+        used = deliver_file(source_file, dest_dir / 'video.mp4')
+
+    assert used in ('reflink', 'hardlink')
+    mock_copy.assert_not_called()
+    assert (dest_dir / 'video.mp4').read_text() == 'media content'
+    assert source_file.exists()
+
+
+def test_auto_cross_device_copies(source_file, temp_downloads_dir):
+    dest_dir = temp_downloads_dir / 'custom'
+    dest_dir.mkdir()
+
+    with patch('src.delivery.same_device', return_value=False):
+        used = deliver_file(source_file, dest_dir / 'video.mp4')
+
+    assert used == 'copy'
+    assert (dest_dir / 'video.mp4').read_text() == 'media content'
+
+
+def test_auto_falls_back_to_copy_when_links_fail(source_file, temp_downloads_dir):
+    dest_dir = temp_downloads_dir / 'custom'
+    dest_dir.mkdir()
+
+    with patch('src.delivery.reflink', side_effect=OSError("unsupported")), \
+            patch('src.delivery.hardlink', side_effect=OSError("unsupported")):
+        used = deliver_file(source_file, dest_dir / 'video.mp4')
+
+    assert used == 'copy'
+    assert (dest_dir / 'video.mp4').read_text() == 'media content'
+
+
+def test_hardlink_shares_inode_and_replaces_existing(source_file, temp_downloads_dir):
+    dest = temp_downloads_dir / 'linked.mp4'
+    dest.write_text('old content')
+
+    used = deliver_file(source_file, dest, 'hardlink')
+
+    assert used == 'hardlink'
+    assert os.path.samefile(source_file, dest)
+
+
+def test_move_removes_source(source_file, temp_downloads_dir):
+    dest = temp_downloads_dir / 'moved.mp4'
+
+    used = deliver_file(source_file, dest, 'move')
+
+    assert used == 'move'
+    assert not source_file.exists()
+    assert dest.read_text() == 'media content'
+
+
+def test_unknown_strategy(source_file, temp_downloads_dir):
+    with pytest.raises(ValueError):
+        deliver_file(source_file, temp_downloads_dir / 'x.mp4', 'teleport')
@@ -0,0 +1,36 @@
+"""
+Tests for the download archive used by incremental playlist sync.
+"""
+from src.download_archive import DownloadArchive
+
+
+def test_add_and_contains(temp_downloads_dir):
+    archive = DownloadArchive(temp_downloads_dir / 'archive' / 'mp4-720.txt')
+
+    archive.add('vid1')
+
+    assert 'vid1' in archive
+    assert 'vid2' not in archive
+    assert (temp_downloads_dir / 'archive' / 'mp4-720.txt').read_text() == 'youtube vid1\n'
+
+
+def test_loads_existing_archive(temp_downloads_dir):
+    path = temp_downloads_dir / 'mp3-best.txt'
+    path.write_text('youtube vid1\nyoutube vid2\nvimeo other\n\n')
+
+    archive = DownloadArchive(path)
+
+    assert len(archive) == 2
+    assert 'vid2' in archive
+    assert 'other' not in archive
+
+
+def test_add_ignores_duplicates(temp_downloads_dir):
+    path = temp_downloads_dir / 'mp4-720.txt'
+    archive = DownloadArchive(path)
+
+    archive.add('vid1')
+    archive.add('vid1')
+    archive.add('')
+
+    assert path.read_text() == 'youtube vid1\n'
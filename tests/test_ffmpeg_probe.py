@@ -0,0 +1,126 @@
+"""
+Tests for the cached FFmpeg capability probe.
+"""
+import os
+import subprocess
+import pytest
+from unittest.mock import patch, Mock
+
+from src import ffmpeg_probe
+from src.ffmpeg_probe import probe_ffmpeg
+from src.postprocess import TranscodePool
+
+OUTPUTS = {
+    '-version': "ffmpeg version 6.1.1-3ubuntu5 Copyright (c) 2000-2023 the FFmpeg developers\n",
+    '-encoders': (
+        "Encoders:\n"
+        " V..... = Video\n"
+        " A..... = Audio\n"
+        " ------\n"
+        " V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)\n"
+        " A....D libmp3lame           libmp3lame MP3 (MPEG audio layer 3) (codec mp3)\n"
+    ),
+    '-decoders': "Decoders:\n ------\n A....D aac                  AAC (Advanced Audio Coding)\n",
+    '-muxers': (
+        "Formats:\n"
+        " D. = Demuxing supported\n"
+        " .E = Muxing supported\n"
+        " --\n"
+        "  E mov,mp4,m4a          QuickTime / MOV\n"
+        "  E mp3                  MP3 (MPEG audio layer 3)\n"
+    ),
+    '-filters': (
+        "Filters:\n"
+        "  T.. = Timeline support\n"
+        "  A = Audio input/output\n"
+        " TSC volume            A->A       Change input volume.\n"
+        " ... loudnorm          A->A       EBU R128 loudness normalization\n"
+    ),
+    '-hwaccels': "Hardware acceleration methods:\nvaapi\ncuda\n\n",
+}
+
+
+def fake_run(command, **kwargs):
+    return Mock(returncode=0, stdout=OUTPUTS[command[-1]], stderr='')
+
+
+@pytest.fixture
+def ffmpeg_binary(tmp_path):
+    """An executable path to probe, with the in-process cache cleared."""
+    binary = tmp_path / 'ffmpeg'
+    binary.write_text('')
+    with patch.dict(ffmpeg_probe._probed, clear=True):
+        yield binary
+
+
+@patch('src.ffmpeg_probe.subprocess.run', side_effect=fake_run)
+def test_probe_parses_capabilities(mock_run, ffmpeg_binary, tmp_path):
+    capabilities = probe_ffmpeg(str(ffmpeg_binary), tmp_path / 'ffmpeg.json')
+
+    assert capabilities.ok
+    assert capabilities.version == '6.1.1-3ubuntu5'
+    assert capabilities.encoders == ['libmp3lame', 'libx264']
+    assert capabilities.decoders == ['aac']
+    assert capabilities.muxers == ['m4a', 'mov', 'mp3', 'mp4']
+    assert capabilities.filters == ['loudnorm', 'volume']
+    assert capabilities.hwaccels == ['vaapi', 'cuda']
+    assert capabilities.has_encoder('libmp3lame') and not capabilities.has_encoder('libopus')
+
+
+@patch('src.ffmpeg_probe.subprocess.run', side_effect=fake_run)
+def test_probe_cached_on_disk_until_binary_changes(mock_run, ffmpeg_binary, tmp_path):
+    cache_path = tmp_path / 'cache' / 'ffmpeg.json'
+
+    probe_ffmpeg(str(ffmpeg_binary), cache_path)
+    calls = mock_run.call_count
+    ffmpeg_probe._probed.clear()
+    cached = probe_ffmpeg(str(ffmpeg_binary), cache_path)
+
+    assert mock_run.call_count == calls
+    assert cached.version == '6.1.1-3ubuntu5'
+    assert cache_path.exists()
+
+    os.utime(ffmpeg_binary, ns=(0, 10 ** 9))
+    probe_ffmpeg(str(ffmpeg_binary), cache_path)
+
+    assert mock_run.call_count == 2 * calls
+
+
+@patch('src.ffmpeg_probe.subprocess.run', side_effect=subprocess.TimeoutExpired('ffmpeg', 10))
+def test_broken_binary_not_cached_on_disk(mock_run, ffmpeg_binary, tmp_path):
+    cache_path = tmp_path / 'ffmpeg.json'
+
+    capabilities = probe_ffmpeg(str(ffmpeg_binary), cache_path)
+
+    assert capabilities.ok is False
+    assert not cache_path.exists()
+
+
+@patch('src.ffmpeg_probe.subprocess.run', side_effect=fake_run)
+def test_probe_kept_in_memory_without_persist(mock_run, ffmpeg_binary, tmp_path):
+    cache_path = tmp_path / 'downloads' / '.cache' / 'ffmpeg.json'
+
+    capabilities = probe_ffmpeg(str(ffmpeg_binary), cache_path, persist=False)
+
+    assert capabilities.ok
+    assert not cache_path.parent.exists()
+    assert probe_ffmpeg(str(ffmpeg_binary), cache_path) is capabilities
+
+
+def test_missing_binary():
+    with patch('src.ffmpeg_probe.shutil.which', return_value=None):
+        assert probe_ffmpeg() is None
+    assert probe_ffmpeg('/nonexistent/ffmpeg') is None
+
+
+@patch('src.ffmpeg_probe.subprocess.run', side_effect=fake_run)
+def test_transcode_pool_requires_mp3_encoder(mock_run, ffmpeg_binary, tmp_path):
+    with patch('src.ffmpeg_probe.FFMPEG_PROBE_CACHE', tmp_path / 'ffmpeg.json'):
+        assert TranscodePool(ffmpeg_path=str(ffmpeg_binary)).available is True
+
+        without_lame = dict(OUTPUTS, **{'-encoders': " ------\n V....D libx264  H.264\n"})
+        mock_run.side_effect = lambda command, **kwargs: Mock(returncode=0, stdout=without_lame[command[-1]])
+        ffmpeg_probe._probed.clear()
+        probe_ffmpeg(str(ffmpeg_binary), tmp_path / 'ffmpeg.json', refresh=True)
+
+        assert TranscodePool(ffmpeg_path=str(ffmpeg_binary)).available is False
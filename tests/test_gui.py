@@ -1,10 +1,16 @@
 """
 Simple GUI tests for coverage.
 """
+import os
+import time
 import pytest
 import json
 from unittest.mock import patch, Mock
 import gui
+from src.jobs import Job, JobManager
+from src.history import HistoryIndex
+from src.download_result import DownloadResult
+from src.ffmpeg_probe import FFmpegCapabilities
 
 
 def test_index_route():
@@ -18,7 +24,7 @@ def test_index_route():
 def test_verify_ffmpeg_not_found():
     """Test FFmpeg verification when not found."""
     with gui.app.test_client() as client:
-        with patch('gui.shutil.which', return_value=None):
+        with patch('gui.probe_ffmpeg', return_value=None):
             response = client.get('/api/verify-ffmpeg')
             assert response.status_code == 200
             data = json.loads(response.data)
@@ -27,43 +33,49 @@ def test_verify_ffmpeg_not_found():
 
 def test_verify_ffmpeg_success():
     """Test FFmpeg verification success."""
+    capabilities = FFmpegCapabilities('/usr/bin/ffmpeg', '6.1.1', ['aac', 'libmp3lame'], ['aac'], ['mp3', 'mp4'], ['volume'], [])
     with gui.app.test_client() as client:
-        with patch('gui.shutil.which', return_value='/usr/bin/ffmpeg'):
-            with patch('gui.subprocess.run') as mock_run:
-                mock_run.return_value.returncode = 0
-                response = client.get('/api/verify-ffmpeg')
-                assert response.status_code == 200
-                data = json.loads(response.data)
-                assert data['ok'] is True
+        with patch('gui.probe_ffmpeg', return_value=capabilities):
+            response = client.get('/api/verify-ffmpeg')
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data == {'ok': True}
 
 
 def test_verify_ffmpeg_exception():
-    """Test FFmpeg verification with exception."""
+    """Test FFmpeg verification when the binary does not run."""
+    capabilities = FFmpegCapabilities('/usr/bin/ffmpeg', None, [], [], [], [], [])
     with gui.app.test_client() as client:
-        with patch('gui.shutil.which', return_value='/usr/bin/ffmpeg'):
-            with patch('gui.subprocess.run', side_effect=Exception()):
-                response = client.get('/api/verify-ffmpeg')
-                assert response.status_code == 200
-                data = json.loads(response.data)
-                assert data['ok'] is False
+        with patch('gui.probe_ffmpeg', return_value=capabilities):
+            response = client.get('/api/verify-ffmpeg')
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data['ok'] is False
 
 
-def test_download_in_progress():
-    """Test download when already in progress."""
-    gui.download_status['in_progress'] = True
-    try:
+@pytest.fixture
+def job_manager():
+    """Swap in a job manager whose handler is a mock, so no real downloads run."""
+    manager = JobManager(Mock(return_value=True), workers=1)
+    with patch('gui.job_manager', manager):
+        yield manager
+
+
+def test_download_while_another_in_progress(job_manager):
+    """Test that a second download is queued instead of rejected."""
+    with patch.object(job_manager, '_start_workers'):
         with gui.app.test_client() as client:
-            response = client.post('/download', data={'url': 'https://www.youtube.com/watch?v=test'})
-            assert response.status_code == 400
-            data = json.loads(response.data)
-            assert 'already in progress' in data['error']
-    finally:
-        gui.download_status['in_progress'] = False
+            first = client.post('/download', data={'url': 'https://www.youtube.com/watch?v=test'})
+            second = client.post('/download', data={'url': 'https://www.youtube.com/watch?v=other'})
+    
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert json.loads(first.data)['job_id'] != json.loads(second.data)['job_id']
+    assert job_manager.queue_depth == 2
 
 
 def test_download_no_url():
     """Test download with no URL."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
         response = client.post('/download', data={})
         assert response.status_code == 400
@@ -73,7 +85,6 @@ def test_download_no_url():
 
 def test_download_invalid_url():
     """Test download with invalid URL."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
         response = client.post('/download', data={'url': 'https://example.com'})
         assert response.status_code == 400
@@ -81,32 +92,148 @@ def test_download_invalid_url():
 
 def test_download_playlist_url():
     """Test download with playlist URL - should now be accepted."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
-        with patch('gui.threading.Thread') as mock_thread:
+        with patch('gui.job_manager') as mock_manager:
             response = client.post('/download', data={'url': 'https://www.youtube.com/playlist?list=test'})
             assert response.status_code == 200  # Should be accepted now
-            mock_thread.assert_called_once()
+            mock_manager.submit.assert_called_once()
 
 
 def test_download_success():
     """Test successful download initiation."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
-        with patch('gui.threading.Thread') as mock_thread:
+        with patch('gui.job_manager') as mock_manager:
             response = client.post('/download', data={'url': 'https://www.youtube.com/watch?v=test'})
             assert response.status_code == 200
-            mock_thread.assert_called_once()
+            mock_manager.submit.assert_called_once()
+            job = mock_manager.submit.call_args[0][0]
+            assert json.loads(response.data)['job_id'] == job.id
 
 
-def test_status_route():
+def test_download_sync_option():
+    """Test that the sync checkbox is passed on to the worker."""
+    with gui.app.test_client() as client:
+        with patch('gui.job_manager') as mock_manager:
+            response = client.post('/download', data={
+                'url': 'https://www.youtube.com/playlist?list=test',
+                'sync': 'true'
+            })
+            assert response.status_code == 200
+            assert mock_manager.submit.call_args[0][0].options['sync'] is True
+
+
+def test_status_route(job_manager):
     """Test status route."""
-    gui.download_status['messages'] = ['test']
+    job = Job('https://www.youtube.com/watch?v=test')
+    job.add_message('test')
+    with patch.object(job_manager, '_start_workers'):
+        job_manager.submit(job)
     with gui.app.test_client() as client:
         response = client.get('/status')
         assert response.status_code == 200
         data = json.loads(response.data)
-        assert 'messages' in data
+        assert data['messages'] == ['test']
+        assert data['id'] == job.id
+
+
+def test_status_route_since_cursor(job_manager):
+    """Test that /status only returns messages after the given cursor."""
+    job = Job('https://www.youtube.com/watch?v=test')
+    job.add_message('first')
+    job.add_message('second')
+    with patch.object(job_manager, '_start_workers'):
+        job_manager.submit(job)
+    with gui.app.test_client() as client:
+        data = json.loads(client.get('/status?since=1').data)
+        assert data['messages'] == ['second']
+        assert data['next_since'] == 2
+        
+        data = json.loads(client.get(f'/jobs/{job.id}?since=2').data)
+        assert data['messages'] == []
+
+
+def test_status_route_without_jobs(job_manager):
+    """Test status route before any job was submitted."""
+    with gui.app.test_client() as client:
+        response = client.get('/status')
+        data = json.loads(response.data)
+        assert data['in_progress'] is False
+        assert data['messages'] == []
+
+
+def test_job_status_route(job_manager):
+    """Test per-job status."""
+    with patch.object(job_manager, '_start_workers'):
+        job = job_manager.submit(Job('https://www.youtube.com/watch?v=test'))
+    with gui.app.test_client() as client:
+        response = client.get(f'/jobs/{job.id}')
+        assert response.status_code == 200
+        assert json.loads(response.data)['state'] == 'queued'
+        
+        assert client.get('/jobs/unknown').status_code == 404
+
+
+def parse_events(body):
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_job_events_stream(job_manager):
+    """Test that a finished job streams a snapshot followed by the end marker."""
+    with patch.object(job_manager, '_start_workers'):
+        job = job_manager.submit(Job('https://www.youtube.com/watch?v=test'))
+    job.add_message('hello')
+    job.set_state('completed')
+    
+    with gui.app.test_client() as client:
+        response = client.get(f'/jobs/{job.id}/events')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = parse_events(response.get_data(as_text=True))
+    
+    assert [name for name, _ in events] == ['snapshot', 'end']
+    assert events[0][1]['messages'] == ['hello']
+    assert events[1][1]['state'] == 'completed'
+
+
+def test_job_events_resume_from_last_event_id(job_manager):
+    """Test that a reconnecting client only receives events it missed."""
+    with patch.object(job_manager, '_start_workers'):
+        job = job_manager.submit(Job('https://www.youtube.com/watch?v=test'))
+    job.add_message('first')
+    job.add_message('second')
+    job.set_progress({'downloaded_bytes': 10, 'total_bytes': 100})
+    job.set_state('completed')
+    
+    with gui.app.test_client() as client:
+        response = client.get(f'/jobs/{job.id}/events', headers={'Last-Event-ID': '1'})
+        events = parse_events(response.get_data(as_text=True))
+        
+        assert client.get('/jobs/unknown/events').status_code == 404
+    
+    assert events == [
+        ('message', {'message': 'second'}),
+        ('progress', {'downloaded_bytes': 10, 'total_bytes': 100}),
+        ('state', {'state': 'completed', 'in_progress': False}),
+        ('end', {'state': 'completed'}),
+    ]
+
+
+def test_cancel_job_route(job_manager):
+    """Test cancelling a queued job."""
+    with patch.object(job_manager, '_start_workers'):
+        job = job_manager.submit(Job('https://www.youtube.com/watch?v=test'))
+    with gui.app.test_client() as client:
+        response = client.post(f'/jobs/{job.id}/cancel')
+        assert response.status_code == 200
+        assert job.state == 'cancelled'
+        
+        assert client.post(f'/jobs/{job.id}/cancel').status_code == 400
+        assert client.post('/jobs/unknown/cancel').status_code == 404
 
 
 @patch('gui.downloader')
@@ -116,11 +243,10 @@ def test_download_worker_success(mock_downloader):
     mock_downloader.get_video_info.return_value = {'title': 'Test', 'uploader': 'Test', 'duration': 60}
     mock_downloader.download.return_value = True
     
-    gui.download_status = {'in_progress': True, 'messages': [], 'current_video': None, 'is_playlist': False, 'playlist_info': None, 'current_video_index': 0, 'total_videos': 0}
-    gui.download_worker('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    job = Job('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    gui.download_worker(job)
     
-    assert not gui.download_status['in_progress']
-    assert 'Download completed!' in gui.download_status['messages']
+    assert 'Download completed!' in job.to_dict()['messages']
 
 
 @patch('gui.downloader')
@@ -130,11 +256,10 @@ def test_download_worker_failure(mock_downloader):
     mock_downloader.get_video_info.return_value = None
     mock_downloader.download.return_value = False
     
-    gui.download_status = {'in_progress': True, 'messages': [], 'current_video': None, 'is_playlist': False, 'playlist_info': None, 'current_video_index': 0, 'total_videos': 0}
-    gui.download_worker('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    job = Job('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    gui.download_worker(job)
     
-    assert not gui.download_status['in_progress']
-    assert 'Download failed.' in gui.download_status['messages']
+    assert 'Download failed.' in job.to_dict()['messages']
 
 
 @patch('gui.downloader')
@@ -143,18 +268,23 @@ def test_download_worker_exception(mock_downloader):
     mock_downloader.is_playlist_url.return_value = False
     mock_downloader.get_video_info.side_effect = Exception("Test error")
     
-    gui.download_status = {'in_progress': True, 'messages': [], 'current_video': None, 'is_playlist': False, 'playlist_info': None, 'current_video_index': 0, 'total_videos': 0}
-    gui.download_worker('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    job = Job('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', None)
+    gui.download_worker(job)
     
-    assert not gui.download_status['in_progress']
-    assert 'Error: Test error' in gui.download_status['messages']
+    assert 'Error: Test error' in job.to_dict()['messages']
 
 
-def test_add_message():
-    """Test add_message function."""
-    gui.download_status['messages'] = []
-    gui.add_message("test")
-    assert "test" in gui.download_status['messages']
+@patch('gui.downloader')
+def test_download_worker_passes_cancel_event(mock_downloader):
+    """Test that the job's cancel event reaches the downloader."""
+    mock_downloader.is_playlist_url.return_value = False
+    mock_downloader.get_video_info.return_value = None
+    mock_downloader.download.return_value = True
+    
+    job = Job('https://www.youtube.com/watch?v=test')
+    assert gui.download_worker(job) is True
+    assert mock_downloader.download.call_args[1]['cancel_event'] is job.cancel_event
+    assert mock_downloader.download.call_args[1]['on_progress'] == job.set_progress
 
 
 @patch('gui.app.run')
@@ -166,7 +296,6 @@ def test_main_function(mock_run):
 
 def test_gui_invalid_format():
     """Test GUI with invalid format."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
         response = client.post('/download', data={
             'url': 'https://www.youtube.com/watch?v=test',
@@ -179,7 +308,6 @@ def test_gui_invalid_format():
 
 def test_gui_invalid_resolution():
     """Test GUI with invalid resolution."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
         response = client.post('/download', data={
             'url': 'https://www.youtube.com/watch?v=test',
@@ -191,7 +319,6 @@ def test_gui_invalid_resolution():
 
 def test_gui_invalid_bitrate():
     """Test GUI with invalid bitrate."""
-    gui.download_status['in_progress'] = False
     with gui.app.test_client() as client:
         response = client.post('/download', data={
             'url': 'https://www.youtube.com/watch?v=test',
@@ -208,11 +335,10 @@ def test_download_worker_with_custom_dir(mock_downloader):
     mock_downloader.get_video_info.return_value = None
     mock_downloader.download.return_value = True
     
-    gui.download_status = {'in_progress': True, 'messages': [], 'current_video': None, 'is_playlist': False, 'playlist_info': None, 'current_video_index': 0, 'total_videos': 0}
-    gui.download_worker('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', '/custom')
+    job = Job('https://www.youtube.com/watch?v=test', 'mp3', '720', 'best', '/custom')
+    gui.download_worker(job)
     
-    assert not gui.download_status['in_progress']
-    assert 'copied to: /custom' in ' '.join(gui.download_status['messages'])
+    assert 'saved to: /custom' in ' '.join(job.to_dict()['messages'])
 
 
 @patch('gui.downloader')
@@ -227,11 +353,77 @@ def test_download_worker_with_playlist(mock_downloader):
     mock_downloader.get_playlist_info.return_value = mock_playlist_info
     mock_downloader.download.return_value = True
     
-    gui.download_status = {'in_progress': True, 'messages': [], 'current_video': None, 'is_playlist': False, 'playlist_info': None, 'current_video_index': 0, 'total_videos': 0}
-    gui.download_worker('https://www.youtube.com/playlist?list=PLtest123', 'mp3', '720', 'best', None)
+    job = Job('https://www.youtube.com/playlist?list=PLtest123', 'mp3', '720', 'best', None)
+    gui.download_worker(job)
+    
+    status = job.to_dict()
+    assert status['is_playlist'] is True
+    assert status['playlist_info'] == mock_playlist_info
+    assert 'Starting playlist download...' in status['messages']
+    assert 'Playlist download completed!' in status['messages']
+
+
+@pytest.fixture
+def history_index(temp_downloads_dir):
+    index = HistoryIndex(temp_downloads_dir / 'history.sqlite3')
+    with patch('gui.history_index', index), patch.object(gui.downloader, 'output_dir', temp_downloads_dir):
+        yield index
+
+
+def test_history_route_paginates(history_index, temp_downloads_dir):
+    """Test that /history serves pages from the index."""
+    for number in range(3):
+        (temp_downloads_dir / f'video{number}.mp4').write_bytes(b'x')
+    (temp_downloads_dir / 'song.mp3').write_bytes(b'x')
+    (temp_downloads_dir / 'song.opus').write_bytes(b'x')
+    
+    with gui.app.test_client() as client:
+        data = json.loads(client.get('/history?per_page=2').data)
+        assert data['total'] == 5
+        assert len(data['history']) == 2
+        
+        data = json.loads(client.get('/history?format=mp3').data)
+        assert [entry['filename'] for entry in data['history']] == ['song.mp3']
+        
+        data = json.loads(client.get('/history?format=opus').data)
+        assert [entry['filename'] for entry in data['history']] == ['song.opus']
+        
+        assert client.get('/history?sort=bogus').status_code == 400
+        assert client.get('/history?format=wav').status_code == 400
+
+
+def test_history_route_reconciles_custom_directories(history_index, temp_downloads_dir, tmp_path):
+    """Test that files removed from a custom download location drop out of /history."""
+    custom = tmp_path / 'custom'
+    custom.mkdir()
+    kept = custom / 'kept.mp4'
+    removed = custom / 'removed.mp4'
+    for path in (kept, removed):
+        path.write_bytes(b'x')
+        history_index.record(path)
+    
+    with gui.app.test_client() as client:
+        assert json.loads(client.get('/history').data)['total'] == 2
+        removed.unlink()
+        os.utime(custom, (time.time() + 10, time.time() + 10))
+        data = json.loads(client.get('/history').data)
+    
+    assert [entry['filename'] for entry in data['history']] == ['kept.mp4']
+    assert 'path' not in data['history'][0]
+
+
+@patch('gui.downloader')
+def test_download_worker_records_history(mock_downloader, history_index, temp_downloads_dir):
+    """Test that finished downloads are written to the history index."""
+    path = temp_downloads_dir / 'video.mp4'
+    path.write_bytes(b'x')
+    mock_downloader.is_playlist_url.return_value = False
+    mock_downloader.get_video_info.return_value = None
+    mock_downloader.download.return_value = DownloadResult(success=True, files=[path], video_ids={path: 'abc123'})
+    
+    job = Job('https://www.youtube.com/watch?v=abc123')
+    assert gui.download_worker(job) is True
     
-    assert not gui.download_status['in_progress']
-    assert gui.download_status['is_playlist'] is True
-    assert gui.download_status['playlist_info'] == mock_playlist_info
-    assert 'Starting playlist download...' in gui.download_status['messages']
-    assert 'Playlist download completed!' in gui.download_status['messages']
+    entry = history_index.query()[0][0]
+    assert entry['video_id'] == 'abc123'
+    assert entry['job_id'] == job.id
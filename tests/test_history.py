@@ -0,0 +1,109 @@
+"""
+Tests for the download history index behind the /history endpoint.
+"""
+import os
+import pytest
+from unittest.mock import patch
+
+from src.history import HistoryIndex
+
+
+@pytest.fixture
+def library(temp_downloads_dir):
+    library = temp_downloads_dir / 'library'
+    library.mkdir()
+    return library
+
+
+@pytest.fixture
+def index(temp_downloads_dir):
+    return HistoryIndex(temp_downloads_dir / 'history.sqlite3')
+
+
+def make_file(directory, name, size, mtime):
+    path = directory / name
+    path.write_bytes(b'x' * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_record_keeps_source_ids(index, library):
+    path = make_file(library, 'song.mp3', 10, 1000)
+    index.record(path, video_id='abc123', job_id='job1')
+
+    entries, total = index.query()
+    assert total == 1
+    assert entries[0]['filename'] == 'song.mp3'
+    assert entries[0]['format'] == 'MP3'
+    assert entries[0]['size'] == 10
+    assert entries[0]['video_id'] == 'abc123'
+    assert entries[0]['job_id'] == 'job1'
+
+
+def test_reconcile_picks_up_and_drops_files(index, library):
+    make_file(library, 'a.mp4', 1, 1000)
+    old = make_file(library, 'b.mp3', 1, 2000)
+    (library / 'notes.txt').write_text('ignored')
+
+    assert index.reconcile(library) == 2
+    assert index.query()[1] == 2
+
+    old.unlink()
+    assert index.reconcile(library) == 1
+    assert [entry['filename'] for entry in index.query()[0]] == ['a.mp4']
+
+
+def test_reconcile_skips_unchanged_directory(index, library):
+    make_file(library, 'a.mp4', 1, 1000)
+    index.reconcile(library)
+
+    with patch('src.history.os.scandir') as mock_scandir:
+        assert index.reconcile(library) == 0
+    mock_scandir.assert_not_called()
+
+
+def test_reconcile_keeps_recorded_ids(index, library):
+    path = make_file(library, 'a.mp4', 1, 1000)
+    index.record(path, video_id='abc123', job_id='job1')
+    make_file(library, 'a.mp4', 5, 3000)
+
+    index.reconcile(library)
+
+    entry = index.query()[0][0]
+    assert entry['size'] == 5
+    assert entry['video_id'] == 'abc123'
+
+
+def test_reconcile_forgets_removed_directory(index, library):
+    index.record(make_file(library, 'a.mp4', 1, 1000))
+    assert index.directories() == [library.resolve()]
+    (library / 'a.mp4').unlink()
+    library.rmdir()
+
+    assert index.reconcile(library) == 1
+    assert index.query() == ([], 0)
+    assert index.directories() == []
+
+
+def test_query_pagination_filter_and_sort(index, library):
+    for number in range(5):
+        make_file(library, f'video{number}.mp4', number + 1, 1000 + number)
+    make_file(library, 'song.mp3', 100, 500)
+    index.reconcile(library)
+
+    entries, total = index.query(page=1, per_page=2)
+    assert total == 6
+    assert [entry['filename'] for entry in entries] == ['video4.mp4', 'video3.mp4']
+
+    entries, _ = index.query(page=3, per_page=2)
+    assert [entry['filename'] for entry in entries] == ['video0.mp4', 'song.mp3']
+
+    entries, total = index.query(format='mp3')
+    assert total == 1
+    assert entries[0]['filename'] == 'song.mp3'
+
+    entries, _ = index.query(sort='size', order='asc', per_page=1)
+    assert entries[0]['filename'] == 'video0.mp4'
+
+    with pytest.raises(ValueError):
+        index.query(sort='bogus')
@@ -0,0 +1,235 @@
+"""
+Tests for the download job queue.
+"""
+import threading
+import pytest
+from unittest.mock import patch
+
+from src.jobs import Job, JobManager
+
+
+def wait_for(job, timeout=5):
+    """Block until ``job`` has finished."""
+    for _ in range(int(timeout / 0.01)):
+        if not job.in_progress:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"Job {job.id} did not finish")
+
+
+@pytest.fixture
+def manager_factory():
+    managers = []
+    
+    def make(handler, workers=2):
+        manager = JobManager(handler, workers=workers)
+        managers.append(manager)
+        return manager
+    
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+def test_job_status_shape():
+    """Test the status dictionary served for a job."""
+    job = Job('https://www.youtube.com/watch?v=test', 'mp3', sync=True)
+    job.add_message('hello')
+    job.update(current_video_index=2, total_videos=5)
+    
+    status = job.to_dict()
+    assert status['state'] == 'queued'
+    assert status['in_progress'] is True
+    assert status['messages'] == ['hello']
+    assert status['current_video_index'] == 2
+    assert status['options']['format'] == 'mp3'
+    assert status['options']['sync'] is True
+
+
+def test_job_state_follows_handler_result(manager_factory):
+    """Test that a job completes or fails depending on the handler."""
+    manager = manager_factory(lambda job: job.url.endswith('ok'))
+    
+    good = manager.submit(Job('https://example.com/ok'))
+    bad = manager.submit(Job('https://example.com/bad'))
+    wait_for(good)
+    wait_for(bad)
+    
+    assert good.state == 'completed'
+    assert bad.state == 'failed'
+    assert good.started_at is not None and good.finished_at is not None
+
+
+def test_handler_exception_fails_job(manager_factory):
+    """Test that an exception in the handler is reported on the job."""
+    def handler(job):
+        raise RuntimeError("boom")
+    
+    manager = manager_factory(handler)
+    job = manager.submit(Job('https://example.com/video'))
+    wait_for(job)
+    
+    assert job.state == 'failed'
+    assert 'Error: boom' in job.to_dict()['messages']
+
+
+def test_jobs_run_concurrently(manager_factory):
+    """Test that jobs are spread over the worker pool."""
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def handler(job):
+        barrier.wait()
+        return True
+    
+    manager = manager_factory(handler, workers=2)
+    first = manager.submit(Job('https://example.com/1'))
+    second = manager.submit(Job('https://example.com/2'))
+    wait_for(first)
+    wait_for(second)
+    
+    assert first.state == 'completed'
+    assert second.state == 'completed'
+
+
+def test_cancel_queued_job(manager_factory):
+    """Test that a job cancelled while queued never runs."""
+    release = threading.Event()
+    ran = []
+    
+    def handler(job):
+        ran.append(job.id)
+        release.wait(5)
+        return True
+    
+    manager = manager_factory(handler, workers=1)
+    blocker = manager.submit(Job('https://example.com/1'))
+    queued = manager.submit(Job('https://example.com/2'))
+    
+    assert manager.cancel(queued.id) is True
+    assert queued.state == 'cancelled'
+    release.set()
+    wait_for(blocker)
+    
+    assert ran == [blocker.id]
+    assert manager.cancel(queued.id) is False
+    assert manager.cancel('unknown') is False
+
+
+def test_cancel_running_job(manager_factory):
+    """Test that a running job sees its cancel event."""
+    started = threading.Event()
+    
+    def handler(job):
+        started.set()
+        job.cancel_event.wait(5)
+        return False
+    
+    manager = manager_factory(handler, workers=1)
+    job = manager.submit(Job('https://example.com/1'))
+    started.wait(5)
+    
+    assert manager.active_workers == 1
+    assert manager.cancel(job.id) is True
+    wait_for(job)
+    
+    assert job.state == 'cancelled'
+    assert manager.active_workers == 0
+
+
+def test_finished_jobs_are_pruned():
+    """Test that only the most recent finished jobs are kept."""
+    manager = JobManager(lambda job: True, max_finished=2)
+    jobs = [Job(f'https://example.com/{index}') for index in range(4)]
+    for job in jobs:
+        job.state = 'completed'
+        manager._jobs[job.id] = job
+    manager._prune()
+    
+    assert [job.id for job in manager.jobs()] == [job.id for job in jobs[2:]]
+
+
+def test_job_records_numbered_events():
+    """Test that every change is recorded as an event for streaming clients."""
+    job = Job('https://example.com/video')
+    job.add_message('hello')
+    job.update(total_videos=3)
+    
+    events, complete = job.wait_for_events(0, timeout=0)
+    assert complete is True
+    assert [(seq, kind) for seq, kind, _ in events] == [(1, 'message'), (2, 'status')]
+    assert events[1][2] == {'total_videos': 3}
+    
+    events, _ = job.wait_for_events(1, timeout=0)
+    assert [kind for _, kind, _ in events] == ['status']
+
+
+def test_progress_events_are_coalesced():
+    """Test that only the latest byte progress is kept between other events."""
+    job = Job('https://example.com/video')
+    job.set_progress({'downloaded_bytes': 1})
+    job.set_progress({'downloaded_bytes': 2})
+    job.add_message('done')
+    
+    events, complete = job.wait_for_events(0, timeout=0)
+    assert complete is True
+    assert [kind for _, kind, _ in events] == ['progress', 'message']
+    assert events[0][2] == {'downloaded_bytes': 2}
+    assert job.to_dict()['progress'] == {'downloaded_bytes': 2}
+
+
+def test_evicted_events_are_reported():
+    """Test that a reader behind the buffer is told to resynchronise."""
+    with patch.object(Job, 'max_events', 2):
+        job = Job('https://example.com/video')
+    for index in range(4):
+        job.add_message(str(index))
+    
+    events, complete = job.wait_for_events(0, timeout=0)
+    assert complete is False
+    assert [data['message'] for _, _, data in events] == ['2', '3']
+    assert job.wait_for_events(2, timeout=0)[1] is True
+
+
+def test_wait_for_events_wakes_on_change():
+    """Test that a waiting reader is woken by a new event."""
+    job = Job('https://example.com/video')
+    timer = threading.Timer(0.05, job.add_message, args=('late',))
+    timer.start()
+    
+    events, _ = job.wait_for_events(0, timeout=5)
+    timer.join()
+    assert [data for _, _, data in events] == [{'message': 'late'}]
+
+
+def test_messages_since_cursor():
+    """Test that a cursor returns only the messages added after it."""
+    job = Job('https://example.com/video')
+    job.add_message('one')
+    job.add_message('two')
+    
+    status = job.to_dict()
+    assert status['messages'] == ['one', 'two']
+    assert status['next_since'] == 2
+    
+    job.add_message('three')
+    status = job.to_dict(since=status['next_since'])
+    assert status['messages'] == ['three']
+    assert status['next_since'] == 3
+    assert job.to_dict(since=3)['messages'] == []
+
+
+def test_message_buffer_is_bounded():
+    """Test that old messages are dropped once the ring buffer is full."""
+    with patch.object(Job, 'max_messages', 3):
+        job = Job('https://example.com/video')
+    for index in range(10):
+        job.add_message(str(index))
+    
+    status = job.to_dict()
+    assert status['messages'] == ['7', '8', '9']
+    assert status['messages_dropped'] == 7
+    assert status['next_since'] == 10
+    
+    status = job.to_dict(since=8)
+    assert status['messages'] == ['8', '9']
+    assert status['messages_dropped'] == 0
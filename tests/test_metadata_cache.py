@@ -0,0 +1,83 @@
+"""
+Tests for the persistent metadata cache used by info lookups and downloads.
+"""
+import pytest
+from unittest.mock import patch
+
+from src.metadata_cache import MetadataCache
+
+
+@pytest.fixture
+def cache(temp_downloads_dir):
+    return MetadataCache(temp_downloads_dir / 'metadata.sqlite3')
+
+
+def test_set_and_get(cache):
+    cache.set('video:abc:1', {'title': 'Test Video', 'formats': [{'format_id': '18'}]})
+
+    assert cache.get('video:abc:1') == {'title': 'Test Video', 'formats': [{'format_id': '18'}]}
+    assert cache.get('video:missing:1') is None
+
+
+def test_persists_across_instances(cache):
+    cache.set('video:abc:1', {'title': 'Test Video'})
+
+    reopened = MetadataCache(cache.path)
+
+    assert reopened.get('video:abc:1') == {'title': 'Test Video'}
+
+
+def test_expired_entries_ignored(cache):
+    with patch('src.metadata_cache.time.time', return_value=1000.0):
+        cache.set('video:abc:1', {'title': 'Test Video'})
+
+    with patch('src.metadata_cache.time.time', return_value=1000.0 + cache.ttl + 1):
+        assert cache.get('video:abc:1') is None
+
+
+def test_size_eviction_drops_least_recently_used(temp_downloads_dir):
+    cache = MetadataCache(temp_downloads_dir / 'metadata.sqlite3', max_bytes=100)
+    payload = {'data': 'x' * 30}
+
+    with patch('src.metadata_cache.time.time', return_value=1000.0):
+        cache.set('old', payload)
+    with patch('src.metadata_cache.time.time', return_value=1001.0):
+        cache.set('recent', payload)
+    with patch('src.metadata_cache.time.time', return_value=1002.0):
+        cache.get('old')
+    with patch('src.metadata_cache.time.time', return_value=1003.0):
+        cache.set('new', payload)
+
+        assert cache.get('recent') is None
+        assert cache.get('old') == payload
+        assert cache.get('new') == payload
+
+
+def test_headers_and_cookies_not_stored(cache):
+    cache.set('video:abc:1', {
+        'title': 'Test Video', 'http_headers': {'Cookie': 'SID=secret'}, 'cookies': 'SID=secret',
+        'formats': [{'format_id': '18', 'http_headers': {'Authorization': 'token'}}],
+    })
+
+    assert cache.get('video:abc:1') == {'title': 'Test Video', 'formats': [{'format_id': '18'}]}
+    assert b'secret' not in cache.path.read_bytes()
+
+
+def test_disabled_cache(temp_downloads_dir):
+    cache = MetadataCache(temp_downloads_dir / 'metadata.sqlite3', ttl=0)
+    cache.set('video:abc:1', {'title': 'Test Video'})
+
+    assert cache.get('video:abc:1') is None
+
+
+def test_make_key_uses_media_ids():
+    options = {'extractor_args': {'youtube': {'player_client': ['web']}}}
+
+    assert MetadataCache.make_key('https://www.youtube.com/watch?v=dQw4w9WgXcQ', options) == \
+        MetadataCache.make_key('https://youtu.be/dQw4w9WgXcQ', options)
+    assert MetadataCache.make_key('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1', options, playlist=True) == \
+        MetadataCache.make_key('https://www.youtube.com/playlist?list=PL1', options, playlist=True)
+    assert MetadataCache.make_key('https://youtu.be/dQw4w9WgXcQ', options) != \
+        MetadataCache.make_key('https://youtu.be/dQw4w9WgXcQ', {'extractor_args': None})
+    # Entries written before only unprocessed extractions were cached are not reused
+    assert MetadataCache.make_key('https://youtu.be/dQw4w9WgXcQ', options).startswith('video:v2:dQw4w9WgXcQ:')
@@ -0,0 +1,119 @@
+"""
+Tests for the Prometheus metrics exported at /metrics.
+"""
+import pytest
+from unittest.mock import patch, Mock
+
+import gui
+from src.metrics import (
+    Counter, Gauge, Histogram, Registry, postprocessor_hook,
+    DOWNLOADS_STARTED, DOWNLOADS_SUCCEEDED, DOWNLOADS_FAILED, FALLBACKS_USED, POSTPROCESS_SECONDS
+)
+from src.youtube_downloader import YouTubeDownloader
+
+
+def test_counter_renders_labelled_series():
+    registry = Registry()
+    counter = registry.register(Counter('jobs_total', 'Jobs run.', ('kind',)))
+
+    counter.inc(kind='video')
+    counter.inc(2, kind='playlist')
+
+    assert registry.render() == (
+        '# HELP jobs_total Jobs run.\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{kind="playlist"} 2\n'
+        'jobs_total{kind="video"} 1\n'
+    )
+    with pytest.raises(ValueError):
+        counter.inc(kind='video', extra='label')
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind='video')
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Latency.', buckets=(1.0, 5.0))
+
+    for value in (0.5, 2.0, 10.0):
+        histogram.observe(value)
+
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{le="1"} 1',
+        'latency_seconds_bucket{le="5"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        'latency_seconds_sum 12.5',
+        'latency_seconds_count 3',
+    ]
+
+
+def test_histogram_times_failing_blocks():
+    histogram = Histogram('work_seconds', 'Work.', ('kind',))
+
+    with pytest.raises(RuntimeError):
+        with histogram.time(kind='video'):
+            raise RuntimeError("boom")
+
+    assert histogram.count(kind='video') == 1
+
+
+def test_gauge_reads_function_at_scrape_time():
+    gauge = Gauge('depth', 'Depth.')
+    depth = [3]
+    gauge.set_function(lambda: depth[0])
+    depth[0] = 7
+
+    assert gauge.render().splitlines()[-1] == 'depth 7'
+
+
+def test_registry_rejects_duplicates():
+    registry = Registry()
+    registry.register(Counter('dup_total', 'First.'))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter('dup_total', 'Second.'))
+
+
+def test_postprocessor_hook_times_runs():
+    before = POSTPROCESS_SECONDS.count(postprocessor='FFmpegExtractAudio')
+
+    postprocessor_hook({'status': 'started', 'postprocessor': 'FFmpegExtractAudio'})
+    postprocessor_hook({'status': 'finished', 'postprocessor': 'FFmpegExtractAudio'})
+    postprocessor_hook({'status': 'finished', 'postprocessor': 'FFmpegExtractAudio'})
+
+    assert POSTPROCESS_SECONDS.count(postprocessor='FFmpegExtractAudio') == before + 1
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_outcomes_counted(mock_ytdl_class, temp_downloads_dir):
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        downloader = YouTubeDownloader()
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    started = DOWNLOADS_STARTED.value(kind='video')
+    succeeded = DOWNLOADS_SUCCEEDED.value(kind='video')
+    failed = DOWNLOADS_FAILED.value(kind='video')
+    fallbacks = FALLBACKS_USED.value(scope='video')
+
+    downloader.download('https://www.youtube.com/watch?v=ok', format='mp4')
+    mock_ytdl.download.side_effect = Exception("Video unavailable")
+    downloader.download('https://www.youtube.com/watch?v=gone', format='mp4')
+
+    assert DOWNLOADS_STARTED.value(kind='video') == started + 2
+    assert DOWNLOADS_SUCCEEDED.value(kind='video') == succeeded + 1
+    assert DOWNLOADS_FAILED.value(kind='video') == failed + 1
+    assert FALLBACKS_USED.value(scope='video') == fallbacks + 1
+
+
+def test_metrics_route():
+    with gui.app.test_client() as client:
+        with patch('gui.job_manager') as mock_manager:
+            mock_manager.queue_depth = 4
+            mock_manager.active_workers = 2
+            response = client.get('/metrics')
+
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.content_type == Registry.CONTENT_TYPE
+    assert 'ytdl_queue_depth 4' in body
+    assert 'ytdl_active_workers 2' in body
+    assert '# TYPE ytdl_download_seconds histogram' in body
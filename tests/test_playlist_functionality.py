@@ -1,9 +1,13 @@
 """
 Simplified tests for playlist functionality in YouTubeDownloader.
 """
+import threading
 import pytest
 from unittest.mock import patch, Mock
 from src.youtube_downloader import YouTubeDownloader
+from src.download_result import DownloadResult
+from src.postprocess import TranscodePool
+from src.ffmpeg_probe import FFmpegCapabilities
 
 
 @pytest.fixture
@@ -12,6 +16,18 @@ def downloader(temp_downloads_dir):
         return YouTubeDownloader()
 
 
+def _report_entries(mock_ytdl, directory, *video_ids):
+    """Make the mocked playlist download produce a file for each of ``video_ids``."""
+    collectors = []
+    mock_ytdl.add_post_processor.side_effect = lambda pp, when: collectors.append(pp)
+    
+    def fake_process(playlist, download):
+        for video_id in video_ids:
+            collectors[-1].run({'filepath': str(directory / f"{video_id}.mp4"), 'id': video_id})
+    
+    mock_ytdl.process_ie_result.side_effect = fake_process
+
+
 class TestPlaylistDetection:
     """Test playlist URL detection."""
     
@@ -42,7 +58,7 @@ class TestPlaylistDetection:
 class TestPlaylistInfo:
     """Test playlist information extraction."""
     
-    @patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+    @patch('src.session.yt_dlp.YoutubeDL')
     def test_get_playlist_info_success(self, mock_ytdl_class, downloader):
         """Test successful playlist info extraction."""
         mock_data = {
@@ -63,7 +79,7 @@ class TestPlaylistInfo:
         assert result['uploader'] == 'Test Channel'
         assert result['video_count'] == 2
     
-    @patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+    @patch('src.session.yt_dlp.YoutubeDL')
     def test_get_playlist_info_with_redirect(self, mock_ytdl_class, downloader):
         """Test playlist info extraction with URL redirect."""
         redirect_data = {'_type': 'url', 'url': 'https://www.youtube.com/playlist?list=PLtest123'}
@@ -82,7 +98,7 @@ class TestPlaylistInfo:
         assert result['title'] == 'Test Playlist'
         assert mock_ytdl.extract_info.call_count == 2
     
-    @patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+    @patch('src.session.yt_dlp.YoutubeDL')
     def test_get_playlist_info_no_entries(self, mock_ytdl_class, downloader):
         """Test playlist info extraction returns None when no entries found."""
         mock_data = {'title': 'Empty Playlist', 'uploader': 'Test Channel'}
@@ -96,10 +112,86 @@ class TestPlaylistInfo:
         assert result is None
 
 
+class TestPlaylistStreaming:
+    """Test lazily listed playlists."""
+    
+    url = 'https://www.youtube.com/playlist?list=PLtest123'
+    
+    @staticmethod
+    def _paged(listed, *ids, wait=None):
+        """Entries generator standing in for an extractor that fetches pages on demand."""
+        for video_id in ids:
+            if wait is not None and video_id != ids[0]:
+                assert wait.wait(5), "later pages were requested before any download started"
+            listed.append(video_id)
+            yield {'_type': 'url', 'id': video_id, 'title': f"Video {video_id}", 'url': video_id, 'duration': 60}
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    def test_iter_playlist_entries_is_lazy(self, mock_ytdl_class, downloader):
+        """Test that records are yielded without listing the rest of the playlist."""
+        listed = []
+        mock_ytdl = Mock()
+        mock_ytdl.extract_info.return_value = {'title': 'Big Channel', 'entries': self._paged(listed, 'vid1', 'vid2', 'vid3')}
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        entries = downloader.iter_playlist_entries(self.url)
+        first = next(entries)
+        
+        assert first == {'id': 'vid1', 'title': 'Video vid1', 'url': 'https://www.youtube.com/watch?v=vid1', 'duration': 60}
+        assert listed == ['vid1']
+        assert [entry['id'] for entry in entries] == ['vid2', 'vid3']
+        assert mock_ytdl.extract_info.call_args[1]['process'] is False
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    def test_playlist_cached_once_fully_listed(self, mock_ytdl_class, downloader):
+        """Test that a streamed playlist is cached after its last entry."""
+        mock_ytdl = Mock()
+        mock_ytdl.extract_info.return_value = {'title': 'Big Channel', 'entries': self._paged([], 'vid1', 'vid2')}
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        list(downloader.iter_playlist_entries(self.url))
+        entries = list(downloader.iter_playlist_entries(self.url))
+        
+        assert [entry['id'] for entry in entries] == ['vid1', 'vid2']
+        mock_ytdl.extract_info.assert_called_once()
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    def test_video_count_from_metadata(self, mock_ytdl_class, downloader):
+        """Test that the count comes from metadata without listing the entries."""
+        listed = []
+        mock_ytdl = Mock()
+        mock_ytdl.extract_info.return_value = {
+            'title': 'Big Channel', 'playlist_count': 25000, 'entries': self._paged(listed, 'vid1')
+        }
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        assert downloader.get_playlist_info(self.url)['video_count'] == 25000
+        mock_ytdl.extract_info.return_value = {'title': 'Other', 'entries': self._paged(listed, 'vid1')}
+        assert downloader.get_playlist_info(self.url + 'X')['video_count'] is None
+        assert listed == []
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_downloads_start_before_listing_finishes(self, mock_extract, mock_ytdl_class, downloader):
+        """Test that the engine starts on the first entry while later pages are pending."""
+        first_download = threading.Event()
+        listed = []
+        mock_extract.return_value = {'title': 'Big Channel', 'entries': self._paged(listed, 'vid1', 'vid2', wait=first_download)}
+        mock_ytdl = Mock()
+        mock_ytdl.download.side_effect = lambda urls: first_download.set()
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        result = downloader.download_playlist(self.url, max_workers=2)
+        
+        assert result.success is True
+        assert listed == ['vid1', 'vid2']
+        assert mock_ytdl.download.call_count == 2
+
+
 class TestPlaylistDownload:
     """Test playlist download functionality."""
     
-    @patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+    @patch('src.session.yt_dlp.YoutubeDL')
     @patch.object(YouTubeDownloader, 'get_playlist_info')
     def test_download_playlist_success(self, mock_get_info, mock_ytdl_class, downloader):
         """Test successful playlist download."""
@@ -111,9 +203,64 @@ class TestPlaylistDownload:
         
         result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLtest123')
         
-        assert result is True
+        assert result.success is True
         mock_ytdl.download.assert_called_once()
     
+    @patch('src.session.yt_dlp.YoutubeDL')
+    def test_download_playlist_reuses_playlist_info(self, mock_ytdl_class, downloader):
+        """Test that the playlist is extracted once for both the info lookup and the download."""
+        playlist_data = {
+            'title': 'Test Playlist',
+            'uploader': 'Test Channel',
+            'entries': [{'id': 'vid1', 'title': 'Video 1'}, {'id': 'vid2', 'title': 'Video 2'}]
+        }
+        mock_ytdl = Mock()
+        mock_ytdl.extract_info.return_value = playlist_data
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        _report_entries(mock_ytdl, downloader.output_dir, 'vid1', 'vid2')
+        url = 'https://www.youtube.com/playlist?list=PLtest123'
+        
+        downloader.get_playlist_info(url)
+        result = downloader.download_playlist(url)
+        
+        assert result.success is True
+        mock_ytdl.extract_info.assert_called_once()
+        mock_ytdl.process_ie_result.assert_called_once_with(playlist_data, download=True)
+        mock_ytdl.download.assert_not_called()
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    def test_failed_entries_retried_individually(self, mock_ytdl_class, downloader):
+        """Test that only entries without output are retried with the fallback options."""
+        playlist_data = {
+            'title': 'Test Playlist',
+            'entries': [
+                {'id': 'vid1', 'title': 'Video 1'},
+                {'id': 'vid2', 'title': 'Video 2'},
+                {'id': 'vid3', 'title': 'Video 3'},
+            ]
+        }
+        mock_ytdl = Mock()
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        _report_entries(mock_ytdl, downloader.output_dir, 'vid1')
+        url = 'https://www.youtube.com/playlist?list=PLtest123'
+        retried_file = downloader.output_dir / 'Video 2.mp4'
+        fallbacks = {
+            'https://www.youtube.com/watch?v=vid2': DownloadResult(success=True, files=[retried_file]),
+            'https://www.youtube.com/watch?v=vid3': DownloadResult(error="Video unavailable"),
+        }
+        
+        with patch.object(YouTubeDownloader, '_try_fallback', side_effect=lambda entry_url, *args, **kwargs: fallbacks[entry_url]) as mock_fallback:
+            result = downloader.download_playlist(url, info=playlist_data)
+        
+        assert mock_fallback.call_count == 2
+        assert result.success is False
+        results = {r['id']: r for r in result.entries}
+        assert results['vid1']['success'] is True and results['vid1']['retried'] is False
+        assert results['vid2']['success'] is True and results['vid2']['retried'] is True
+        assert results['vid3']['success'] is False and results['vid3']['error'] == "Video unavailable"
+        assert result.summary == {'total': 3, 'skipped': 0, 'fetched': 2, 'retried': 2, 'failed': 1}
+        assert retried_file in result.files
+    
     @patch.object(YouTubeDownloader, 'get_playlist_info')
     def test_download_playlist_no_info(self, mock_get_info, downloader):
         """Test playlist download fails when no info available."""
@@ -121,7 +268,124 @@ class TestPlaylistDownload:
         
         result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLerror')
         
-        assert result is False
+        assert result.success is False
+
+
+class TestConcurrentPlaylistDownload:
+    """Test the concurrent per-entry playlist engine."""
+    
+    playlist_data = {
+        'title': 'Test Playlist',
+        'entries': [
+            {'id': 'vid1', 'title': 'Video 1', 'url': 'https://www.youtube.com/watch?v=vid1'},
+            {'id': 'vid2', 'title': 'Video 2', 'url': 'https://www.youtube.com/watch?v=vid2'},
+            {'id': 'vid3', 'title': 'Video 3'},
+        ]
+    }
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_each_entry_downloaded_separately(self, mock_extract, mock_ytdl_class, downloader):
+        """Test that every entry gets its own download call."""
+        mock_extract.return_value = self.playlist_data
+        mock_ytdl = Mock()
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        progress = []
+        result = downloader.download_playlist(
+            'https://www.youtube.com/playlist?list=PLtest123',
+            progress_callback=lambda current, total, title: progress.append((current, total)),
+            max_workers=3
+        )
+        
+        assert result.success is True
+        downloaded = sorted(call.args[0][0] for call in mock_ytdl.download.call_args_list)
+        assert downloaded == [
+            'https://www.youtube.com/watch?v=vid1',
+            'https://www.youtube.com/watch?v=vid2',
+            'https://www.youtube.com/watch?v=vid3',
+        ]
+        assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+        assert all(r['success'] for r in result.entries)
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_try_fallback', return_value=DownloadResult())
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_entry_failures_reported(self, mock_extract, mock_fallback, mock_ytdl_class, downloader):
+        """Test that a failing entry is reported without stopping the others."""
+        mock_extract.return_value = self.playlist_data
+        
+        def fake_download(urls):
+            if urls[0].endswith('vid2'):
+                raise Exception("Video unavailable")
+        
+        mock_ytdl = Mock()
+        mock_ytdl.download.side_effect = fake_download
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        
+        result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLtest123', max_workers=2)
+        
+        assert result.success is False
+        results = {r['id']: r for r in result.entries}
+        assert results['vid1']['success'] is True
+        assert results['vid3']['success'] is True
+        assert results['vid2']['success'] is False
+        assert results['vid2']['error'] == "Video unavailable"
+    
+    @patch.object(YouTubeDownloader, '_extract_playlist', return_value=None)
+    def test_no_playlist_info(self, mock_extract, downloader):
+        """Test concurrent download fails when the playlist cannot be extracted."""
+        result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLerror', max_workers=4)
+        
+        assert result.success is False
+
+
+class TestPlaylistSync:
+    """Test incremental playlist sync backed by the download archive."""
+    
+    playlist_data = {
+        'title': 'Test Playlist',
+        'entries': [
+            {'id': 'vid1', 'title': 'Video 1'},
+            {'id': 'vid2', 'title': 'Video 2'},
+            {'id': 'vid3', 'title': 'Video 3'},
+        ]
+    }
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_sync_skips_archived_entries(self, mock_extract, mock_ytdl_class, downloader):
+        """Test that archived entries are skipped and new ones are recorded."""
+        mock_extract.return_value = self.playlist_data
+        mock_ytdl = Mock()
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        downloader._get_archive('mp4', '720', 'best').add('vid2')
+        
+        result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLtest123', sync=True)
+        
+        assert result.success is True
+        downloaded = [call.args[0][0] for call in mock_ytdl.download.call_args_list]
+        assert downloaded == [
+            'https://www.youtube.com/watch?v=vid1',
+            'https://www.youtube.com/watch?v=vid3',
+        ]
+        assert result.summary == {'total': 3, 'skipped': 1, 'fetched': 2, 'retried': 0, 'failed': 0}
+        assert 'vid1' in downloader._get_archive('mp4', '720', 'best')
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_sync_archive_is_per_format(self, mock_extract, mock_ytdl_class, downloader):
+        """Test that an MP4 archive does not cause MP3 downloads to be skipped."""
+        mock_extract.return_value = self.playlist_data
+        mock_ytdl = Mock()
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+        for video_id in ('vid1', 'vid2', 'vid3'):
+            downloader._get_archive('mp4', '720', 'best').add(video_id)
+        
+        result = downloader.download_playlist('https://www.youtube.com/playlist?list=PLtest123', format='mp3', sync=True)
+        
+        assert mock_ytdl.download.call_count == 3
+        assert result.summary['skipped'] == 0
 
 
 class TestMainDownloadIntegration:
@@ -139,7 +403,7 @@ class TestMainDownloadIntegration:
         assert result is True
         mock_download_playlist.assert_called_once()
     
-    @patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+    @patch('src.session.yt_dlp.YoutubeDL')
     @patch.object(YouTubeDownloader, 'is_playlist_url')
     def test_main_download_handles_single_video(self, mock_is_playlist, mock_ytdl_class, downloader):
         """Test that main download method handles single videos correctly."""
@@ -151,5 +415,77 @@ class TestMainDownloadIntegration:
         
         result = downloader.download('https://www.youtube.com/watch?v=single123')
         
-        assert result is True
-        mock_ytdl.download.assert_called_once()
\ No newline at end of file
+        assert result.success is True
+        mock_ytdl.download.assert_called_once()
+
+class TestDeferredTranscoding:
+    """Test that MP3 playlists hand conversion to the transcode pool."""
+    
+    playlist_data = {
+        'title': 'Test Playlist',
+        'entries': [
+            {'id': 'vid1', 'title': 'Video 1'},
+            {'id': 'vid2', 'title': 'Video 2'},
+        ]
+    }
+    
+    @pytest.fixture
+    def transcode_downloader(self, temp_downloads_dir):
+        pool = TranscodePool(workers=2, ffmpeg_path='/usr/bin/ffmpeg')
+        capabilities = FFmpegCapabilities('/usr/bin/ffmpeg', '6.1', ['libmp3lame'], [], ['mp3'], [], [])
+        with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir), \
+                patch('src.postprocess.probe_ffmpeg', return_value=capabilities):
+            yield YouTubeDownloader(transcode_pool=pool)
+        pool.shutdown()
+    
+    def _report_source(self, mock_ytdl_class, mock_ytdl, directory):
+        """Make each download report a .webm file through the session's post processor."""
+        def download(urls):
+            path = directory / f"{urls[0][-4:]}.webm"
+            path.write_bytes(b'opus')
+            dispatcher = mock_ytdl.add_post_processor.call_args[0][0]
+            dispatcher.run({'filepath': str(path), 'id': urls[0][-4:]})
+        mock_ytdl.download.side_effect = download
+        mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_mp3_entries_transcoded_by_pool(self, mock_extract, mock_ytdl_class, transcode_downloader, temp_downloads_dir):
+        mock_extract.return_value = self.playlist_data
+        self._report_source(mock_ytdl_class, Mock(), temp_downloads_dir)
+        
+        def transcode(source, bitrate=None):
+            dest = source.with_suffix('.mp3')
+            source.rename(dest)
+            return dest
+        
+        with patch.object(transcode_downloader.transcode_pool, 'transcode', side_effect=transcode):
+            result = transcode_downloader.download_playlist('https://www.youtube.com/playlist?list=PLtest123', format='mp3')
+        
+        assert result.success is True
+        assert sorted(path.name for path in result.files) == ['vid1.mp3', 'vid2.mp3']
+        assert not list(temp_downloads_dir.glob('*.webm'))
+        assert 'postprocessors' not in mock_ytdl_class.call_args[0][0]
+    
+    @patch('src.session.yt_dlp.YoutubeDL')
+    @patch.object(YouTubeDownloader, '_extract_playlist')
+    def test_transcode_failure_fails_entry(self, mock_extract, mock_ytdl_class, transcode_downloader, temp_downloads_dir):
+        mock_extract.return_value = self.playlist_data
+        self._report_source(mock_ytdl_class, Mock(), temp_downloads_dir)
+        
+        def transcode(source, bitrate=None):
+            if source.stem == 'vid2':
+                raise RuntimeError("ffmpeg failed")
+            return source.with_suffix('.mp3')
+        
+        with patch.object(transcode_downloader.transcode_pool, 'transcode', side_effect=transcode):
+            result = transcode_downloader.download_playlist(
+                'https://www.youtube.com/playlist?list=PLtest123', format='mp3', sync=True
+            )
+        
+        assert result.success is False
+        failed = [entry for entry in result.entries if not entry['success']]
+        assert [entry['id'] for entry in failed] == ['vid2']
+        assert failed[0]['error'] == 'ffmpeg failed'
+        archive = transcode_downloader._get_archive('mp3', None, 'best')
+        assert 'vid1' in archive and 'vid2' not in archive
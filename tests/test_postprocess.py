@@ -0,0 +1,126 @@
+"""
+Tests for the MP3 transcode pool.
+"""
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch, Mock
+
+from src.postprocess import TranscodePool, ThreadPoolExecutor
+from src.ffmpeg_probe import FFmpegCapabilities
+
+
+@pytest.fixture
+def pool():
+    pool = TranscodePool(workers=2, ffmpeg_path='/usr/bin/ffmpeg')
+    yield pool
+    pool.shutdown()
+
+
+def fake_ffmpeg(returncode=0):
+    """subprocess.run stand-in that writes the output file ffmpeg was asked for."""
+    def run(command, **kwargs):
+        if returncode == 0:
+            Path(command[-1]).write_bytes(b'mp3 data')
+        return Mock(returncode=returncode, stderr='bad input')
+    return run
+
+
+def test_transcode_replaces_source(pool, temp_downloads_dir):
+    source = temp_downloads_dir / 'Song.webm'
+    source.write_bytes(b'opus data')
+
+    with patch('src.postprocess.subprocess.run', side_effect=fake_ffmpeg()) as mock_run:
+        dest = pool.transcode(source, '192')
+
+    assert dest == temp_downloads_dir / 'Song.mp3'
+    assert dest.read_bytes() == b'mp3 data'
+    assert not source.exists()
+    command = mock_run.call_args[0][0]
+    assert command[0] == '/usr/bin/ffmpeg'
+    assert command[command.index('-b:a') + 1] == '192k'
+
+
+def test_transcode_failure_keeps_source(pool, temp_downloads_dir):
+    source = temp_downloads_dir / 'Song.webm'
+    source.write_bytes(b'opus data')
+
+    with patch('src.postprocess.subprocess.run', side_effect=fake_ffmpeg(returncode=1)):
+        with pytest.raises(RuntimeError, match='bad input'):
+            pool.transcode(source)
+
+    assert source.exists()
+    assert sorted(p.name for p in temp_downloads_dir.iterdir()) == ['Song.webm']
+
+
+def test_mp3_source_left_alone(pool, temp_downloads_dir):
+    source = temp_downloads_dir / 'Song.mp3'
+    source.write_bytes(b'mp3 data')
+
+    with patch('src.postprocess.subprocess.run') as mock_run:
+        assert pool.transcode(source) == source
+    mock_run.assert_not_called()
+
+
+def test_submit_runs_on_pool(pool, temp_downloads_dir):
+    sources = []
+    for number in range(3):
+        source = temp_downloads_dir / f'Song {number}.m4a'
+        source.write_bytes(b'aac data')
+        sources.append(source)
+
+    with patch('src.postprocess.subprocess.run', side_effect=fake_ffmpeg()):
+        futures = [pool.submit(source) for source in sources]
+        results = [future.result(timeout=5) for future in futures]
+
+    assert [path.name for path in results] == ['Song 0.mp3', 'Song 1.mp3', 'Song 2.mp3']
+
+
+def test_running_pool_shut_down_at_exit(pool, temp_downloads_dir):
+    source = temp_downloads_dir / 'Song.mp3'
+    source.write_bytes(b'mp3 data')
+
+    with patch('src.postprocess.atexit') as mock_atexit:
+        pool.submit(source).result(timeout=5)
+        pool.submit(source).result(timeout=5)
+        mock_atexit.register.assert_called_once_with(pool.shutdown)
+
+        pool.shutdown()
+        mock_atexit.unregister.assert_called_once_with(pool.shutdown)
+
+
+def test_concurrent_submits_share_one_executor(pool, temp_downloads_dir):
+    created = []
+
+    def slow_executor(**kwargs):
+        # Widen the window in which a second thread could build its own executor
+        time.sleep(0.05)
+        executor = ThreadPoolExecutor(**kwargs)
+        created.append(executor)
+        return executor
+
+    source = temp_downloads_dir / 'Song.mp3'
+    source.write_bytes(b'mp3 data')
+    with patch('src.postprocess.ThreadPoolExecutor', side_effect=slow_executor):
+        threads = [threading.Thread(target=pool.submit, args=(source,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(created) == 1
+
+
+def test_unavailable_without_ffmpeg():
+    with patch('src.postprocess.shutil.which', return_value=None):
+        assert TranscodePool().available is False
+
+
+@pytest.mark.parametrize('capabilities', [
+    None,
+    FFmpegCapabilities('/usr/bin/ffmpeg', None, [], [], [], [], []),
+])
+def test_unavailable_when_ffmpeg_missing_or_broken(capabilities):
+    with patch('src.postprocess.probe_ffmpeg', return_value=capabilities):
+        assert TranscodePool(ffmpeg_path='/usr/bin/ffmpeg').available is False
@@ -0,0 +1,94 @@
+"""
+Tests for throttled byte-level progress events.
+"""
+import pytest
+from unittest.mock import patch
+
+from src.progress import ProgressTracker, format_progress
+
+
+def downloading(filename, done, total, speed=None, **extra):
+    return {'status': 'downloading', 'filename': filename, 'downloaded_bytes': done,
+            'total_bytes': total, 'speed': speed, **extra}
+
+
+@pytest.fixture
+def clock():
+    now = [100.0]
+    with patch('src.progress.time.monotonic', side_effect=lambda: now[0]):
+        yield now
+
+
+def test_updates_throttled_to_interval(clock):
+    events = []
+    tracker = ProgressTracker(events.append, interval=1.0)
+
+    for done in (100, 200, 300):
+        tracker.hook(downloading('/tmp/a.mp4', done, 1000))
+        clock[0] += 0.6
+
+    assert [event['downloaded_bytes'] for event in events] == [100, 300]
+
+
+def test_finished_always_emitted(clock):
+    events = []
+    tracker = ProgressTracker(events.append, interval=10.0)
+
+    tracker.hook(downloading('/tmp/a.mp4', 100, 1000))
+    tracker.hook({'status': 'finished', 'filename': '/tmp/a.mp4', 'downloaded_bytes': 1000, 'total_bytes': 1000})
+    tracker.hook({'status': 'error', 'filename': '/tmp/a.mp4'})
+
+    assert [event['status'] for event in events] == ['downloading', 'finished']
+    assert events[-1]['aggregate']['files_finished'] == 1
+
+
+def test_aggregate_across_concurrent_files(clock):
+    events = []
+    tracker = ProgressTracker(events.append, interval=0)
+
+    tracker.hook({'status': 'finished', 'filename': '/tmp/a.mp4', 'downloaded_bytes': 1000, 'total_bytes': 1000})
+    tracker.hook(downloading('/tmp/b.mp4', 200, 2000, speed=100.0))
+    clock[0] += 2
+    tracker.hook(downloading('/tmp/c.mp4', 300, 1000, speed=50.0, elapsed=3,
+                             fragment_index=2, fragment_count=8, info_dict={'id': 'vid3'}))
+
+    event = events[-1]
+    assert event['filename'] == 'c.mp4'
+    assert event['video_id'] == 'vid3'
+    assert event['average_speed'] == 100.0
+    assert (event['fragment_index'], event['fragment_count']) == (2, 8)
+    aggregate = event['aggregate']
+    assert aggregate['downloaded_bytes'] == 1500
+    assert aggregate['total_bytes'] == 4000
+    assert aggregate['speed'] == 150.0
+    assert aggregate['average_speed'] == 750.0
+    assert aggregate['eta'] == 16
+    assert (aggregate['files_finished'], aggregate['files_active']) == (1, 2)
+
+
+def test_unknown_size_leaves_totals_open(clock):
+    events = []
+    tracker = ProgressTracker(events.append, interval=0)
+
+    tracker.hook(downloading('/tmp/a.mp4', 200, None, speed=100.0))
+
+    assert events[0]['aggregate']['total_bytes'] is None
+    assert events[0]['aggregate']['eta'] is None
+
+
+def test_wrap_reuses_tracker():
+    tracker = ProgressTracker(print)
+
+    assert ProgressTracker.wrap(tracker) is tracker
+    assert ProgressTracker.wrap(None) is None
+    assert isinstance(ProgressTracker.wrap(print), ProgressTracker)
+
+
+def test_format_progress():
+    line = format_progress({
+        'status': 'downloading', 'filename': 'a.mp4', 'downloaded_bytes': 1048576, 'total_bytes': 4194304,
+        'speed': 2097152.0, 'eta': 1, 'fragment_index': 3, 'fragment_count': 10,
+        'aggregate': {'files_finished': 1, 'files_active': 1, 'downloaded_bytes': 5242880, 'average_speed': 1048576.0}
+    })
+
+    assert line == 'a.mp4 | 1.0/4.0 MB (25%) | 2.0 MB/s | ETA 1s | fragment 3/10 | total 5.0 MB at 1.0 MB/s avg'
@@ -0,0 +1,122 @@
+"""
+Tests for the adaptive rate limiter shared by all YouTube requests.
+"""
+import threading
+import pytest
+from unittest.mock import patch, Mock
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from src.ratelimit import AdaptiveRateLimiter
+from src.session import YoutubeDLSession
+from src.youtube_downloader import YouTubeDownloader
+
+
+@patch('src.ratelimit.time.sleep')
+def test_burst_does_not_sleep(mock_sleep):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=3)
+
+    waits = [limiter.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    mock_sleep.assert_not_called()
+
+
+@patch('src.ratelimit.time.sleep')
+def test_empty_bucket_waits_for_refill(mock_sleep):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=1)
+
+    limiter.acquire()
+    wait = limiter.acquire()
+
+    assert 0.4 < wait <= 0.5
+    mock_sleep.assert_called_once_with(wait)
+
+
+@patch('src.ratelimit.time.sleep')
+def test_concurrent_callers_share_budget(mock_sleep):
+    limiter = AdaptiveRateLimiter(rate=1.0, burst=2)
+    waits = []
+
+    threads = [threading.Thread(target=lambda: waits.append(limiter.acquire())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Two callers fit in the burst, the other two queue one second apart
+    assert sorted(round(wait) for wait in waits) == [0, 0, 1, 2]
+
+
+@patch('src.ratelimit.time.sleep')
+def test_throttling_halves_rate_and_success_recovers(mock_sleep):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=5, min_rate=0.5, increase=0.5)
+
+    assert limiter.record_failure(DownloadError("ERROR: unable to download video data: HTTP Error 429: Too Many Requests"))
+    assert limiter.rate == 1.0
+    assert limiter.acquire() > 0
+
+    limiter.record_failure(DownloadError("HTTP Error 403: Forbidden"))
+    limiter.record_failure(DownloadError("HTTP Error 403: Forbidden"))
+    assert limiter.rate == 0.5
+
+    for _ in range(5):
+        limiter.record_success()
+    assert limiter.rate == 2.0
+
+
+@pytest.mark.parametrize('error, throttled', [
+    (DownloadError("HTTP Error 429: Too Many Requests"), True),
+    (DownloadError("wrapped", exc_info=(ExtractorError, ExtractorError("Sign in to confirm you're not a bot"), None)), True),
+    (ExtractorError("Unable to extract player response"), True),
+    (ExtractorError("Video unavailable", expected=True), False),
+    (Exception("Video unavailable"), False),
+    (Mock(spec=Exception, status=429), True),
+])
+def test_is_throttled(error, throttled):
+    assert AdaptiveRateLimiter.is_throttled(error) is throttled
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_session_reports_outcomes(mock_ytdl_class):
+    limiter = Mock()
+    session = YoutubeDLSession(rate_limiter=limiter)
+    error = DownloadError("HTTP Error 429: Too Many Requests")
+
+    with session.use({'quiet': True}):
+        pass
+    with pytest.raises(DownloadError):
+        with session.use({'quiet': True}):
+            raise error
+
+    limiter.record_success.assert_called_once()
+    limiter.record_failure.assert_called_once_with(error)
+
+
+def test_session_backs_off_on_ignored_throttling():
+    limiter = AdaptiveRateLimiter(rate=1.0)
+    session = YoutubeDLSession(rate_limiter=limiter)
+
+    # With ignoreerrors yt-dlp reports the 429 and carries on instead of raising
+    with session.use({'quiet': True, 'ignoreerrors': True}) as ydl:
+        ydl.report_error('[youtube] abc: Unable to download API page: HTTP Error 429: Too Many Requests')
+    assert limiter.rate == 0.5
+
+    with session.use({'quiet': True, 'ignoreerrors': True}) as ydl:
+        ydl.report_error('[youtube] abc: Video unavailable')
+    assert limiter.rate == 0.5
+
+    with session.use({'quiet': True, 'ignoreerrors': True}):
+        pass
+    assert limiter.rate == 0.6
+    session.close()
+
+
+def test_downloads_share_process_limiter(rate_limiter, temp_downloads_dir):
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        first, second = YouTubeDownloader(), YouTubeDownloader()
+
+    opts = first._get_download_options('mp4', '720', 'best')
+
+    assert first.session.rate_limiter is second.session.rate_limiter is rate_limiter
+    assert opts['match_filter'] == rate_limiter.match_filter
+    assert 'sleep_interval' not in opts
@@ -0,0 +1,136 @@
+"""
+Tests for the pooled YoutubeDL session.
+"""
+import threading
+import pytest
+from unittest.mock import patch, Mock
+
+from src.session import YoutubeDLSession
+
+
+@pytest.fixture
+def mock_ytdl_class():
+    with patch('src.session.yt_dlp.YoutubeDL') as mock_class:
+        mock_class.side_effect = lambda opts: Mock(**{'__enter__': Mock(return_value=Mock(opts=opts)), '__exit__': Mock()})
+        yield mock_class
+
+
+def test_same_profile_reuses_instance(mock_ytdl_class):
+    session = YoutubeDLSession()
+    
+    with session.use({'quiet': True, 'progress_hooks': [Mock()]}) as first:
+        pass
+    with session.use({'quiet': True, 'progress_hooks': [Mock()]}) as second:
+        pass
+    with session.use({'quiet': False}) as other:
+        pass
+    
+    assert first is second
+    assert other is not first
+    assert mock_ytdl_class.call_count == 2
+
+
+def test_progress_hooks_apply_to_current_call(mock_ytdl_class):
+    session = YoutubeDLSession()
+    first_hook, second_hook = Mock(), Mock()
+    
+    with session.use({'quiet': True, 'progress_hooks': [first_hook]}) as ydl:
+        for hook in ydl.opts['progress_hooks']:
+            hook({'status': 'downloading'})
+    with session.use({'quiet': True, 'progress_hooks': [second_hook]}) as ydl:
+        for hook in ydl.opts['progress_hooks']:
+            hook({'status': 'finished'})
+    
+    first_hook.assert_called_once_with({'status': 'downloading'})
+    second_hook.assert_called_once_with({'status': 'finished'})
+
+
+def test_postprocessors_apply_to_current_call(mock_ytdl_class):
+    session = YoutubeDLSession()
+    collector = Mock()
+    collector.run.return_value = ([], {'filepath': 'a.mp4'})
+    
+    with session.use({'quiet': True}, collector) as ydl:
+        dispatcher = ydl.add_post_processor.call_args[0][0]
+        dispatcher.run({'filepath': 'a.mp4'})
+    with session.use({'quiet': True}) as ydl:
+        dispatcher.run({'filepath': 'b.mp4'})
+    
+    collector.run.assert_called_once_with({'filepath': 'a.mp4'})
+    assert ydl.add_post_processor.call_args[1]['when'] == 'after_move'
+
+
+def test_failed_instance_is_not_reused(mock_ytdl_class):
+    session = YoutubeDLSession()
+    
+    with pytest.raises(RuntimeError):
+        with session.use({'quiet': True}) as first:
+            raise RuntimeError("download failed")
+    with session.use({'quiet': True}) as second:
+        pass
+    
+    assert first is not second
+    assert mock_ytdl_class.call_count == 2
+
+
+def test_least_recently_used_profile_evicted(mock_ytdl_class):
+    session = YoutubeDLSession(max_instances=2)
+    
+    for quality in ('360', '480', '720'):
+        with session.use({'format': quality}):
+            pass
+    with session.use({'format': '360'}):
+        pass
+    
+    assert mock_ytdl_class.call_count == 4
+    assert len(session._instances()) == 2
+
+
+def test_instances_are_per_thread(mock_ytdl_class):
+    session = YoutubeDLSession()
+    seen = []
+    
+    def use():
+        with session.use({'quiet': True}) as ydl:
+            seen.append(ydl)
+    
+    use()
+    thread = threading.Thread(target=use)
+    thread.start()
+    thread.join()
+    
+    assert seen[0] is not seen[1]
+
+
+def test_nested_use_gets_private_instance(mock_ytdl_class):
+    session = YoutubeDLSession()
+    
+    with session.use({'quiet': True}) as outer:
+        with session.use({'quiet': True}) as inner:
+            assert inner is not outer
+    with session.use({'quiet': True}) as again:
+        pass
+    
+    assert again is outer
+
+
+def test_instances_of_finished_threads_are_closed(mock_ytdl_class):
+    session = YoutubeDLSession()
+    contexts = []
+    create = mock_ytdl_class.side_effect
+    mock_ytdl_class.side_effect = lambda opts: contexts.append(create(opts)) or contexts[-1]
+    
+    def use():
+        with session.use({'quiet': True}):
+            pass
+    
+    for _ in range(3):
+        thread = threading.Thread(target=use)
+        thread.start()
+        thread.join()
+    
+    # Each new thread closes those that came before it; reap closes the last
+    assert [context.__exit__.called for context in contexts] == [True, True, False]
+    assert session.reap() == 1
+    assert session.reap() == 0
+    assert all(context.__exit__.called for context in contexts)
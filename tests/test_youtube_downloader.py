@@ -6,8 +6,12 @@ import tempfile
 from pathlib import Path
 from unittest.mock import patch, Mock
 import os
+import threading
+from yt_dlp.extractor.youtube import YoutubeIE
 
 from src.youtube_downloader import YouTubeDownloader
+from src.metadata_cache import MetadataCache
+from src.download_result import DownloadResult
 
 
 @pytest.fixture
@@ -30,7 +34,7 @@ def test_init_creates_output_directory(temp_downloads_dir):
 
 
 # Video Info Tests
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+@patch('src.session.yt_dlp.YoutubeDL')
 def test_get_video_info_success(mock_ytdl_class, downloader, mock_video_info):
     """Test successful video info extraction."""
     mock_ytdl = Mock()
@@ -41,11 +45,33 @@ def test_get_video_info_success(mock_ytdl_class, downloader, mock_video_info):
     
     assert result == mock_video_info
     mock_ytdl.extract_info.assert_called_once_with(
-        'https://www.youtube.com/watch?v=test', download=False
+        'https://www.youtube.com/watch?v=test', download=False, process=False
     )
 
 
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+def test_mp3_after_video_info_fetches_audio_only(downloader):
+    """Test that a lookup does not leave its format selection behind for the download."""
+    formats = [
+        {'format_id': 'v', 'url': 'https://media.example/v', 'ext': 'mp4', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720},
+        {'format_id': 'a', 'url': 'https://media.example/a', 'ext': 'm4a', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 128},
+    ]
+    raw = {'id': 'abcdefghijk', 'title': 'Test Video', 'uploader': 'Tester', 'duration': 60, 'formats': formats}
+    fetched = []
+
+    def process_info(ydl, info):
+        fetched.append([f['format_id'] for f in info.get('requested_formats') or [info]])
+
+    url = 'https://www.youtube.com/watch?v=abcdefghijk'
+    with patch.object(YoutubeIE, 'extract', side_effect=lambda _: dict(raw, formats=[dict(f) for f in formats])), \
+            patch('yt_dlp.YoutubeDL.YoutubeDL.process_info', autospec=True, side_effect=process_info):
+        info = downloader.get_video_info(url)
+        downloader.download(url, format='mp3')
+
+    assert info == {'title': 'Test Video', 'uploader': 'Tester', 'duration': 60}
+    assert fetched == [['a']]
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
 def test_get_video_info_failure(mock_ytdl_class, downloader, capsys):
     """Test video info extraction failure."""
     mock_ytdl = Mock()
@@ -60,7 +86,7 @@ def test_get_video_info_failure(mock_ytdl_class, downloader, capsys):
 
 
 # Download Tests
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+@patch('src.session.yt_dlp.YoutubeDL')
 def test_download_success(mock_ytdl_class, downloader, capsys):
     mock_ytdl = Mock()
     mock_ytdl.download.return_value = None
@@ -68,13 +94,13 @@ def test_download_success(mock_ytdl_class, downloader, capsys):
     
     result = downloader.download('https://www.youtube.com/watch?v=test', format='mp4')
     
-    assert result is True
+    assert result.success is True
     mock_ytdl.download.assert_called_once_with(['https://www.youtube.com/watch?v=test'])
     captured = capsys.readouterr()
     assert "Successfully downloaded MP4 from: https://www.youtube.com/watch?v=test" in captured.out
 
 
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+@patch('src.session.yt_dlp.YoutubeDL')
 @patch.object(YouTubeDownloader, '_try_fallback')
 def test_download_with_fallback(mock_fallback, mock_ytdl_class, downloader, capsys):
     mock_ytdl = Mock()
@@ -85,11 +111,213 @@ def test_download_with_fallback(mock_fallback, mock_ytdl_class, downloader, caps
     result = downloader.download('https://www.youtube.com/watch?v=test', format='mp4')
     
     assert result is True
-    mock_fallback.assert_called_once_with('https://www.youtube.com/watch?v=test', 'mp4', '720', 'best', None)
+    mock_fallback.assert_called_once_with('https://www.youtube.com/watch?v=test', 'mp4', '720', 'best', None, audio_policy='mp3')
     captured = capsys.readouterr()
     assert "Primary download failed" in captured.out
 
 
+# Extraction Reuse Tests
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_reuses_video_info_extraction(mock_ytdl_class, downloader, mock_video_info):
+    """Test that download() reuses the extraction made by get_video_info()."""
+    mock_ytdl = Mock()
+    mock_ytdl.extract_info.return_value = mock_video_info
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    url = 'https://www.youtube.com/watch?v=test'
+    
+    downloader.get_video_info(url)
+    result = downloader.download(url, format='mp4')
+    
+    assert result.success is True
+    mock_ytdl.extract_info.assert_called_once()
+    mock_ytdl.process_ie_result.assert_called_once_with(mock_video_info, download=True)
+    mock_ytdl.download.assert_not_called()
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_with_explicit_info(mock_ytdl_class, downloader, mock_video_info):
+    """Test that download() accepts a previously extracted info dict."""
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    
+    result = downloader.download('https://www.youtube.com/watch?v=test', info=mock_video_info)
+    
+    assert result.success is True
+    mock_ytdl.extract_info.assert_not_called()
+    mock_ytdl.process_ie_result.assert_called_once_with(mock_video_info, download=True)
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_extraction_reused_only_once(mock_ytdl_class, temp_downloads_dir, mock_video_info):
+    """Test that a remembered extraction is consumed by the first download."""
+    mock_ytdl = Mock()
+    mock_ytdl.extract_info.return_value = mock_video_info
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    url = 'https://www.youtube.com/watch?v=test'
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        downloader = YouTubeDownloader(metadata_cache=MetadataCache(temp_downloads_dir / 'cache.sqlite3', ttl=0))
+    
+    downloader.get_video_info(url)
+    downloader.download(url)
+    downloader.download(url)
+    
+    mock_ytdl.process_ie_result.assert_called_once()
+    mock_ytdl.download.assert_called_once_with([url])
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_info_lookups_reuse_session(mock_ytdl_class, temp_downloads_dir, mock_video_info):
+    """Test that repeated lookups reuse one YoutubeDL instead of building a new one per call."""
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        downloader = YouTubeDownloader(metadata_cache=MetadataCache(temp_downloads_dir / 'cache.sqlite3', ttl=0))
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    mock_ytdl.extract_info.return_value = mock_video_info
+    
+    downloader.get_video_info('https://www.youtube.com/watch?v=one')
+    downloader.get_video_info('https://www.youtube.com/watch?v=two')
+    
+    assert mock_ytdl.extract_info.call_count == 2
+    assert mock_ytdl_class.call_count == 1
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_video_info_served_from_metadata_cache(mock_ytdl_class, downloader, mock_video_info):
+    """Test that repeated lookups and later downloads use the metadata cache."""
+    mock_ytdl = Mock()
+    mock_ytdl.extract_info.return_value = mock_video_info
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    
+    first = downloader.get_video_info(url)
+    second = downloader.get_video_info('https://youtu.be/dQw4w9WgXcQ')
+    downloader.download(url)
+    downloader.download(url)
+    
+    assert first == second == mock_video_info
+    mock_ytdl.extract_info.assert_called_once()
+    assert mock_ytdl.process_ie_result.call_count == 2
+    mock_ytdl.download.assert_not_called()
+
+
+# Output Path Tests
+def _report_files(mock_ytdl, *paths):
+    """Make the mocked YoutubeDL report ``paths`` to the registered output collector."""
+    collectors = []
+    mock_ytdl.add_post_processor.side_effect = lambda pp, when: collectors.append(pp)
+    
+    def fake_download(urls):
+        for path in paths:
+            collectors[-1].run({'filepath': str(path)})
+    
+    mock_ytdl.download.side_effect = fake_download
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_reports_output_files(mock_ytdl_class, downloader, temp_downloads_dir):
+    """Test that download() returns the paths reported by yt-dlp."""
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    output = temp_downloads_dir / 'Test Video.mp4'
+    output.write_text('content')
+    (temp_downloads_dir / 'unrelated.mp4').write_text('other job')
+    _report_files(mock_ytdl, output)
+    
+    result = downloader.download('https://www.youtube.com/watch?v=test')
+    
+    assert result.success is True
+    assert result.files == [output.resolve()]
+    mock_ytdl.add_post_processor.assert_called_once()
+    assert mock_ytdl.add_post_processor.call_args[1]['when'] == 'after_move'
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_copies_only_reported_files(mock_ytdl_class, temp_downloads_dir):
+    """Test that only files reported for this job are copied to the output directory when staging."""
+    with patch('src.youtube_downloader.DOWNLOADS_DIR', temp_downloads_dir):
+        downloader = YouTubeDownloader(stage_downloads=True)
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    output = temp_downloads_dir / 'Test Video.mp4'
+    output.write_text('content')
+    (temp_downloads_dir / 'unrelated.mp4').write_text('other job')
+    _report_files(mock_ytdl, output)
+    dest_dir = Path(tempfile.mkdtemp())
+    
+    downloader.download('https://www.youtube.com/watch?v=test', output_dir=str(dest_dir))
+    
+    assert sorted(f.name for f in dest_dir.iterdir()) == ['Test Video.mp4']
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_writes_directly_to_output_dir(mock_ytdl_class, downloader, temp_downloads_dir):
+    """Test that a custom output directory is used as the download target, not a copy destination."""
+    mock_ytdl = Mock()
+    mock_ytdl_class.return_value.__enter__.return_value = mock_ytdl
+    dest_dir = Path(tempfile.mkdtemp())
+    
+    with patch.object(downloader, '_copy_specific_files') as mock_copy:
+        result = downloader.download('https://www.youtube.com/watch?v=test', output_dir=str(dest_dir))
+    
+    assert result.success is True
+    ydl_opts = mock_ytdl_class.call_args[0][0]
+    assert ydl_opts['outtmpl'] == str(dest_dir.resolve() / '%(title)s.%(ext)s')
+    mock_copy.assert_not_called()
+
+
+def test_download_invalid_output_dir(downloader):
+    """Test that an unusable output directory fails before downloading."""
+    with patch.object(downloader, '_validate_path', return_value=(False, "Invalid")):
+        result = downloader.download('https://www.youtube.com/watch?v=test', output_dir='invalid')
+    
+    assert result.success is False
+
+
+def test_download_result_is_truthy_on_success():
+    """Test that DownloadResult can be used where a bool used to be returned."""
+    assert DownloadResult(success=True)
+    assert not DownloadResult(error='failed')
+    assert DownloadResult(success=True, files=[Path('a.mp4')]).to_dict()['files'] == ['a.mp4']
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_download_cancelled(mock_ytdl, downloader):
+    """Test that a cancelled download stops without trying the fallback."""
+    cancel_event = threading.Event()
+    
+    def download(urls):
+        cancel_event.set()
+        for hook in mock_ytdl.call_args[0][0]['progress_hooks']:
+            hook({'status': 'downloading'})
+    
+    mock_ytdl.return_value.__enter__.return_value.download.side_effect = download
+    
+    with patch.object(downloader, '_try_fallback') as mock_fallback:
+        result = downloader.download('https://www.youtube.com/watch?v=test', cancel_event=cancel_event)
+    
+    assert result.success is False
+    assert result.error == 'Cancelled'
+    mock_fallback.assert_not_called()
+
+
+def test_download_options_report_byte_progress(downloader):
+    """Test that yt-dlp progress updates are forwarded to on_progress."""
+    updates = []
+    opts = downloader._get_download_options('mp4', '720', 'best', on_progress=updates.append)
+    
+    for hook in opts['progress_hooks']:
+        hook({'status': 'downloading', 'filename': '/tmp/video.mp4', 'downloaded_bytes': 512,
+              'total_bytes_estimate': 1024, 'speed': 256.0, 'eta': 2})
+        hook({'status': 'error'})
+    
+    assert len(updates) == 1
+    assert {key: updates[0][key] for key in ('status', 'filename', 'downloaded_bytes', 'total_bytes', 'speed', 'eta')} == {
+        'status': 'downloading', 'filename': 'video.mp4', 'downloaded_bytes': 512,
+        'total_bytes': 1024, 'speed': 256.0, 'eta': 2
+    }
+    assert updates[0]['aggregate']['downloaded_bytes'] == 512
+
+
 # YT-DLP Options Tests
 def test_get_download_options_mp3(downloader):
     """Test _get_download_options for MP3."""
@@ -105,6 +333,44 @@ def test_get_download_options_mp3_best(downloader):
     assert 'postprocessor_args' not in opts
 
 
+def test_get_download_options_best_native(downloader):
+    """Test that best-native stream-copies and ignores the bitrate."""
+    opts = downloader._get_download_options('mp3', None, '320', audio_policy='best-native')
+    assert opts['format'].startswith('bestaudio[ext=m4a]')
+    assert opts['postprocessors'][0]['preferredcodec'] == 'best'
+    assert 'postprocessor_args' not in opts
+
+
+@pytest.mark.parametrize('bitrate, codec', [
+    ('best', YouTubeDownloader._AUTO_AUDIO_MAPPING),
+    ('192', 'mp3'),
+])
+def test_get_download_options_auto(downloader, bitrate, codec):
+    """Test that auto only re-encodes when a bitrate is requested."""
+    opts = downloader._get_download_options('mp3', None, bitrate, audio_policy='auto')
+    assert opts['postprocessors'][0]['preferredcodec'] == codec
+    assert downloader._audio_transcodes('auto', bitrate) == (codec == 'mp3')
+
+
+def test_native_audio_is_not_deferred_to_transcode_pool(downloader):
+    """Test that only re-encoding policies hand files to the transcode pool."""
+    opts = downloader._get_download_options('mp3', None, 'best', defer_transcode=True, audio_policy='best-native')
+    assert opts['postprocessors'][0]['preferredcodec'] == 'best'
+    assert not downloader._defers_transcode('mp3', 'best', 'auto')
+
+
+def test_download_unknown_audio_policy(downloader):
+    """Test that an unknown audio policy is rejected."""
+    with pytest.raises(ValueError):
+        downloader.download('https://www.youtube.com/watch?v=test', format='mp3', audio_policy='flac')
+
+
+def test_archive_per_audio_policy(downloader):
+    """Test that native and MP3 syncs of one playlist keep separate archives."""
+    assert downloader._get_archive('mp3', None, 'best').path.name == 'mp3-best.txt'
+    assert downloader._get_archive('mp3', None, 'best', 'best-native').path.name == 'mp3-best-native-best.txt'
+
+
 def test_get_download_options_mp4(downloader):
     """Test _get_download_options for MP4."""
     opts = downloader._get_download_options('mp4', '720', 'best')
@@ -119,18 +385,33 @@ def test_get_download_options_mp4_no_resolution(downloader):
 
 
 # Fallback Tests
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
-def test_try_fallback_success(mock_ytdl, downloader):
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_try_fallback_success(mock_ytdl, downloader, temp_downloads_dir):
     """Test _try_fallback success."""
     mock_ytdl_instance = Mock()
-    mock_ytdl_instance.download.return_value = None
     mock_ytdl.return_value.__enter__.return_value = mock_ytdl_instance
+    output = temp_downloads_dir / 'Test Video.mp4'
+    _report_files(mock_ytdl_instance, output)
     
     result = downloader._try_fallback('https://www.youtube.com/watch?v=test', 'mp4', '720', 'best', None)
-    assert result is True
+    assert result.success is True
+    assert result.files == [output.resolve()]
+    assert mock_ytdl.call_args[0][0]['ignoreerrors'] is False
+
+
+@patch('src.session.yt_dlp.YoutubeDL')
+def test_try_fallback_without_files_fails(mock_ytdl, downloader):
+    """Test that a fallback producing no file is reported as failed."""
+    mock_ytdl_instance = Mock()
+    mock_ytdl_instance.download.return_value = 1
+    mock_ytdl.return_value.__enter__.return_value = mock_ytdl_instance
+    
+    result = downloader._try_fallback('https://www.youtube.com/watch?v=test', 'mp4', '720', 'best', None)
+    assert result.success is False
+    assert result.files == []
 
 
-@patch('src.youtube_downloader.yt_dlp.YoutubeDL')
+@patch('src.session.yt_dlp.YoutubeDL')
 def test_try_fallback_failure(mock_ytdl, downloader):
     """Test _try_fallback failure."""
     mock_ytdl_instance = Mock()
@@ -138,7 +419,7 @@ def test_try_fallback_failure(mock_ytdl, downloader):
     mock_ytdl.return_value.__enter__.return_value = mock_ytdl_instance
     
     result = downloader._try_fallback('https://www.youtube.com/watch?v=test', 'mp4', '720', 'best', None)
-    assert result is False
+    assert result.success is False
 
 
 # Path Tests